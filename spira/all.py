@@ -1,6 +1,8 @@
 
 from spira.yevon.all import *
 
+from spira import profile
+
 from spira.yevon.process import get_rule_deck
 
 RDD = get_rule_deck()
@@ -0,0 +1,48 @@
+import numpy as np
+from copy import deepcopy
+from spira.core.frozen import __Frozen__
+
+
+__all__ = ['clone_value']
+
+
+# ------------------------------- Cloning -------------------------------
+
+
+# NOTE: Values of these types cannot be changed, so
+# clones can share them with the original object.
+IMMUTABLE_TYPES = (type(None), bool, int, float, complex, str, bytes, frozenset, np.number)
+
+
+def is_shared_value(value):
+    """ Returns `True` if the value can be shared between clones. """
+    if isinstance(value, IMMUTABLE_TYPES):
+        return True
+    if isinstance(value, np.ndarray):
+        return not value.flags.writeable
+    return isinstance(value, __Frozen__)
+
+
+def share_array(array):
+    """ Returns a read-only view of the array. Clones share the view,
+    so that changing the points of either object creates a new array
+    (copy on write), instead of changing the shared data. """
+    if not array.flags.writeable:
+        return array
+    view = array.view()
+    view.flags.writeable = False
+    return view
+
+
+def clone_value(value):
+    """ Returns a copy of the value that can be changed without changing
+    the original. Immutable values are returned as is, objects with a
+    `clone` method are cloned and all other values are deep copied. """
+    if isinstance(value, IMMUTABLE_TYPES):
+        return value
+    if isinstance(value, np.ndarray):
+        return share_array(value)
+    clone = getattr(value, 'clone', None)
+    if clone is not None:
+        return clone()
+    return deepcopy(value)
@@ -0,0 +1,82 @@
+import weakref
+
+
+__all__ = ['set_frozen_values', 'get_frozen_values']
+
+
+# ----------------------------- Frozen Values -----------------------------
+
+
+FROZEN_VALUES = False
+
+
+def set_frozen_values(value=True):
+    """ Freeze coordinates, transforms and physical layers when they
+    are assigned to parameters. Frozen values are immutable, hashable
+    and interned, so that equal values share a single instance and
+    copying them is a no-op. """
+    global FROZEN_VALUES
+    FROZEN_VALUES = value
+
+
+def get_frozen_values():
+    """ Returns `True` if frozen values are enabled. """
+    return FROZEN_VALUES
+
+
+def freeze_value(frozen_class, key, create):
+    """ Returns the interned instance of `frozen_class` for `key`.
+    The first time the key is seen the instance is created with
+    the `create` callable and its class is switched to the frozen class. """
+    table = frozen_class.__interned__
+    value = table.get(key)
+    if value is None:
+        value = create()
+        value.__class__ = frozen_class
+        table[key] = value
+    return value
+
+
+class __Frozen__(object):
+    """ Mixin for the frozen version of a value class.
+
+    Instances are only created by `freeze_value`. They cannot be
+    changed after creation, hash on their `__frozen_key__` and
+    are returned unchanged when copied.
+    """
+
+    __interned__ = weakref.WeakValueDictionary()
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Cannot set '{}' of frozen {}".format(name, self.__class__.__name__))
+
+    def __delattr__(self, name):
+        raise AttributeError("Cannot delete '{}' of frozen {}".format(name, self.__class__.__name__))
+
+    def __hash__(self):
+        return hash(self.__frozen_key__())
+
+    def __eq__(self, other):
+        if self is other:
+            return True
+        return super().__eq__(other)
+
+    def __ne__(self, other):
+        if self is other:
+            return False
+        return super().__ne__(other)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def clone(self):
+        return self
+
+    def freeze(self):
+        return self
+
+    def is_frozen(self):
+        return True
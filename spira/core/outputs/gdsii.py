@@ -6,6 +6,7 @@ from spira import settings
 from spira import log as LOG
 from spira.yevon.gdsii import *
 from spira.yevon.gdsii.polygon import __ShapeElement__
+from spira.yevon.gdsii.polygon_array import PolygonArray
 from spira.core.parameters.variables import *
 from spira.core.parameters.restrictions import RestrictValueList
 from spira.core.mixin import MixinBowl
@@ -31,14 +32,14 @@ class OutputGdsii(ParameterInitializer):
         self.gdspy_cell = self.collector(cell)
 
     def collect_labels(self, item, cl, extra_transform=None):
-        if item.node_id not in list(cl.keys()):
+        if item.node_id not in cl:
             L = item.convert_to_gdspy(extra_transform)
             cl[item.id_string()] = L
 
     def collect_polygons(self, item, cp, extra_transform=None):
-        if item.id_string() not in list(cp.keys()):
-            P = item.convert_to_gdspy()
-            cp[item.id_string()] = P
+        key = item.key
+        if key not in cp:
+            cp[key] = item.convert_to_gdspy()
 
     def collect_ports(self, cell):
         from spira.yevon.visualization.viewer import PortLayout
@@ -88,7 +89,7 @@ class OutputGdsii(ParameterInitializer):
             cp, cl = {}, {}
             G = self.__collected_cells__[c]
             for e in c.elements:
-                if isinstance(e, __ShapeElement__):
+                if isinstance(e, (__ShapeElement__, PolygonArray)):
                     self.collect_polygons(e, cp)
                 elif isinstance(e, Label):
                     self.collect_labels(e, cl)
@@ -96,36 +97,44 @@ class OutputGdsii(ParameterInitializer):
             for e in cp.values(): G.add(e)
             for e in cl.values(): G.add(e)
 
-    def collect_srefs(self, cell):
+    def reference_transform(self, T):
+        """ Returns the origin, rotation, reflection and magnification
+        of a reference transform, as used by Gdspy references. """
 
         from spira.core.transformation import CompoundTransform
         from spira.core.transforms.generic import GenericTransform
 
+        c = Coord(0,0).transform(T)
+        origin = c.to_numpy_array()
+
+        rotation = 0
+        reflection = False
+        magnification = 1.0
+
+        if isinstance(T, CompoundTransform):
+            for t in T.__subtransforms__:
+                if isinstance(t, GenericTransform):
+                    rotation = t.rotation
+                    reflection = t.reflection
+                    magnification = t.magnification
+        else:
+            rotation = T.rotation
+            reflection = T.reflection
+            magnification = T.magnification
+
+        return origin, rotation, reflection, magnification
+
+    def collect_srefs(self, cell):
+
         for c in cell.dependencies():
             G = self.__collected_cells__[c]
             cs = {}
             for e in c.elements:
                 if isinstance(e, SRef):
-                    if e.id_string() not in list(self.__collected_srefs__.keys()):
+                    if e.key not in self.__collected_srefs__:
 
                         T = e.transformation + spira.Translation(e.midpoint)
-                        c = Coord(0,0).transform(T)
-                        origin = c.to_numpy_array()
-
-                        rotation = 0
-                        reflection = False
-                        magnification = 1.0
-
-                        if isinstance(T, CompoundTransform):
-                            for t in T.__subtransforms__:
-                                if isinstance(t, GenericTransform):
-                                    rotation = t.rotation
-                                    reflection = t.reflection
-                                    magnification = t.magnification
-                        else:
-                            rotation = T.rotation
-                            reflection = T.reflection
-                            magnification = T.magnification
+                        origin, rotation, reflection, magnification = self.reference_transform(T)
 
                         ref_cell = self.__collected_cells__[e.reference]
 
@@ -136,7 +145,29 @@ class OutputGdsii(ParameterInitializer):
                             magnification=magnification,
                             x_reflection=reflection)
 
-                        cs[e.id_string()] = S
+                        cs[e.key] = S
+
+                elif isinstance(e, ARef):
+                    if e.key not in cs:
+
+                        # NOTE: The AREF spacing is not magnified,
+                        # but the grid of the ARef is transformed.
+                        T = e.transformation + spira.Translation(e.origin)
+                        origin, rotation, reflection, magnification = self.reference_transform(T)
+
+                        ref_cell = self.__collected_cells__[e.reference]
+
+                        S = gdspy.CellArray(
+                            ref_cell=ref_cell,
+                            columns=e.columns,
+                            rows=e.rows,
+                            spacing=(e.spacing.x * magnification, e.spacing.y * magnification),
+                            origin=origin,
+                            rotation=rotation,
+                            magnification=magnification,
+                            x_reflection=reflection)
+
+                        cs[e.key] = S
             for e in cs.values():
                 G.add(e)
 
@@ -190,7 +221,8 @@ class GdsiiLayout(ParameterInitializer):
         G.gdspy_gdsii_output(gdspy_library)
 
         if name is not None:
-            writer = gdspy.GdsWriter('{}.gds'.format(name), unit=1.0e-6, precision=1.0e-12)
+            library = settings.get_current_library()
+            writer = gdspy.GdsWriter('{}.gds'.format(name), unit=library.unit, precision=library.grid)
             for name, cell in gdspy_library.cell_dict.items():
                 writer.write_cell(cell)
                 del cell
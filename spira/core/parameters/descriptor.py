@@ -3,13 +3,43 @@ from spira.core.parameters.restrictions import RestrictNothing
 from spira.core.parameters.processors import ParameterProcessor
 
 
-__all__ = ['ParameterDescriptor', 'FunctionParameter', 'Parameter']
+__all__ = [
+    'ParameterDescriptor',
+    'FunctionParameter',
+    'Parameter',
+    'set_strict_validation',
+    'get_strict_validation'
+]
 
 
 EXTERNAL_VALUE = 0
 CACHED_VALUE = 1
 
 
+# NOTE: Values are validated against the parameter restriction when
+# they are written to the store. In strict mode the restriction is
+# also re-applied on every read, which is useful for debugging
+# restrictions that depend on the state of the host object.
+STRICT_VALIDATION = False
+
+
+def set_strict_validation(value=True):
+    """ Re-validate stored parameter values on every read. """
+    global STRICT_VALIDATION
+    STRICT_VALIDATION = bool(value)
+
+
+def get_strict_validation():
+    """ Returns `True` if parameters are validated on every read. """
+    return STRICT_VALIDATION
+
+
+# NOTE: Stack of (object, parameter name) pairs for the `create_*`
+# functions currently being called. Parameters read while a function
+# is on the stack are recorded as dependencies of the cached value.
+DEPENDENCY_TRACE = []
+
+
 class BaseParameter(object):
     """
     Sets the values of the Parameter when initialized.
@@ -85,7 +115,14 @@ class ParameterDescriptor(BaseParameter):
         """
         if obj is None:
             return self
-        if not self.__parameter_was_stored__(obj):
+        if DEPENDENCY_TRACE:
+            self.__trace_dependency__(obj)
+        if not STRICT_VALIDATION:
+            item = obj.__store__.get(self.__name__)
+            if (item is not None) and item[2]:
+                return item[0]
+        stored = self.__parameter_was_stored__(obj)
+        if not stored:
             f = self.get_param_function(obj)
             if f is None:
                 if hasattr(self, 'default'):
@@ -93,7 +130,11 @@ class ParameterDescriptor(BaseParameter):
                 else:
                     value = None
             else:
-                value = self.call_param_function(obj)
+                DEPENDENCY_TRACE.append((obj, self.name))
+                try:
+                    value = self.call_param_function(obj)
+                finally:
+                    DEPENDENCY_TRACE.pop()
         else:
             value = self.__get_parameter_value__(obj)
         if not self.restriction(value, obj):
@@ -102,6 +143,8 @@ class ParameterDescriptor(BaseParameter):
                     raise ValueError("Cannot set parameter {} of {} to None.".format(self.name, obj.__class__.__name__))
             else:
                 raise ValueError("Invalid parameter assignment '{}' of cell '{}' with value '{}', which is not compatible with '{}'.".format(self.name, obj.__class__.__name__, str(value), str(self.restriction)))
+        if stored:
+            self.__mark_parameter_validated__(obj)
         return value
 
     def __set__(self, obj, value):
@@ -134,29 +177,29 @@ class ParameterDescriptor(BaseParameter):
         else:
             v = value
         self.__check_restriction__(obj, v)
-        self.__externally_set_parameter_value__(obj, v)
+        self.__externally_set_parameter_value__(obj, v, validated=True)
 
-    def __externally_set_parameter_value__(self, obj, value):
+    def __externally_set_parameter_value__(self, obj, value, validated=False):
         clear_cached_values_in_store = True
         if self.__parameter_was_stored__(obj):
             old_value = obj.__store__[self.__name__][0]
             try:
                 clear_cached_values_in_store = (type(old_value) != type(value)) or (old_value != value)
                 if type(clear_cached_values_in_store) == np.ndarray:
-                    clear_cached_values_in_store = clear_cached_values_in_store.all()
+                    clear_cached_values_in_store = clear_cached_values_in_store.any()
             except ValueError as e:
                 clear_cached_values_in_store = True
-        obj.__store__[self.__name__] = (value, EXTERNAL_VALUE)
+        obj.__store__[self.__name__] = (value, EXTERNAL_VALUE, validated)
         if not obj.flag_busy_initializing:
             obj.__validation_check__()
             if clear_cached_values_in_store:
-                obj.__clear_cached_values_in_store__()
+                obj.__clear_cached_values_in_store__(self.name)
 
     def __cache_parameter_value__(self, obj, value):
         if obj is not None:
             new_value = self.preprocess(value, obj)
             self.__check_restriction__(obj, new_value)
-            obj.__store__[self.__name__] = (new_value, CACHED_VALUE)
+            obj.__store__[self.__name__] = (new_value, CACHED_VALUE, True)
             return new_value
         else:
             return value
@@ -170,6 +213,22 @@ class ParameterDescriptor(BaseParameter):
     def __get_parameter_status__(self, obj):
         return obj.__store__[self.__name__][1]
 
+    def __trace_dependency__(self, obj):
+        """ Record that the innermost `create_*` function
+        computing a parameter of `obj` reads this parameter. """
+        for (o, name) in reversed(DEPENDENCY_TRACE):
+            if o is obj:
+                if name != self.name:
+                    obj.__class__.__add_parameter_dependency__(name, self.name)
+                return
+
+    def __mark_parameter_validated__(self, obj):
+        """ Flag the stored value as validated, so that
+        subsequent reads can skip the restriction check. """
+        value, status, validated = obj.__store__[self.__name__]
+        if not validated:
+            obj.__store__[self.__name__] = (value, status, True)
+
     def __check_restriction__(self, obj, value):
         if (self.allow_none is True) and (value is None):
             return True
@@ -287,7 +346,7 @@ class SetFunctionParameter(BaseParameter):
     def __set__(self, obj, value):
         new_value = self.preprocess(value, obj)
         if self.restriction(new_value, obj):
-            return self.fset(obj, self.preprocess(value, obj))
+            return self.fset(obj, new_value)
         else:
             raise ValueError("%s does not match restriction %s in property %s" % (value, self.restriction, self.__name__))
 
@@ -1,5 +1,6 @@
 import gdspy
 import inspect
+import weakref
 import collections
 import numpy as np
 from copy import copy, deepcopy
@@ -7,7 +8,10 @@ from copy import copy, deepcopy
 from spira.core.mixin import MetaMixinBowl, MixinBowl
 from spira.core.parameters.descriptor import BaseParameter
 from spira.core.parameters.descriptor import Parameter
+from spira.core.parameters.descriptor import ParameterDescriptor
 from spira.core.parameters.descriptor import EXTERNAL_VALUE, CACHED_VALUE
+from spira.core.parameters.store import compact_store_class
+from spira.core.clone import clone_value, is_shared_value, share_array
 
 
 __all__ = ['ParameterInitializer']
@@ -39,36 +43,145 @@ class MetaBase(MetaMixinBowl):
 
     def bind_parameters(cls):
         cls.__params__ = {}
-        cls.__props__ = ['__name_prefix__']
+        for k, v in cls.__get_parameters__():
+            cls.__bind_parameter__(k, v)
+        cls.__update_bindings__()
+
+    def __bind_parameter__(cls, name, parameter):
+        if name == '__name_prefix__':
+            return
+        if hasattr(parameter, 'bind_parameter'):
+            parameter.bind_parameter(cls, name)
+        parameter.validate_binding(cls, name)
+        cls.__params__[name] = parameter
+
+    def __update_bindings__(cls):
+        """ Derive the parameter lists from the bound parameters and
+        reset everything that depends on the class structure. """
+        names = sorted(cls.__params__)
+        cls.__props__ = ['__name_prefix__'] + names
+        cls.__locked_parameters__ = [k for k in names if cls.__params__[k].locked]
+        cls.__unlocked_parameters__ = [k for k in names if not cls.__params__[k].locked]
+        cls.__parameter_dependencies__ = {}
+        cls.__parameter_dependents__ = {}
+        cls.__init_signature__ = None
+        cls.__bind_store__()
+        cls.__bind_docs__()
+
+    def __bind_store__(cls):
+        """ Set the type of parameter store used by new instances. """
+        if getattr(cls, '__compact_store__', False):
+            names = [p.__name__ for p in cls.__params__.values() if isinstance(p, ParameterDescriptor)]
+            cls.__store_class__ = compact_store_class(names)
+        else:
+            cls.__store_class__ = dict
+
+    def use_compact_store(cls, value=True):
+        """ Store the parameters of new instances of this class and
+        its subclasses in slots, instead of in a dictionary of tuples.
+
+        Examples
+        --------
+        >>> spira.Polygon.use_compact_store()
+        """
+        cls.__compact_store__ = value
+        for c in cls.__descendants__():
+            c.__bind_store__()
+
+    def __lookup_attribute__(cls, name):
+        """ Returns the raw class attribute, without calling
+        `__get__`, following the method resolution order. """
+        for c in cls.__mro__:
+            if name in c.__dict__:
+                return c.__dict__[name]
+        return None
+
+    def __descendants__(cls):
+        """ Returns the class followed by all its subclasses. """
+        descendants = [cls]
+        visited = {cls}
+        for c in descendants:
+            for s in type.__subclasses__(c):
+                if s not in visited:
+                    visited.add(s)
+                    descendants.append(s)
+        return descendants
+
+    def __merge_parameters__(cls, names):
+        """ Re-resolve only the given attribute names, which
+        are the attributes that a mixin class can override. """
+        for name in names:
+            attr = cls.__lookup_attribute__(name)
+            if isinstance(attr, BaseParameter):
+                cls.__bind_parameter__(name, attr)
+            elif name in cls.__params__:
+                del cls.__params__[name]
+        cls.__update_bindings__()
+
+    def __add_parameter_dependency__(cls, name, dependency):
+        """ Record that the cached value of parameter `name`
+        is computed from the value of parameter `dependency`. """
+        cls.__parameter_dependencies__.setdefault(name, set()).add(dependency)
+        cls.__parameter_dependents__.setdefault(dependency, set()).add(name)
+
+    def __dependent_parameters__(cls, name):
+        """ Returns the parameters whose cached values are
+        computed, directly or transitively, from `name`. """
+        dependents = set()
+        stack = [name]
+        while stack:
+            for d in cls.__parameter_dependents__.get(stack.pop(), ()):
+                if d not in dependents:
+                    dependents.add(d)
+                    stack.append(d)
+        return dependents
+
+    def parameter_dependency_graph(cls):
+        """ Returns a directed graph with an edge from each
+        parameter to the parameters that are computed from it.
 
-        locked_parameters = []
-        unlocked_parameters = []
+        Example
+        -------
+        >>> G = spira.Polygon.parameter_dependency_graph()
+        >>> list(G.predecessors('ports'))
+        ['edge_ports', 'layer', 'transformation']
+        """
+        import networkx as nx
+        G = nx.DiGraph()
+        for name, dependencies in cls.__parameter_dependencies__.items():
+            for d in dependencies:
+                G.add_edge(d, name)
+        return G
 
-        for k, v in cls.__get_parameters__():
-            if not k in cls.__props__:
+    def mixin(cls, mixin_class):
+        if mixin_class in cls.__bases__:
+            return
+        super().mixin(mixin_class)
+        names = set()
+        for c in mixin_class.__mro__:
+            if c is not object:
+                names.update(c.__dict__)
+        for c in cls.__descendants__():
+            c.__merge_parameters__(names)
 
-                if hasattr(v, 'bind_parameter'):
-                    v.bind_parameter(cls, k)
-                v.validate_binding(cls, k)
 
-                if v.locked:
-                    locked_parameters.append(k)
-                else:
-                    unlocked_parameters.append(k)
+class __LazyDocstring__(object):
+    """ Non-data descriptor that replaces the `__doc__` of a
+    class and only generates the documentation when it is
+    requested, for instance by help() or Sphinx. """
 
-                cls.__params__[k] = v
-                cls.__props__.append(k)
+    def __init__(self, owner, doc):
+        self.owner = owner
+        self.doc = doc
+        self.generated = None
 
-        cls.__locked_parameters__ = locked_parameters
-        cls.__unlocked_parameters__ = unlocked_parameters
-        cls.__generate_docs__()
+    def __get__(self, obj, type=None):
+        if self.generated is None:
+            self.generated = self.owner.__generate_docs__()
+        return self.generated
 
-    def mixin(cls, mixin_class):
-        super().mixin(mixin_class)
-        cls.bind_parameters()
-        for c in REGISTERED_CLASSES:
-            if issubclass(c, cls):
-                c.bind_parameters()
+    def invalidate(self):
+        self.generated = None
 
 
 class MetaInitializer(MetaBase):
@@ -80,33 +193,61 @@ class MetaInitializer(MetaBase):
     MODULES = ['gdspy', 'meshio', 'pygmsh']
     SECTIONS = ['Desc', 'Parameters', 'Examples', 'Notes', 'Returns']
 
-    def __map_parameters__(cls, *params, **keyword_params):
+    def __compile_signature__(cls):
+        """ Map the arguments of the class constructor once, so
+        that instantiation does not have to inspect `__init__`. """
         f = inspect.getfullargspec(cls.__init__)
         p, d = f.args, f.defaults
         if d is None: d = []
-        kwargs = {}
+        defaults = {}
         for k, v in zip(p[-len(d):], d):
-            kwargs[k] = v
+            defaults[k] = v
+        cls.__init_signature__ = (tuple(p[1:]), defaults)
+        return cls.__init_signature__
+
+    def __map_parameters__(cls, *params, **keyword_params):
+        signature = cls.__init_signature__
+        if signature is None:
+            signature = cls.__compile_signature__()
+        names, defaults = signature
+        kwargs = dict(defaults)
         kwargs.update(keyword_params)
-        for k, v in zip(p[1:len(params)+1], params):
-            kwargs[k] = v
+        if params:
+            kwargs.update(zip(names, params))
         return kwargs
 
+    def __bind_docs__(cls):
+        """ Replace the class docstring with a lazy descriptor, or
+        discard the generated docs if the class was re-bound. """
+        doc = cls.__dict__.get('__doc__')
+        if isinstance(doc, __LazyDocstring__):
+            doc.invalidate()
+        else:
+            cls.__doc__ = __LazyDocstring__(cls, doc)
+
+    def __raw_doc__(cls):
+        """ Returns the docstring as written in the class definition. """
+        doc = cls.__dict__.get('__doc__')
+        if isinstance(doc, __LazyDocstring__):
+            doc = doc.doc
+        return doc
+
     def __generate_docs__(cls):
 
         output = []
         output.extend(cls.__get_class_docs__())
         output.extend(cls.__get_function_docs__())
 
-        cls.__doc__ = '\n'.join(output)
+        return '\n'.join(output)
 
     def __get_class_docs__(cls):
 
         output = list()
 
         class_docs = {}
-        if cls.__doc__:
-            lines = inspect.getdoc(cls).split('\n')
+        doc = cls.__raw_doc__()
+        if doc:
+            lines = inspect.cleandoc(doc).split('\n')
 
             lines = list(filter(lambda x: len(x.strip()) > 0, lines))
 
@@ -144,9 +285,16 @@ class MetaInitializer(MetaBase):
                     docparam += '{}\n{}\n'.format(key, '\n'.join(value))
                 docparam += '\n'
 
-        from sphinxcontrib.napoleon import Config
+        try:
+            from sphinxcontrib.napoleon import Config
+            from sphinxcontrib.napoleon.docstring import NumpyDocstring
+        except ImportError:
+            # NOTE: Napoleon is only a developer package, so
+            # fall back to the unformatted sections without it.
+            output.extend(docparam.split('\n'))
+            return output
+
         config = Config(napoleon_use_param=True, napoleon_use_rtype=True)
-        from sphinxcontrib.napoleon.docstring import NumpyDocstring
         lines = NumpyDocstring(docparam, config).lines()
 
         output.extend(lines)
@@ -203,11 +351,14 @@ class MetaInitializer(MetaBase):
 class __ParameterInitializer__(metaclass=MetaInitializer):
     """ This is the ParameterConstructor """
 
+    # NOTE: Parameters whose values are shared by clones.
+    __clone_shared__ = ()
+
     def __init__(self, **kwargs):
         self.flag_busy_initializing = True
 
         if not hasattr(self, '__store__'):
-            self.__store__ = dict()
+            self.__store__ = self.__store_class__()
 
         for key, value in kwargs.items():
             if not is_suppressed(value):
@@ -229,22 +380,72 @@ class __ParameterInitializer__(metaclass=MetaInitializer):
 
     @classmethod
     def __get_parameters__(cls):
-        prop = []
-        for attr_name in dir(cls):
-            attr = getattr(cls, attr_name)
-            if isinstance(attr, BaseParameter):
-                prop.append([attr_name, attr])
-        return prop
-
-    def __clear_cached_values_in_store__(self):
+        params = {}
+        for c in reversed(cls.__mro__):
+            for attr_name, attr in c.__dict__.items():
+                if isinstance(attr, BaseParameter):
+                    params[attr_name] = attr
+                elif attr_name in params:
+                    del params[attr_name]
+        return sorted(params.items())
+
+    def __clear_cached_values_in_store__(self, name=None):
+        """ Drop the cached values that depend on parameter
+        `name`, or all cached values if no name is given. """
         if not self.flag_busy_initializing:
-            store_content_flattened = self.__store__.items()
-            for (key, item) in list(store_content_flattened):
-                origin = item[1]
-                if origin == CACHED_VALUE:
-                    del self.__store__[key]
+            if name is None:
+                store_content_flattened = self.__store__.items()
+                for (key, item) in list(store_content_flattened):
+                    origin = item[1]
+                    if origin == CACHED_VALUE:
+                        del self.__store__[key]
+            else:
+                params = self.__class__.__params__
+                for d in self.__class__.__dependent_parameters__(name):
+                    parameter = params.get(d)
+                    if isinstance(parameter, ParameterDescriptor):
+                        item = self.__store__.get(parameter.__name__)
+                        if (item is not None) and (item[1] == CACHED_VALUE):
+                            del self.__store__[parameter.__name__]
             if hasattr(self, '__SPIRA_CACHE__'):
                 self.__SPIRA_CACHE__.clear()
+            if self.__dict__.get('__watchers__'):
+                self.__watch_parts__()
+                self.__changed__()
+
+    # NOTE: An object that caches values computed from this object, like
+    # a cell with its element list, watches it. Changing a parameter, or
+    # calling `__changed__`, tells the watchers, and the first watcher
+    # makes this object watch its own parts, so that changes are passed
+    # up through the elements, lists, references and cells above them.
+    def __watch__(self, watcher):
+        """ Registers an object whose `__changed__`
+        is called when this object is changed. """
+        watchers = self.__dict__.get('__watchers__')
+        if watchers is None:
+            watchers = self.__dict__['__watchers__'] = {}
+            self.__watch_parts__()
+        watchers[id(watcher)] = weakref.ref(watcher)
+
+    def __watched_parts__(self):
+        """ The objects that the values of this object are computed from. """
+        return ()
+
+    def __watch_parts__(self):
+        for part in self.__watched_parts__():
+            if part is not None:
+                part.__watch__(self)
+
+    def __changed__(self):
+        """ Tells the watchers that this object has changed. """
+        watchers = self.__dict__.get('__watchers__')
+        if watchers:
+            for key, ref in list(watchers.items()):
+                w = ref()
+                if w is None:
+                    del watchers[key]
+                else:
+                    w.__changed__()
 
     def __external_parameters__(self):
         ex_parameters = []
@@ -258,6 +459,70 @@ class __ParameterInitializer__(metaclass=MetaInitializer):
                 ex_parameters.append(i)
         return ex_parameters
 
+    @classmethod
+    def __preprocess_parameter_values__(cls, name, values):
+        """ Preprocess and validate a list of values for parameter
+        `name`. Every distinct value object is only handled once. """
+        parameter = cls.__params__[name]
+        processed = {}
+        result = []
+        for v in values:
+            key = id(v)
+            if key not in processed:
+                p = parameter.preprocess(v, None)
+                parameter.__check_restriction__(None, p)
+                processed[key] = p
+            result.append(processed[key])
+        return result
+
+    @classmethod
+    def __from_parameter_values__(cls, values):
+        """ Creates an instance by filling the store directly, without
+        calling `__init__`. The values must already be preprocessed
+        and valid for their parameters. """
+        obj = cls.__new__(cls)
+        obj.flag_busy_initializing = True
+        params = cls.__params__
+        obj.__store__ = cls.__store_class__((params[k].__name__, (v, EXTERNAL_VALUE, True)) for k, v in values.items())
+        obj.__validation_check__()
+        obj.__determine_type__()
+        obj.flag_busy_initializing = False
+        return obj
+
+    def __shallow_copy__(self):
+        """ Returns a copy that shares the parameter
+        values, but has its own parameter store. """
+        cls = self.__class__
+        obj = cls.__new__(cls)
+        obj.__dict__.update(self.__dict__)
+        obj.__dict__.pop('__watchers__', None)
+        obj.__store__ = self.__store__.copy()
+        return obj
+
+    def clone(self):
+        """ Returns a copy that can be changed without changing this
+        object. The parameter store is copied shallowly: immutable values
+        are shared, point arrays are shared copy-on-write and other
+        external values are cloned. Cached values are kept if they can
+        be shared, otherwise they are created again when used. """
+        obj = self.__shallow_copy__()
+        obj.__dict__.pop('__SPIRA_CACHE__', None)
+        params = self.__class__.__params__
+        shared = [params[n].__name__ for n in self.__clone_shared__]
+        store = obj.__store__
+        for key, (value, status, validated) in list(store.items()):
+            if isinstance(value, np.ndarray):
+                item = (share_array(value), status, validated)
+                self.__store__[key] = item
+                store[key] = item
+            elif is_shared_value(value) or (key in shared):
+                continue
+            elif status == CACHED_VALUE:
+                del store[key]
+            else:
+                store[key] = (clone_value(value), status, validated)
+        return obj
+
     def _copy__(self):
         kwargs = {}
         for p in self.__external_parameters__():
@@ -295,7 +560,7 @@ class ParameterInitializer(__ParameterInitializer__):
         self.flag_busy_initializing = True
 
         if not hasattr(self, '__store__'):
-            self.__store__ = dict()
+            self.__store__ = self.__store_class__()
         self.__store_parameters__(kwargs)
         self.__validation_check__()
         self.__determine_type__()
@@ -0,0 +1,110 @@
+from spira.core.parameters.descriptor import EXTERNAL_VALUE, CACHED_VALUE
+
+
+__all__ = ['CompactStore', 'compact_store_class']
+
+
+# NOTE: The objects that use a compact store keep their `__dict__`,
+# since the watchers and the caches of cells and elements are kept in
+# it. For a polygon the store saves about 370 bytes, but the values
+# are read through a Python method instead of `dict.get`, which takes
+# about 0.3 us instead of 0.2 us, so the store is only used by the
+# classes that are set to use it with `use_compact_store`.
+class CompactStore(object):
+    """ Parameter store with a fixed slot layout.
+
+    Has the same interface as the dictionary store, but does not
+    keep a `(value, status, validated)` tuple for each parameter.
+    The value is kept in the slot of the parameter, and the status
+    and validated flags in a bit of the `__status__` and
+    `__validated__` slots. The items are only created when they
+    are read. An empty slot means no value is stored. Subclasses
+    are generated for each parameter class by `compact_store_class`.
+    """
+
+    __slots__ = ('__status__', '__validated__')
+
+    # NOTE: Maps each parameter store name to the bit of its flags.
+    __bits__ = {}
+
+    def __init__(self, items=None):
+        self.__status__ = 0
+        self.__validated__ = 0
+        if items is not None:
+            for k, v in items:
+                self[k] = v
+
+    def __item__(self, name, value):
+        bit = self.__bits__[name]
+        status = CACHED_VALUE if (self.__status__ & bit) else EXTERNAL_VALUE
+        return (value, status, (self.__validated__ & bit) != 0)
+
+    # NOTE: Called for every parameter read, so `__item__` is inlined.
+    def get(self, name, default=None):
+        try:
+            value = getattr(self, name)
+        except AttributeError:
+            return default
+        bit = self.__bits__[name]
+        return (value, CACHED_VALUE if (self.__status__ & bit) else EXTERNAL_VALUE, (self.__validated__ & bit) != 0)
+
+    def __getitem__(self, name):
+        try:
+            value = getattr(self, name)
+        except AttributeError:
+            raise KeyError(name)
+        return self.__item__(name, value)
+
+    def __setitem__(self, name, item):
+        value, status, validated = item
+        bit = self.__bits__[name]
+        setattr(self, name, value)
+        if status == CACHED_VALUE:
+            self.__status__ |= bit
+        else:
+            self.__status__ &= ~bit
+        if validated:
+            self.__validated__ |= bit
+        else:
+            self.__validated__ &= ~bit
+
+    def __delitem__(self, name):
+        try:
+            delattr(self, name)
+        except AttributeError:
+            raise KeyError(name)
+
+    def __contains__(self, name):
+        return hasattr(self, name)
+
+    def __iter__(self):
+        for name in self.keys():
+            yield name
+
+    def __len__(self):
+        return len(self.keys())
+
+    def keys(self):
+        return [name for name in self.__bits__ if hasattr(self, name)]
+
+    def items(self):
+        return [(name, self.__item__(name, getattr(self, name))) for name in self.keys()]
+
+    def values(self):
+        return [self.__item__(name, getattr(self, name)) for name in self.keys()]
+
+    def copy(self):
+        S = self.__class__()
+        for name in self.keys():
+            setattr(S, name, getattr(self, name))
+        S.__status__ = self.__status__
+        S.__validated__ = self.__validated__
+        return S
+
+
+def compact_store_class(names):
+    """ Returns a compact store class with a slot
+    for each of the parameter store names. """
+    names = tuple(sorted(set(names)))
+    bits = {name: 1 << i for i, name in enumerate(names)}
+    return type('CompactStore', (CompactStore,), {'__slots__': names, '__bits__': bits})
@@ -1,5 +1,6 @@
 import numpy as np
 from copy import deepcopy
+from spira.core.clone import clone_value
 from numpy.linalg import norm
 from spira.core.mixin import MixinBowl
 from spira.core.transformation import TransformationParameter
@@ -12,7 +13,7 @@ class __Transformable__(MixinBowl):
         return self
 
     def transform_copy(self, transformation):
-        T = deepcopy(self)
+        T = clone_value(self)
         T.transform(transformation)
         return T
 
@@ -20,7 +21,7 @@ class __Transformable__(MixinBowl):
         return self.transform(-transformation)
 
     def reverse_transform_copy(self, transformation):
-        T = deepcopy(self)
+        T = clone_value(self)
         T.reverse_transform(transformation)
         return T
 
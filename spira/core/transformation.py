@@ -1,3 +1,4 @@
+import weakref
 import numpy as np
 from numpy.linalg import norm
 
@@ -5,6 +6,67 @@ from spira.core.parameters.initializer import ParameterInitializer
 from spira.core.parameters.restrictions import RestrictType
 from spira.core.parameters.descriptor import ParameterDescriptor
 from spira.core.parameters.processors import ProcessorTypeCast
+from spira.core.frozen import __Frozen__, get_frozen_values
+
+
+# ---------------------------- Affine Matrices ----------------------------
+
+
+IDENTITY_MATRIX = np.eye(3)
+IDENTITY_MATRIX.flags.writeable = False
+
+
+def affine_coefficients(M):
+    """ Returns the coefficients (a, b, tx, c, d, ty) of
+    the first two rows of a 3x3 affine matrix. """
+    return tuple(M[:2].ravel().tolist())
+
+
+def reverse_affine(M):
+    """ Returns the inverse of a 3x3 affine matrix. """
+    (a, b, tx), (c, d, ty) = M[:2].tolist()
+    det = a * d - b * c
+    R = np.array([
+        [d / det, -b / det, (b * ty - d * tx) / det],
+        [-c / det, a / det, (c * tx - a * ty) / det],
+        [0.0, 0.0, 1.0]
+    ])
+    R.flags.writeable = False
+    return R
+
+
+def apply_affine_to_coord(A, coord):
+    """ Transforms a coordinate with the affine coefficients `A`. """
+    from spira.yevon.geometry.coord import Coord
+    a, b, tx, c, d, ty = A
+    x, y = coord[0], coord[1]
+    return Coord(x * a + y * b + tx, x * c + y * d + ty)
+
+
+def apply_affine_to_array(A, coords, out=None):
+    """ Transforms an (N,2) array of points with the affine
+    coefficients `A`. The result is written to `out` if it is
+    given, which can be `coords` itself for a float array. """
+    a, b, tx, c, d, ty = A
+    coords = np.asarray(coords, dtype=float)
+    if (a == 1.0) and (b == 0.0) and (c == 0.0) and (d == 1.0):
+        return np.add(coords, (tx, ty), out=out)
+    # NOTE: Every coordinate is computed as x*a + y*b + t, with
+    # one rounding per operation, so that the result does not
+    # depend on how the BLAS library orders a matrix product.
+    x = coords[:, 0]
+    y = coords[:, 1]
+    X = x * a
+    X += y * b
+    X += tx
+    Y = x * c
+    Y += y * d
+    Y += ty
+    if out is None:
+        return np.column_stack((X, Y))
+    out[:, 0] = X
+    out[:, 1] = Y
+    return out
 
 
 class Transform(ParameterInitializer):
@@ -12,6 +74,18 @@ class Transform(ParameterInitializer):
 
     _ID = 0
 
+    # NOTE: Affine transforms return their 3x3 matrix, so
+    # that compound transforms can collapse into one matrix.
+    matrix = None
+
+    @property
+    def affine(self):
+        """ The coefficients (a, b, tx, c, d, ty) of the affine
+        matrix, or `None` if the transform is not affine. """
+        if self.matrix is None:
+            return None
+        return affine_coefficients(self.matrix)
+
     def apply(self, item):
         """ Apply the transform directly on the object, without making a copy. """
         if isinstance(item, list):
@@ -57,6 +131,38 @@ class Transform(ParameterInitializer):
     def is_identity(self):
         return True
 
+    def __watch__(self, watcher):
+        # NOTE: Frozen transforms are shared by many elements and
+        # cannot be changed in place, so they are not watched.
+        if not isinstance(self, __Frozen__):
+            super().__watch__(watcher)
+
+    def __watch_matrix__(self, compound):
+        """ Registers a compound transform in which the matrix of this
+        transform is collapsed, so that it is collapsed again when
+        this transform is changed in place. """
+        if not isinstance(self, __Frozen__):
+            self.__dict__.setdefault('__compounds__', []).append(weakref.ref(compound))
+
+    def __matrix_changed__(self):
+        compounds = self.__dict__.pop('__compounds__', None)
+        if compounds is not None:
+            for ref in compounds:
+                T = ref()
+                if T is not None:
+                    T.__invalidate_matrix__()
+
+    def __shallow_copy__(self):
+        obj = super().__shallow_copy__()
+        obj.__dict__.pop('__compounds__', None)
+        return obj
+
+    @property
+    def key(self):
+        """ Hashable key of the transform, used in the
+        identity keys of the transformed elements. """
+        return self.__repr__()
+
 
 class ReversibleTransform(Transform):
     """ Base class for a transformation that can be reversed. """
@@ -92,18 +198,93 @@ class ReversibleTransform(Transform):
 
 
 class CompoundTransform(Transform):
-    """ A store for the concatenation of transforms. """
+    """ A store for the concatenation of transforms.
 
-    def __init__(self, transforms=[], **kwargs):
-        if isinstance(transforms, list):
-            self.__subtransforms__ = transforms
-        elif isinstance(transforms, CompoundTransform):
+    If all the transforms are affine, they are collapsed into a
+    single matrix as they are added, so that applying the compound
+    transform does not depend on the number of transforms. The
+    transforms are collapsed again if one of them is changed in place.
+    """
+
+    def __init__(self, transforms=None, **kwargs):
+        if transforms is None:
             self.__subtransforms__ = []
-            self.__subtransforms__.extend(transforms)
+            self.__stale__ = False
+            self.__set_matrix__(IDENTITY_MATRIX)
+        elif isinstance(transforms, CompoundTransform):
+            M = transforms.matrix
+            self.__subtransforms__ = list(transforms.__subtransforms__)
+            self.__stale__ = False
+            self.__set_matrix__(M)
+            for c in self.__subtransforms__:
+                c.__watch_matrix__(self)
         else:
-            self.__subtransforms__ = [transforms]
+            if isinstance(transforms, list):
+                self.__subtransforms__ = transforms
+            else:
+                self.__subtransforms__ = [transforms]
+            self.__collapse__()
         super().__init__(**kwargs)
 
+    def __set_matrix__(self, M):
+        self.__matrix__ = M
+        if M is None:
+            self.__affine__ = None
+        else:
+            self.__affine__ = affine_coefficients(M)
+
+    def __append_matrix__(self, transform):
+        M = self.__matrix__
+        transform.__watch_matrix__(self)
+        if M is not None:
+            N = transform.matrix
+            if N is None:
+                M = None
+            else:
+                M = N.dot(M)
+                M.flags.writeable = False
+        self.__set_matrix__(M)
+
+    def __collapse__(self):
+        self.__stale__ = False
+        self.__set_matrix__(IDENTITY_MATRIX)
+        for c in self.__subtransforms__:
+            self.__append_matrix__(c)
+
+    def __watched_parts__(self):
+        return self.__subtransforms__
+
+    def __added__(self, transform):
+        if self.__dict__.get('__watchers__') is not None:
+            transform.__watch__(self)
+        self.__changed__()
+
+    def __invalidate_matrix__(self):
+        if not self.__stale__:
+            self.__stale__ = True
+            self.__matrix_changed__()
+
+    def __check_matrix__(self):
+        if self.__stale__:
+            self.__collapse__()
+
+    @property
+    def matrix(self):
+        """ The 3x3 affine matrix of all the transforms,
+        or `None` if any of them is not affine. """
+        self.__check_matrix__()
+        return self.__matrix__
+
+    @property
+    def affine(self):
+        self.__check_matrix__()
+        return self.__affine__
+
+    @property
+    def depth(self):
+        """ The number of transforms in the chain. """
+        return len(self.__subtransforms__)
+
     def __repr__(self):
         return str(self.__subtransforms__)
 
@@ -122,6 +303,12 @@ class CompoundTransform(Transform):
         self.add(other)
         return self
 
+    def clone(self):
+        T = super().clone()
+        T.__subtransforms__ = [t.clone() for t in self.__subtransforms__]
+        T.__collapse__()
+        return T
+
     def apply(self, item):
         """ Apply the transform to the transformable item. """
         if isinstance(item, list):
@@ -145,18 +332,26 @@ class CompoundTransform(Transform):
             return
         if isinstance(other, CompoundTransform):
             for c in other.__subtransforms__:
-                self.add(other)
+                self.add(c)
         elif isinstance(other, Transform):
             self.__subtransforms__.append(other)
+            self.__append_matrix__(other)
+            self.__added__(other)
         else:
             raise TypeError("Cannot add object of type " + str(type(other)) + " to transform")
 
     def apply_to_coord(self, coord):
+        self.__check_matrix__()
+        if self.__affine__ is not None:
+            return apply_affine_to_coord(self.__affine__, coord)
         for c in self.__subtransforms__:
             coord = c.apply_to_coord(coord)
         return coord
 
     def apply_to_array(self, coords):
+        self.__check_matrix__()
+        if self.__affine__ is not None:
+            return apply_affine_to_array(self.__affine__, coords)
         for c in self.__subtransforms__:
             coords = c.apply_to_array(coords)
         return coords
@@ -167,16 +362,28 @@ class CompoundTransform(Transform):
                 return False
         return True
 
+    @property
+    def key(self):
+        return tuple(t.key for t in self.__subtransforms__)
+
     def id_string(self):
         return self.__repr__()
 
 
 class ReversibleCompoundTransform(CompoundTransform, ReversibleTransform):
-    """ A store for the concatenation of reversible transformas. """
+    """ A store for the concatenation of reversible transformas.
+    The reverse of the collapsed matrix is computed with it. """
 
     def __make_irreversible__(self):
         self.__class__ = CompoundTransform
 
+    def __set_matrix__(self, M):
+        super().__set_matrix__(M)
+        if M is None:
+            self.__reverse_affine__ = None
+        else:
+            self.__reverse_affine__ = affine_coefficients(reverse_affine(M))
+
     def reverse(self, item):
         if isinstance(item, list):
             raise TypeError("Cannot add object of type " + str(type(other)) + " to transform")
@@ -190,11 +397,17 @@ class ReversibleCompoundTransform(CompoundTransform, ReversibleTransform):
                 item = c.reverse(item)
 
     def reverse_on_coord(self, coord):
+        self.__check_matrix__()
+        if self.__reverse_affine__ is not None:
+            return apply_affine_to_coord(self.__reverse_affine__, coord)
         for c in reversed(self.__subtransforms__):
             coord = c.reverse_on_coord(coord)
         return coord
 
     def reverse_on_array(self, coords):
+        self.__check_matrix__()
+        if self.__reverse_affine__ is not None:
+            return apply_affine_to_array(self.__reverse_affine__, coords)
         for c in reversed(self.__subtransforms__):
             coords = c.reverse_on_array(coords)
         return coords
@@ -219,20 +432,26 @@ class ReversibleCompoundTransform(CompoundTransform, ReversibleTransform):
         return self
 
     def add(self, other):
+        if other is None:
+            return
         if isinstance(other, CompoundTransform):
             for c in other.__subtransforms__:
-                self.add(other)
-        if isinstance(other, ReversibleTransform):
+                self.add(c)
+        elif isinstance(other, ReversibleTransform):
             self.__subtransforms__.append(other)
+            self.__append_matrix__(other)
+            self.__added__(other)
         elif isinstance(other, Transform):
             self.__make_irreversible__()
             self.__subtransforms__.append(other)
+            self.__append_matrix__(other)
+            self.__added__(other)
         else:
             raise TypeError("Cannot add object of type " + str(type(other)) + " to transform")
 
     def __neg__(self):
         T = ReversibleCompoundTransform()
-        for c in reversed(self):
+        for c in reversed(self.__subtransforms__):
             T.add(-c)
         return T
 
@@ -245,11 +464,14 @@ class ProcessoTransformation(ProcessorTypeCast):
         # super().__init__(ReversibleTransform)
 
     def process(self, value, obj=None):
-        from spira.core.transforms.identity import IdentityTransform
+        from spira.core.transforms.identity import identity_transform
         if value is None:
-            return IdentityTransform()
+            value = identity_transform()
         else:
-            return ProcessorTypeCast.process(self, value, obj)
+            value = ProcessorTypeCast.process(self, value, obj)
+        if get_frozen_values() and hasattr(value, 'freeze'):
+            return value.freeze()
+        return value
 
 
 def TransformationParameter(restriction=None, preprocess=None, **kwargs):
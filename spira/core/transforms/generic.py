@@ -1,5 +1,8 @@
+import weakref
 import numpy as np
 from spira.core.transformation import ReversibleTransform
+from spira.core.transformation import affine_coefficients, reverse_affine
+from spira.core.transformation import apply_affine_to_array, apply_affine_to_coord
 
 from spira.yevon import utils
 from numpy.linalg import norm
@@ -8,6 +11,7 @@ from spira.core.parameters.variables import *
 from spira.yevon.geometry.coord import CoordParameter, Coord
 from spira.core.parameters.descriptor import FunctionParameter, SetFunctionParameter
 from spira.core.transformation import Transform
+from spira.core.frozen import __Frozen__, freeze_value
 from spira.yevon import constants
 
 
@@ -35,6 +39,7 @@ class GenericTransform(ReversibleTransform):
         else:
             self.__ca__ = np.cos(value * constants.DEG2RAD)
             self.__sa__ = np.sin(value * constants.DEG2RAD)
+        self.__clear_matrix__()
 
     rotation = SetFunctionParameter(local_name='__rotation__', fset=set_rotation, default=0.0)
     magnification = NumberParameter(default=1)
@@ -85,35 +90,61 @@ class GenericTransform(ReversibleTransform):
         pts = Coord(pts[0], pts[1])
         return pts
 
-    def __reflect_array__(self, coords, p1=(0,0), p2=(1,0)):
+    def __create_matrix__(self):
+        """ Returns the affine matrix that reflects around the
+        x-axis, rotates, magnifies and then translates. """
+        ca = self.__ca__ * self.magnification
+        sa = self.__sa__ * self.magnification
         if self.reflection is True:
-            points = np.array(coords)
-            p1 = np.array(p1)
-            p2 = np.array(p2)
-            if np.asarray(points).ndim == 1:
-                raise ValueError('This is a coordinate, not an array.')
-            if np.asarray(points).ndim == 2:
-                t = np.dot((p2-p1), (p2-p1))/norm(p2-p1)**2
-                pts = np.array([2*(p1 + (p2-p1)*t) - p for p in points])
+            r = -1.0
         else:
-            pts = coords
-        return pts
-
-    def __translate_array__(self, coords):
-        # FIXME: Why should I convert to float!
-        coords = [[float(c[0]), float(c[1])] for c in coords]
-        coords += np.array([self.translation.x, self.translation.y])
-        return coords
-
-    def __rotate_array__(self, coords):
-        x_a = np.array([self.__ca__, -self.__sa__])
-        y_a = np.array([self.__sa__, self.__ca__])
-        coords = np.transpose(np.vstack((np.sum(coords * x_a, 1), np.sum(coords * y_a, 1))))
-        return coords
-
-    def __magnify_array__(self, coords):
-        coords *= np.array([self.magnification, self.magnification])
-        return coords
+            r = 1.0
+        return np.array([
+            [ca, -sa * r, self.translation.x],
+            [sa, ca * r, self.translation.y],
+            [0.0, 0.0, 1.0]
+        ])
+
+    @property
+    def matrix(self):
+        """ The 3x3 affine matrix of the transform, acting on
+        homogeneous coordinates (x, y, 1). It is cached until
+        one of the transform parameters changes. """
+        M = self.__dict__.get('__matrix__')
+        if M is None:
+            M = self.__create_matrix__()
+            M.flags.writeable = False
+            self.__dict__['__matrix__'] = M
+            self.__dict__['__affine__'] = affine_coefficients(M)
+        return M
+
+    def __get_affine__(self):
+        A = self.__dict__.get('__affine__')
+        if A is None:
+            self.matrix
+            A = self.__dict__['__affine__']
+        return A
+
+    @property
+    def affine(self):
+        return self.__get_affine__()
+
+    def __get_reverse_affine__(self):
+        A = self.__dict__.get('__reverse_affine__')
+        if A is None:
+            A = affine_coefficients(reverse_affine(self.matrix))
+            self.__dict__['__reverse_affine__'] = A
+        return A
+
+    def __clear_matrix__(self):
+        self.__dict__.pop('__matrix__', None)
+        self.__dict__.pop('__affine__', None)
+        self.__dict__.pop('__reverse_affine__', None)
+        self.__matrix_changed__()
+
+    def __clear_cached_values_in_store__(self, name=None):
+        self.__clear_matrix__()
+        super().__clear_cached_values_in_store__(name)
 
     def apply_to_coord(self, coord):
         coord = self.__reflect__(coord)
@@ -122,12 +153,17 @@ class GenericTransform(ReversibleTransform):
         coord = self.__translate__(coord)
         return coord
 
-    def apply_to_array(self, coords):
-        coords = self.__reflect_array__(coords)
-        coords = self.__rotate_array__(coords)
-        coords = self.__magnify_array__(coords)
-        coords = self.__translate_array__(coords)
-        return coords
+    def apply_to_array(self, coords, out=None):
+        """ Transforms an (N,2) array of points with the affine matrix.
+        The result is written to `out` if it is given, which can be
+        `coords` itself to transform a float array in place. """
+        return apply_affine_to_array(self.__get_affine__(), coords, out)
+
+    def reverse_on_coord(self, coord):
+        return apply_affine_to_coord(self.__get_reverse_affine__(), coord)
+
+    def reverse_on_array(self, coords, out=None):
+        return apply_affine_to_array(self.__get_reverse_affine__(), coords, out)
 
     def apply_to_angle(self, angle):
         a = angle
@@ -138,11 +174,10 @@ class GenericTransform(ReversibleTransform):
 
     def __add__(self, other):
         if other is None:
-            return deepcopy(self)
+            return self.clone()
 
         # if issubclass(type(other), GenericTransform):
         if isinstance(other, GenericTransform):
-            T = GenericTransform()
 
             if other.reflection is True: s_1 = -1
             else: s_1 = 1
@@ -150,13 +185,13 @@ class GenericTransform(ReversibleTransform):
             M1 = 1.0
 
             if not self.absolute_rotation:
-                T.rotation = s_1 * self.rotation + other.rotation
+                rotation = s_1 * self.rotation + other.rotation
                 ca = other.__ca__
                 sa = other.__sa__
                 # print('A')
             else:
                 # print('B')
-                T.rotation = s_1 * self.rotation
+                rotation = s_1 * self.rotation
                 ca = 1.0
                 sa = 0.0
 
@@ -167,13 +202,18 @@ class GenericTransform(ReversibleTransform):
             cy = other.translation.y + sa * self.translation.x * M1 + s_1 * ca * self.translation.y * M1
             # cx = other.translation.x + ca * self.translation.x * M1 + s_1 * sa * self.translation.y * M1
             # cy = -other.translation.y + sa * self.translation.x * M1 + s_1 * ca * self.translation.y * M1
-            T.translation = Coord(cx, cy)
 
-            T.absolute_rotation = self.absolute_rotation or other.absolute_rotation
-            T.reflection = (not self.reflection == other.reflection)
+            # NOTE: The sum is created with all its values at once, since
+            # changing a transform afterwards invalidates the caches.
+            T = GenericTransform(
+                translation=Coord(cx, cy),
+                rotation=rotation,
+                absolute_rotation=self.absolute_rotation or other.absolute_rotation,
+                reflection=(not self.reflection == other.reflection)
+            )
 
         else:
-            T = Transform.__add__(self, other)
+            T = ReversibleTransform.__add__(self, other)
         return T
 
     def __iadd__(self, other):
@@ -220,7 +260,7 @@ class GenericTransform(ReversibleTransform):
 
     def __sub__(self, other):
         """ returns the concatenation of this transform and the reverse of other """
-        if other is None: return copy.deepcopy(self)
+        if other is None: return self.clone()
         if not isinstance(other, ReversibleTransform):
             raise TypeError("Cannot subtract an irreversible transform")
         return self.__add__(-other)
@@ -259,6 +299,17 @@ class GenericTransform(ReversibleTransform):
     def __neg__(self):
         from spira.core.transforms.translation import Translation
         from spira.core.transforms.rotation import Rotation
+        if self.reflection or (self.magnification != 1.0):
+            A = self.__get_reverse_affine__()
+            if self.reflection:
+                rotation = self.rotation
+            else:
+                rotation = -self.rotation
+            return GenericTransform(
+                translation=(A[2], A[5]),
+                rotation=rotation,
+                reflection=self.reflection,
+                magnification=1.0 / self.magnification)
         T = Translation(translation=-self.translation) + Rotation(rotation=-self.rotation, rotation_center=(0,0))
         # T = Translation(translation=-self.translation)
         # T += Rotation(rotation=-self.rotation, rotation_center=(0,0))
@@ -278,6 +329,47 @@ class GenericTransform(ReversibleTransform):
             (self.magnification == 1.0)
         )
 
+    @property
+    def key(self):
+        return (
+            self.translation.x,
+            self.translation.y,
+            self.rotation,
+            self.reflection,
+            self.magnification,
+            self.absolute_rotation
+        )
+
+    def freeze(self):
+        """ Returns the shared, immutable and hashable generic
+        transform that does the same as this transform. """
+        return freeze_value(__FrozenGenericTransform__, self.key, lambda: GenericTransform(
+            translation=self.translation.freeze(),
+            rotation=self.rotation,
+            reflection=self.reflection,
+            magnification=self.magnification,
+            absolute_rotation=self.absolute_rotation
+        ))
+
+    def is_frozen(self):
+        return False
+
+
+class __FrozenGenericTransform__(__Frozen__, GenericTransform):
+    """ Interned generic transform that cannot be changed.
+    In-place concatenation returns a new transform instead. """
+
+    __interned__ = weakref.WeakValueDictionary()
+
+    def __frozen_key__(self):
+        return self.key
+
+    def __iadd__(self, other):
+        return self.__add__(other)
+
+    def __isub__(self, other):
+        return self.__sub__(other)
+
 
 BASE = GenericTransform
 
@@ -5,7 +5,7 @@ from spira.yevon.geometry.coord import Coord
 from spira.core.transforms.generic import __ConvertableTransform__
 
 
-__all__ = ['IdentityTransform']
+__all__ = ['IdentityTransform', 'identity_transform']
 
 
 class IdentityTransform(Translation, Rotation, Magnification, __ConvertableTransform__):
@@ -42,7 +42,10 @@ class IdentityTransform(Translation, Rotation, Magnification, __ConvertableTrans
     def reverse_on_coord3(self, coord):
         return coord
 
-    def apply_to_array(self, coords):
+    def apply_to_array(self, coords, out=None):
+        if out is not None:
+            out[:] = coords
+            return out
         return coords
 
     def reverse_on_array(self, coords):
@@ -77,3 +80,15 @@ class IdentityTransform(Translation, Rotation, Magnification, __ConvertableTrans
         return True
 
 
+# NOTE: Every transformable object without a transformation gets its own
+# identity transform. Cloning a template is much cheaper than running the
+# initializers of all the transform base classes for each object.
+__identity_template__ = None
+
+
+def identity_transform():
+    """ Returns a new identity transform. """
+    global __identity_template__
+    if __identity_template__ is None:
+        __identity_template__ = IdentityTransform()
+    return __identity_template__.clone()
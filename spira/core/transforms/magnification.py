@@ -21,6 +21,7 @@ class Magnification(__ConvertableTransform__):
 
     def set_magnification(self, value):
         self.__magnification__ = value
+        self.__clear_matrix__()
         if hasattr(self, '__magnification_center__'):
             center = self.__magnification_center__
             self.translation = Coord((1 - self.__magnification__) * center.x, (1 - self.__magnification__) * center.y)
@@ -53,16 +54,6 @@ class Magnification(__ConvertableTransform__):
         coord = self.__inv_magnify__(coord)
         return coord
 
-    def apply_to_array(self, coords):      
-        coords = self.__magnify_array__(coords)
-        coords = self.__translate_array__(coords)
-        return coords
-
-    def reverse_on_array(self, coords):      
-        coords = self.__inv_translate_array__(coords)
-        coords = self.__inv_magnify__array__(coords)
-        return coords
-
     def apply_to_length(self, length):
         return length * self.magnification
     
@@ -71,7 +62,7 @@ class Magnification(__ConvertableTransform__):
     
     def __neg__(self):
         """ Returns reverse transformation """
-        return Magnification(self.magnification_center, 1.0 / self.magnification)    
+        return Magnification(1.0 / self.magnification, self.magnification_center)
 
     def is_identity(self):
         return (self.magnification == 1.0)
@@ -15,11 +15,6 @@ class Reflection(GenericTransform):
         coord = self.__translate__(coord)
         return coord
 
-    def apply_to_array(self, coords):
-        coords = self.__reflect_array__(coords)
-        coords = self.__translate_array__(coords)
-        return coords
-
 
 def shape_reflect(shape, reflection=False):
     return Reflection(reflection=reflection)(shape)
@@ -41,6 +41,7 @@ class Rotation(__ConvertableTransform__):
         else:
             self.__ca__ = np.cos(value * constants.DEG2RAD)
             self.__sa__ = np.sin(value * constants.DEG2RAD)
+        self.__clear_matrix__()
         if hasattr(self, '__rotation_center__'):
             rotation_center = self.__rotation_center__
             self.translation = Coord(
@@ -94,11 +95,6 @@ class Rotation(__ConvertableTransform__):
         coord = self.__inv_rotate__(coord)
         return coord
 
-    def apply_to_array(self, coords):
-        coords = self.__rotate_array__(coords)
-        coords = self.__translate_array__(coords)
-        return coords
-
     def apply_to_angle(self, angle):
         a = angle
         a += self.rotation
@@ -25,6 +25,7 @@ class Stretch(ReversibleTransform):
             self.__stretch_factor__ = Coord(value[0], value[1])
         if self.__stretch_factor__[0] == 0.0 or self.__stretch_factor__[1] == 0.0:
             raise ValueError("Error: Stretch factor cannot be zero in Stretch transform")
+        self.__matrix_changed__()
 
     stretch_factor = SetFunctionParameter('__stretch_factor__', set_stretch_factor)
 
@@ -49,19 +50,38 @@ class Stretch(ReversibleTransform):
         return Coord(x1+x2, y1+y2)
 
     def apply_to_array(self, coords):
-        coords *= np.array([self.stretch_factor.x, self.stretch_factor.y])
+        coords = coords * np.array([self.stretch_factor.x, self.stretch_factor.y])
         x = (1 - self.__stretch_factor__.x) * self.stretch_center.x
         y = (1 - self.__stretch_factor__.y) * self.stretch_center.y
-        coords += np.array([x, y])
+        coords = coords + np.array([x, y])
         return coords
 
     def reverse_on_array(self, coords):
-        coords *= np.array([1.0 / self.stretch_factor.x, 1.0 / self.stretch_factor.y])
+        coords = coords * np.array([1.0 / self.stretch_factor.x, 1.0 / self.stretch_factor.y])
         x = (1 - 1.0 / self.__stretch_factor__.x) * self.stretch_center.x
         y = (1 - 1.0 / self.__stretch_factor__.y) * self.stretch_center.y
-        coords += np.array([x, y])
+        coords = coords + np.array([x, y])
         return coords
 
+    @property
+    def matrix(self):
+        sx, sy = self.__stretch_factor__[0], self.__stretch_factor__[1]
+        return np.array([
+            [sx, 0.0, (1 - sx) * self.stretch_center[0]],
+            [0.0, sy, (1 - sy) * self.stretch_center[1]],
+            [0.0, 0.0, 1.0]
+        ])
+
+    def __clear_cached_values_in_store__(self, name=None):
+        self.__matrix_changed__()
+        super().__clear_cached_values_in_store__(name)
+
+    def __neg__(self):
+        """ Returns the reverse transformation. """
+        return Stretch(
+            stretch_factor=(1.0 / self.__stretch_factor__[0], 1.0 / self.__stretch_factor__[1]),
+            stretch_center=self.stretch_center)
+
     def apply_to_angle(self, angle):
         # FIXME: This is required for transforming polygon ports.
         # This is currently just a temporary fix.
@@ -74,6 +94,10 @@ class Stretch(ReversibleTransform):
     def id_string(self):
         return self.__repr__()
 
+    @property
+    def key(self):
+        return ('stretch', self.stretch_factor.x, self.stretch_factor.y, self.stretch_center.x, self.stretch_center.y)
+
 
 def scale_element(elem, scaling=(1.0, 1.0), scale_center=(0.0, 0.0)):
     from spira.core.transforms.magnification import Magnification
@@ -108,6 +108,13 @@ class TypedList(ParameterInitializer, list):
             L.append(deepcopy(item))
         return L
 
+    def clone(self):
+        """ Returns a list with a clone of each item. """
+        from spira.core.clone import clone_value
+        L = self.__class__()
+        L._list.extend(clone_value(item) for item in self._list)
+        return L
+
 
 class TypedListParameter(ParameterInitializer):
     """ Parameter type for storing a typed list. """
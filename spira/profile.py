@@ -0,0 +1,235 @@
+import json
+import time
+import marshal
+import inspect
+
+from contextlib import contextmanager
+from spira.core.parameters.descriptor import ParameterDescriptor, CACHED_VALUE
+from spira.core.parameters.initializer import __ParameterInitializer__
+from spira.core.transformation import CompoundTransform
+
+
+__all__ = ['parameters', 'ParameterProfiler']
+
+
+# NOTE: The profiler replaces the descriptor and initializer methods
+# only while it is running, so that disabled profiling costs nothing.
+_active_profiler = None
+
+
+class ParameterStats(object):
+    """ Statistics of a single parameter of a class. """
+
+    def __init__(self):
+        self.calls = 0
+        self.hits = 0
+        self.invalidations = 0
+        self.cumulative_time = 0.0
+        self.self_time = 0.0
+        self.callers = {}
+
+    @property
+    def hit_ratio(self):
+        reads = self.hits + self.calls
+        if reads == 0:
+            return 0.0
+        return self.hits / reads
+
+    def to_dict(self):
+        return {
+            'calls': self.calls,
+            'hits': self.hits,
+            'hit_ratio': self.hit_ratio,
+            'invalidations': self.invalidations,
+            'cumulative_time': self.cumulative_time,
+            'self_time': self.self_time
+        }
+
+
+class ParameterProfiler(object):
+    """ Records the `create_*` calls, cache hits and cache
+    invalidations of parameters, per class and parameter.
+    It also counts how often compound transforms are applied,
+    per chain depth, and how many of them were collapsed
+    into a single affine matrix.
+
+    Examples
+    --------
+    >>> with spira.profile.parameters() as profiler:
+    ...     cell = Jj()
+    ...     cell.gdsii_output()
+    >>> print(profiler.table())
+    >>> profiler.dump_stats('parameters.prof')
+    """
+
+    def __init__(self):
+        self.stats = {}
+        self.chains = {}
+        self.__frames = []
+        self.__get = None
+        self.__clear = None
+        self.__apply = {}
+
+    def start(self):
+        global _active_profiler
+        if _active_profiler is not None:
+            raise RuntimeError('A parameter profiler is already running.')
+        _active_profiler = self
+        self.__get = ParameterDescriptor.__get__
+        self.__clear = __ParameterInitializer__.__clear_cached_values_in_store__
+        ParameterDescriptor.__get__ = self.__profiled_get__()
+        __ParameterInitializer__.__clear_cached_values_in_store__ = self.__profiled_clear__()
+        for name in ['apply_to_coord', 'apply_to_array']:
+            self.__apply[name] = CompoundTransform.__dict__[name]
+            setattr(CompoundTransform, name, self.__profiled_apply__(self.__apply[name]))
+
+    def stop(self):
+        global _active_profiler
+        ParameterDescriptor.__get__ = self.__get
+        __ParameterInitializer__.__clear_cached_values_in_store__ = self.__clear
+        for name, f in self.__apply.items():
+            setattr(CompoundTransform, name, f)
+        _active_profiler = None
+
+    def __stats__(self, key):
+        if key not in self.stats:
+            self.stats[key] = ParameterStats()
+        return self.stats[key]
+
+    def __profiled_get__(self):
+        get = self.__get
+        frames = self.__frames
+
+        def __get__(descriptor, obj, type=None):
+            if obj is None:
+                return get(descriptor, obj, type)
+            item = obj.__store__.get(descriptor.__name__)
+            if item is not None:
+                if item[1] == CACHED_VALUE:
+                    self.__stats__((obj.__class__, descriptor.name)).hits += 1
+                return get(descriptor, obj, type)
+            if descriptor.get_param_function(obj) is None:
+                return get(descriptor, obj, type)
+
+            key = (obj.__class__, descriptor.name)
+            frame = [key, 0.0]
+            frames.append(frame)
+            t = time.perf_counter()
+            try:
+                return get(descriptor, obj, type)
+            finally:
+                dt = time.perf_counter() - t
+                frames.pop()
+                S = self.__stats__(key)
+                S.calls += 1
+                S.cumulative_time += dt
+                S.self_time += dt - frame[1]
+                if frames:
+                    caller = frames[-1]
+                    caller[1] += dt
+                    c = S.callers.setdefault(caller[0], [0, 0.0, 0.0])
+                    c[0] += 1
+                    c[1] += dt - frame[1]
+                    c[2] += dt
+
+        return __get__
+
+    def __profiled_clear__(self):
+        clear = self.__clear
+
+        def __clear_cached_values_in_store__(obj, name=None):
+            cached = [k for k, v in obj.__store__.items() if v[1] == CACHED_VALUE]
+            clear(obj, name)
+            if cached:
+                dropped = set(k for k in cached if k not in obj.__store__)
+                for n, p in obj.__class__.__params__.items():
+                    if isinstance(p, ParameterDescriptor) and (p.__name__ in dropped):
+                        self.__stats__((obj.__class__, n)).invalidations += 1
+
+        return __clear_cached_values_in_store__
+
+    def __profiled_apply__(self, apply):
+        chains = self.chains
+
+        def __apply__(transform, value):
+            C = chains.setdefault(transform.depth, [0, 0])
+            C[0] += 1
+            if transform.matrix is not None:
+                C[1] += 1
+            return apply(transform, value)
+
+        return __apply__
+
+    def __function_key__(self, key):
+        """ Returns a (file, line, name) key for pstats. """
+        cls, name = key
+        f = getattr(cls, 'create_{}'.format(name), None)
+        try:
+            filename = inspect.getsourcefile(f)
+            line = inspect.getsourcelines(f)[1]
+        except (TypeError, OSError):
+            filename = inspect.getsourcefile(cls) or '~'
+            line = 0
+        return (filename, line, '{}.{}'.format(cls.__name__, name))
+
+    def to_dict(self):
+        """ Returns the statistics, keyed by 'Class.parameter'. """
+        data = {}
+        for (cls, name), S in self.stats.items():
+            data['{}.{}'.format(cls.__name__, name)] = S.to_dict()
+        return data
+
+    def chains_to_dict(self):
+        """ Returns the compound transform applications, keyed by chain depth. """
+        return {d: {'applied': n, 'collapsed': c} for d, (n, c) in sorted(self.chains.items())}
+
+    def to_json(self, **kwargs):
+        return json.dumps(self.to_dict(), **kwargs)
+
+    def dump_json(self, filename):
+        with open(filename, 'w') as f:
+            f.write(self.to_json(indent=4))
+
+    def dump_stats(self, filename):
+        """ Writes the `create_*` calls in the format
+        of `cProfile`, which can be loaded with `pstats`. """
+        stats = {}
+        for key, S in self.stats.items():
+            if S.calls == 0:
+                continue
+            callers = {}
+            for caller, (nc, tt, ct) in S.callers.items():
+                callers[self.__function_key__(caller)] = (nc, nc, tt, ct)
+            stats[self.__function_key__(key)] = (S.calls, S.calls, S.self_time, S.cumulative_time, callers)
+        with open(filename, 'wb') as f:
+            marshal.dump(stats, f)
+
+    def table(self, sort='cumulative_time', limit=None):
+        """ Returns the statistics as a text table. """
+        rows = sorted(self.to_dict().items(), key=lambda r: r[1][sort], reverse=True)
+        if limit is not None:
+            rows = rows[:limit]
+        width = max([len('parameter')] + [len(k) for k, v in rows])
+        header = '{:<{w}}  {:>8}  {:>8}  {:>6}  {:>8}  {:>10}  {:>10}'
+        line = '{:<{w}}  {:>8}  {:>8}  {:>6.2f}  {:>8}  {:>10.6f}  {:>10.6f}'
+        lines = [header.format('parameter', 'calls', 'hits', 'ratio', 'cleared', 'cumtime', 'selftime', w=width)]
+        for k, v in rows:
+            lines.append(line.format(k, v['calls'], v['hits'], v['hit_ratio'], v['invalidations'],
+                v['cumulative_time'], v['self_time'], w=width))
+        if self.chains:
+            lines.append('')
+            lines.append('{:>11}  {:>8}  {:>9}'.format('chain depth', 'applied', 'collapsed'))
+            for d, v in self.chains_to_dict().items():
+                lines.append('{:>11}  {:>8}  {:>9}'.format(d, v['applied'], v['collapsed']))
+        return '\n'.join(lines)
+
+
+@contextmanager
+def parameters():
+    """ Profiles the parameters of all SPiRA objects inside the block. """
+    profiler = ParameterProfiler()
+    profiler.start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
@@ -83,6 +83,23 @@ def get_grids_per_unit(library=None):
     return library.grids_per_unit
 
 
+def get_database_units(library=None):
+    """ Returns `True` if the library runs booleans and
+    GDSII output on integer grid (database) units. """
+    if library is None:
+        library = get_current_library()
+    return library.database_units
+
+
+def grid_points(points, grids_per_unit=None):
+    """ Round an array of points to integer grid units. """
+    if grids_per_unit is None:
+        grids_per_unit = get_grids_per_unit()
+    pts = np.asarray(points, dtype=np.float64) * grids_per_unit
+    pts += 0.5
+    return np.floor(pts, out=pts).astype(np.int64)
+
+
 def snap_value(value, grids_per_unit=None):
     """ Round a distance to a grid value. """
     if grids_per_unit is None:
@@ -1,4 +1,3 @@
-import gdspy
 import hashlib
 import numpy as np
 
@@ -26,7 +25,7 @@ class PolygonAspects(__GeometryAspects__):
         
     @property
     def area(self):
-        return gdspy.Polygon(self.shape.points).area()
+        return self.shape.area
 
     @property
     def count(self):
@@ -50,7 +50,7 @@ class TransformablePortProperty(PortProperty, Transformable):
 
 class SRefPortProperty(TransformablePortProperty):
     def create_ports(self, ports):
-        pp = deepcopy(self.reference.ports)
+        pp = self.reference.ports.clone()
         # pp = self.reference.ports
         # ports = pp.move(self.midpoint)
         ports = pp.transform_copy(self.transformation).move(self.midpoint).transform(-self.transformation)
@@ -71,7 +71,7 @@ class PolygonPortProperty(TransformablePortProperty):
         shape = self.shape
         # FIXME: Cannot apply transforms when stretching.
         # shape = self.shape.transform_copy(self.transformation)
-        s = deepcopy(self.shape).transform_copy(self.transformation)
+        s = self.shape.transform_copy(self.transformation)
         return shapes.shape_edge_ports(shape, self.layer, self.id_string(), center=s.bbox_info.center, loc_name=self.location_name)
 
     def create_ports(self, ports):
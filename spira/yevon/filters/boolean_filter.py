@@ -132,8 +132,8 @@ class MetalConnectFilter(Filter):
             points = []
             # print('E1: {}'.format(e1))
             for e2 in D.elements:
-                shape1 = deepcopy(e1).shape.transform(e1.transformation)
-                shape2 = deepcopy(e2).shape.transform(e2.transformation)
+                shape1 = e1.shape.clone().transform(e1.transformation)
+                shape2 = e2.shape.clone().transform(e2.transformation)
                 if (shape1 != shape2) and (e1.layer == e2.layer):
                     # print('E2: {}'.format(e2))
                     overlap_shape = shape1.intersections(shape2)
@@ -4,5 +4,6 @@ from spira.yevon.gdsii.group import *
 from spira.yevon.gdsii.label import *
 from spira.yevon.gdsii.library import *
 from spira.yevon.gdsii.polygon import *
+from spira.yevon.gdsii.polygon_array import *
 from spira.yevon.gdsii.sref import *
 from spira.yevon.gdsii.pcell import *
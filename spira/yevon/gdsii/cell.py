@@ -25,6 +25,21 @@ RDD = get_rule_deck()
 __all__ = ['Cell', 'CellParameter']
 
 
+class CellNameParameter(Parameter):
+    """ The name of a cell. Renaming a cell updates its
+    entry in the name index of the cell lists that hold it. """
+
+    def __set__(self, obj, value):
+        old_name = None
+        if self.__parameter_was_stored__(obj):
+            old_name = self.__get_parameter_value__(obj)
+        super().__set__(obj, value)
+        lists = obj.__dict__.get('__cell_lists__')
+        if (lists is not None) and (old_name is not None) and (old_name != value):
+            for L in list(lists.values()):
+                L.__rename__(obj, old_name)
+
+
 class MetaCell(MetaInitializer):
     """
     Called when an instance of a SPiRA class is
@@ -55,8 +70,8 @@ class MetaCell(MetaInitializer):
             if kwargs['name'] is None:
                 kwargs['__name_prefix__'] = cls.__name__
 
-        cls.__keywords__ = kwargs
         cls = super().__call__(**kwargs)
+        cls.__keywords__ = kwargs
 
         retrieved_cell = lib.get_cell(cell_name=cls.name)
         if retrieved_cell is None:
@@ -74,6 +89,18 @@ class __Cell__(ParameterInitializer, metaclass=MetaCell):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
 
+    # NOTE: A cell that has nothing cached has told the references
+    # to it already, since they cache values computed from the cell.
+    def __changed__(self):
+        """ Drops the values cached from the elements of the cell, and
+        tells the references to the cell, and so the cells above it. """
+        cached = False
+        for key in ('__bbox_info__', '__references__', '__summary__'):
+            if self.__dict__.pop(key, None) is not None:
+                cached = True
+        if cached:
+            super().__changed__()
+
     def __getitem__(self, key):
         from spira.yevon.gdsii.sref import SRef
         from spira.yevon.gdsii.polygon import Polygon
@@ -113,21 +140,43 @@ class __Cell__(ParameterInitializer, metaclass=MetaCell):
             elems[e.alias] = e
         return elems
 
+    @property
+    def hierarchy(self):
+        """ The children, parents, depth and instance
+        counts of the cell in the reference graph. """
+        from spira.yevon.gdsii.hierarchy import HierarchyNode
+        return HierarchyNode(self)
+
+    @property
+    def summary(self):
+        """ The bounding box, layers and polygon and vertex counts
+        of the cell and all cells below it, cached per cell. """
+        from spira.yevon.gdsii.hierarchy import cell_summary
+        return cell_summary(self)
+
     def dependencies(self):
-        deps = self.elements.dependencies()
-        deps += self
-        return deps
+        from spira.yevon.gdsii.hierarchy import CellHierarchy
+        return CellHierarchy([self]).dependencies(self)
 
-    def flat_copy(self, level=-1):
+    def flat_copy(self, level=-1, as_array=False):
+        """ Flatten a copy of the cell. If `as_array` is `True`, all
+        polygons are streamed into a single `PolygonArray`, without
+        copying the cells and element lists on every level. """
         name = '{}_{}'.format(self.name, 'Flat'),
+        if as_array is True:
+            from spira.yevon.gdsii.flatten import flat_polygon_array
+            return Cell(name, elements=[flat_polygon_array(self.elements)])
         # return self.__class__(name, self.elements.flat_copy(level=level))
         return Cell(name, elements=self.elements.flat_copy(level=level))
 
+    def flat_polygons(self):
+        """ Yields `(layer, points, path)` for every polygon in the
+        flattened cell, without changing the cell (see `flat_polygons`). """
+        from spira.yevon.gdsii.flatten import flat_polygons
+        return flat_polygons(self.elements)
+
     def is_layer_in_cell(self, layer):
-        D = deepcopy(self)
-        for e in D.flatten():
-            return (e.layer == layer)
-        return False
+        return self.summary.has_layer(layer)
 
 
 class Cell(__Cell__):
@@ -137,7 +186,7 @@ class Cell(__Cell__):
     _next_uid = 0
 
     lcar = NumberParameter(default=100)
-    name = Parameter(fdef_name='create_name', doc='Name of the cell instance.')
+    name = CellNameParameter(fdef_name='create_name', doc='Name of the cell instance.')
 
     def get_alias(self):
         if not hasattr(self, '__alias__'):
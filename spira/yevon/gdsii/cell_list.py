@@ -1,87 +1,197 @@
+import weakref
+
 from spira.yevon.gdsii.cell import __Cell__
 from spira.core.typed_list import TypedList
 
 
 class CellList(TypedList):
+    """ List of cells with unique names.
+
+    The position of each cell is indexed by its name in a dict, so
+    that name lookups do not scan the list. Adding, assigning and
+    renaming a cell update its entry in place. A deleted cell leaves
+    an empty slot, which is removed the next time the list is used
+    by position, so that deleting by name does not shift the list.
+    """
 
     __item_type__ = __Cell__
 
+    def __init__(self, items=[]):
+        self._index = {}
+        self._slots = []
+        self._deleted = 0
+        self._version = 0
+        super().__init__(items)
+
+    def __compact__(self):
+        """ Removes the empty slots of the deleted cells. """
+        if self._deleted > 0:
+            self._slots = [c for c in self._slots if c is not None]
+            self._deleted = 0
+            self.__reindex__()
+
+    # NOTE: The cells in `_list` are the non-empty slots, in order.
+    @property
+    def _list(self):
+        self.__compact__()
+        return self._slots
+
+    @_list.setter
+    def _list(self, items):
+        self._slots = items
+        self._deleted = 0
+        self.__reindex__()
+
+    @property
+    def version(self):
+        """ Counts the changes to the cells in the list. """
+        return self._version
+
+    def __reindex__(self):
+        self._index = {}
+        for i, c in enumerate(self._slots):
+            if c is not None:
+                self._index.setdefault(c.name, i)
+                self.__register__(c)
+
+    def __register__(self, cell):
+        """ Registers the list with the cell, so that
+        renaming the cell updates the index of the list. """
+        lists = cell.__dict__.get('__cell_lists__')
+        if lists is None:
+            lists = cell.__dict__['__cell_lists__'] = weakref.WeakValueDictionary()
+        lists[id(self)] = self
+
+    def __rename__(self, cell, old_name):
+        i = self._index.get(old_name)
+        if (i is not None) and (self._slots[i] is cell):
+            del self._index[old_name]
+            self._index.setdefault(cell.name, i)
+
+    # NOTE: Lists with equal names, which are only created by
+    # assigning cells by position, are reindexed on every lookup.
+    def __find__(self, name):
+        """ Returns the slot of the first cell with the name, or None. """
+        if len(self._index) != len(self._slots) - self._deleted:
+            self.__reindex__()
+        i = self._index.get(name)
+        if (i is not None) and (self._slots[i].name != name):
+            self.__reindex__()
+            i = self._index.get(name)
+        return i
+
+    def __set_slot__(self, i, cell):
+        old = self._slots[i]
+        if self._index.get(old.name) == i:
+            del self._index[old.name]
+        self._slots[i] = cell
+        j = self._index.get(cell.name)
+        if (j is None) or (j > i):
+            self._index[cell.name] = i
+        self.__register__(cell)
+        self._version += 1
+
     def __getitem__(self, key):
         if isinstance(key, str):
-            for i in self._list:
-                if i.name == key: return i
-            raise IndexError("Structure " + key + " cannot be found in StructureList.")
+            i = self.__find__(key)
+            if i is None:
+                raise IndexError("Structure " + key + " cannot be found in StructureList.")
+            return self._slots[i]
         else:
             return list.__getitem__(self._list, key)
 
     def __setitem__(self, key, value):
         if isinstance(key, str):
-            for i in range(0, len(self._list)):
-                if self._list[i].name == key: 
-                    return list.__setitem__(self._list, i, value)
-            list.append(self._list, value)
+            i = self.__find__(key)
+            if i is None:
+                self.add(value)
+            else:
+                self.__set_slot__(i, value)
+        elif isinstance(key, slice):
+            list.__setitem__(self._list, key, value)
+            self.__reindex__()
+            self._version += 1
         else:
-            return list.__setitem__(self._list, key, value)
+            self.__set_slot__(range(len(self._list))[key], value)
 
     def __delitem__(self, key):
         if isinstance(key, str):
-            for i in range(0, len(self._list)):
-                if self._list[i].name == key:
-                    return list.__delitem__(self._list, i)
-                return
-            return list.__delitem__(self._list, key)
-        elif isinstance(key, Cell):
-            item = self.index(item=key.name)
-            return list.__delitem__(self._list, item)
+            i = self.__find__(key)
+        elif isinstance(key, __Cell__):
+            i = self.__find__(key.name)
+            if i is None:
+                raise ValueError("Cell " + key.name + " is not in CellList")
+        elif isinstance(key, slice):
+            list.__delitem__(self._list, key)
+            self.__reindex__()
+            self._version += 1
+            return
         else:
-            return list.__delitem__(self._list, key)
+            i = range(len(self._list))[key]
+        if i is None:
+            return
+        name = self._slots[i].name
+        if self._index.get(name) == i:
+            del self._index[name]
+        self._slots[i] = None
+        self._deleted += 1
+        self._version += 1
 
     def __contains__(self, item):
-        if isinstance(item, Cell):
+        if isinstance(item, __Cell__):
             name = item.name
         else:
             name = item
         if isinstance(name, str):
-            for i in self._list:
-                if i.name == name:
-                    return True
-            return False
+            return self.__find__(name) is not None
         else:
             return list.__contains__(self._list, item)
 
     def __fast_contains__(self, name):
-        for i in self._list:
-            if i.name == name:
-                return True
-        return False
+        return self.__find__(name) is not None
+
+    def get(self, name, default=None):
+        """ Returns the cell with the name, or the default. """
+        i = self.__find__(name)
+        if i is None:
+            return default
+        return self._slots[i]
 
     def is_empty(self):
         if len(self._list) == 0:
             return True
         for e in self._list:
-            if not e.is_empty(): 
+            if not e.is_empty():
                 return False
         return True
 
     def index(self, item):
         if isinstance(item, str):
-            for i in range(0, len(self._list)):
-                if list.__getitem__(self._list, i).name == item:
-                    return i
-            raise ValueError("Cell " + item + " is not in CellList")
+            self.__compact__()
+            i = self.__find__(item)
+            if i is None:
+                raise ValueError("Cell " + item + " is not in CellList")
+            return i
         else:
              return list.index(self._list, item)
 
+    def clear(self):
+        self._list = []
+        self._version += 1
+
     def add(self, item, overwrite=False):
         if item == None:
             return
         # if isinstance(item, (Cell, PCell)):
         if issubclass(type(item), __Cell__):
-            if overwrite:
-                self._list[item.name] = item
-                return
-            elif not self.__fast_contains__(item.name):
-                self._list.append(item)
+            i = self.__find__(item.name)
+            if i is None:
+                self._index[item.name] = len(self._slots)
+                self._slots.append(item)
+                self.__register__(item)
+                self._version += 1
+            elif overwrite:
+                self.__set_slot__(i, item)
         elif isinstance(item, (CellList, list, set)):
             for s in item:
                 self.add(s, overwrite)
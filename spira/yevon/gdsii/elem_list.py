@@ -33,11 +33,42 @@ class __ElementList__(TypedList, Transformable):
             raise ValueError('Element not found!')
         return r_val
 
+    def __setitem__(self, i, v):
+        self._list[i] = v
+        self.__added__([v])
+
     def __delitem__(self, key):
         for i in range(0, len(self._list)):
             if self._list[i] is key:
+                self.__changed__()
                 return list.__delitem__(self._list, i)
 
+    # NOTE: Lists of which a cell has cached its bounding box, its
+    # references or its summary are watched by the cell, and watch
+    # their elements, so that changing the list or one of its elements
+    # invalidates the cached values. Lists that are only built and
+    # read, like `polygons`, are not.
+    def __watched_parts__(self):
+        return [e for e in self._list if hasattr(e, '__watch__')]
+
+    def __added__(self, elems):
+        """ Watches the added elements if the list is watched,
+        and tells the watchers that the list has changed. """
+        if self.__dict__.get('__watchers__') is not None:
+            for e in elems:
+                if hasattr(e, '__watch__'):
+                    e.__watch__(self)
+        self.__changed__()
+
+    def extend(self, items):
+        n = len(self._list)
+        super().extend(items)
+        self.__added__(self._list[n:])
+
+    def clear(self):
+        super().clear()
+        self.__changed__()
+
     def __deepcopy__(self, memo):
         from copy import deepcopy
         L = self.__class__()
@@ -75,11 +106,14 @@ class ElementList(__ElementList__):
     def polygons(self):
         # from spira.yevon.gdsii.polygon import Polygon
         from spira.yevon.gdsii.polygon import __ShapeElement__
+        from spira.yevon.gdsii.polygon_array import PolygonArray
         elems = ElementList()
         for e in self._list:
             # if isinstance(e, Polygon):
             if isinstance(e, __ShapeElement__):
                 elems += e
+            elif isinstance(e, PolygonArray):
+                elems._list.extend(e.to_elements())
         return elems
 
     @property
@@ -93,14 +127,8 @@ class ElementList(__ElementList__):
 
     @property
     def bbox_info(self):
-        from spira.yevon.geometry.bbox_info import BoundaryInfo
-        if len(self) == 0:
-            return BoundaryInfo()
-        else:
-            SI = self._list[0].bbox_info
-            for e in self._list[1::]:
-                SI += e.bbox_info
-            return SI
+        from spira.yevon.geometry.bbox_info import bbox_info_from_elements
+        return bbox_info_from_elements(self._list)
 
     def nets(self, lcar=100):
         from spira.yevon.geometry.nets.net_list import NetList
@@ -154,6 +182,12 @@ class ElementList(__ElementList__):
             elems += e.flatten(level)
         return elems
 
+    def flat_polygons(self, transformation=None):
+        """ Yields `(layer, points, path)` for every polygon below
+        the elements, without copying them (see `flat_polygons`). """
+        from spira.yevon.gdsii.flatten import flat_polygons
+        return flat_polygons(self._list, transformation)
+
     # def flatten(self):
     #     from spira.yevon.gdsii.cell import Cell
     #     from spira.yevon.gdsii.sref import SRef
@@ -170,6 +204,23 @@ class ElementList(__ElementList__):
     #     else:
     #         return [self._list]
 
+    def bulk_extend(self, points_list, layers, transformations=None, as_array=False):
+        """ Creates polygons from a list of point arrays, using
+        `Polygon.from_arrays`, and adds them to the list. If `as_array`
+        is `True`, a single `PolygonArray` with a shared transformation
+        is added instead. """
+        from spira.yevon.gdsii.polygon import Polygon
+        from spira.yevon.gdsii.polygon_array import PolygonArray
+        n = len(self._list)
+        if as_array is True:
+            if isinstance(transformations, (list, tuple)):
+                raise ValueError('The polygons of a PolygonArray share a single transformation.')
+            self._list.append(PolygonArray(points_list, layers=layers, transformation=transformations))
+        else:
+            self._list.extend(Polygon.from_arrays(points_list, layers, transformations))
+        self.__added__(self._list[n:])
+        return self
+
     def isstored(self, pp):
         for e in self._list:
             return pp == e
@@ -184,6 +235,7 @@ class ElementList(__ElementList__):
 
     def append(self, item):
         from spira.yevon.gdsii.group import Group
+        n = len(self._list)
         if isinstance(item, Group):
             self._list.extend(item.elements)
         elif isinstance(item, self.__item_type__):
@@ -193,6 +245,7 @@ class ElementList(__ElementList__):
         else:
             error_message = "You are trying to add an element of type {} to {}. You can only add elements of type {}."
             raise ValueError(error_message.format(str(type(item)), str(self.__class__), str(self.__item_type__)))
+        self.__added__(self._list[n:])
 
 
 class ElementListParameter(ParameterDescriptor):
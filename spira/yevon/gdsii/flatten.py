@@ -0,0 +1,137 @@
+import numpy as np
+
+from spira.core.transformation import IDENTITY_MATRIX, affine_coefficients, apply_affine_to_array
+
+
+__all__ = ['flat_polygons', 'flat_polygon_array']
+
+
+# NOTE: A placement is a tuple of transforms, applied in order, and
+# is a single 3x3 matrix while all the transforms are affine, so that
+# the points of every polygon are transformed once.
+def __compose__(placement, transformation):
+    """ Returns the placement of an item with the transformation
+    (or its matrix), inside an item placed with `placement`. """
+    if isinstance(transformation, np.ndarray):
+        N = transformation
+    elif (transformation is None) or transformation.is_identity():
+        return placement
+    else:
+        N = transformation.matrix
+    if N is None:
+        return (transformation,) + placement
+    if (len(placement) == 1) and isinstance(placement[0], np.ndarray):
+        return (placement[0].dot(N),)
+    return (N,) + placement
+
+
+def __apply__(placement, points):
+    P = np.asarray(points, dtype=np.float64)
+    for t in placement:
+        if isinstance(t, np.ndarray):
+            if t is not IDENTITY_MATRIX:
+                P = apply_affine_to_array(affine_coefficients(t), P)
+        else:
+            P = t.apply_to_array(P)
+    return P
+
+
+# NOTE: References are visited once for every instance of their
+# parent, so their transform is cached on the reference. It is dropped
+# when a parameter of the reference changes, and is cached with the
+# matrix of the transformation, which is dropped when the
+# transformation is changed in place. A transformation that is not
+# affine has no matrix to check, so its transform is not cached.
+def __reference_transform__(ref):
+    """ Returns the matrix of the transform of a reference to its
+    cell, or the transform if it is not affine. """
+    from spira.core.transforms.translation import Translation
+    R = ref.transformation
+    N = R.matrix
+    if N is None:
+        return R + Translation(ref.midpoint)
+    cache = ref.__dict__.get('__flat_transform__')
+    if (cache is None) or (cache[0] is not N):
+        T = R + Translation(ref.midpoint)
+        cache = (N, T.matrix)
+        ref.__dict__['__flat_transform__'] = cache
+    return cache[1]
+
+
+def __is_affine__(placement):
+    return (len(placement) == 1) and isinstance(placement[0], np.ndarray)
+
+
+def __instances__(aref, placement, path):
+    """ Yields the elements, placement and path of
+    each instance of an array reference. """
+    from spira.core.transforms.translation import Translation
+    elems = aref.reference.elements
+    origin = aref.origin
+    base = __compose__(placement, aref.transformation + Translation(origin))
+    for index, p in enumerate(aref.positions.tolist()):
+        if __is_affine__(base) and __is_affine__(placement):
+            # NOTE: The instances only differ from the first instance
+            # by their offset in the grid, in the frame of the parent.
+            M = np.array(base[0])
+            M[:2, 2] += placement[0][:2, :2].dot((p[0] - origin[0], p[1] - origin[1]))
+            instance = (M,)
+        else:
+            instance = __compose__(placement, aref.transformation + Translation(p))
+        yield elems, instance, path + ((aref, index),)
+
+
+def flat_polygons(elements, transformation=None):
+    """ Walks the hierarchy below the elements and yields a tuple
+    `(layer, points, path)` for every polygon in the flattened layout.
+
+    The transforms of the references are accumulated into one affine
+    matrix on the way down, so that no cells, references or element
+    lists are copied or changed. The points are a float64 (N,2) array
+    that can be shared with the layout, and must not be changed in
+    place. The path is a tuple with the reference elements from the
+    top down, where an instance of an `ARef` is given as `(aref, index)`.
+
+    Examples
+    --------
+    >>> for layer, points, path in cell.flat_polygons():
+    ...     area += signed_area(points)
+    """
+    from spira.yevon.gdsii.group import __Group__
+    from spira.yevon.gdsii.polygon import __ShapeElement__
+    from spira.yevon.gdsii.polygon_array import PolygonArray
+    from spira.yevon.gdsii.sref import __RefElement__, ARef
+
+    stack = [(iter(elements), __compose__((IDENTITY_MATRIX,), transformation), ())]
+    while len(stack) > 0:
+        it, placement, path = stack[-1]
+        e = next(it, None)
+        if e is None:
+            stack.pop()
+        elif isinstance(e, tuple):
+            elems, instance, instance_path = e
+            stack.append((iter(elems), instance, instance_path))
+        elif isinstance(e, __ShapeElement__):
+            yield e.layer, __apply__(__compose__(placement, e.transformation), e.shape.points), path
+        elif isinstance(e, PolygonArray):
+            P = __apply__(__compose__(placement, e.transformation), e.points)
+            for layer, points in zip(e.polygon_layers, e.__split__(P)):
+                yield layer, points, path
+        elif isinstance(e, ARef):
+            stack.append((__instances__(e, placement, path), placement, path))
+        elif isinstance(e, __RefElement__):
+            T = __reference_transform__(e)
+            stack.append((iter(e.reference.elements), __compose__(placement, T), path + (e,)))
+        elif isinstance(e, __Group__):
+            stack.append((iter(e.elements), __compose__(placement, e.transformation), path))
+
+
+def flat_polygon_array(elements, transformation=None):
+    """ Returns the flattened polygons below the elements as a single
+    `PolygonArray`, without creating any intermediate element lists. """
+    from spira.yevon.gdsii.polygon_array import PolygonArray
+    points_list, layers = [], []
+    for layer, points, path in flat_polygons(elements, transformation):
+        points_list.append(points)
+        layers.append(layer)
+    return PolygonArray(points_list, layers=layers)
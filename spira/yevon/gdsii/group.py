@@ -21,6 +21,9 @@ class __Group__(ParameterInitializer):
     def create_elements(self, elems):
         return elems
 
+    def __watched_parts__(self):
+        return (self.elements,)
+
     def __iter__(self):
         return self.elements.__iter__()
 
@@ -37,9 +40,21 @@ class __Group__(ParameterInitializer):
             raise TypeError("Invalid type " + str(type(element)) + " in __Group__.__iadd__().")
         return self
 
+    # NOTE: The bounding box is cached with the element list, which is
+    # watched, so that changing the list, its elements or the cells
+    # below them drops it (see `__Cell__.__changed__`). A copy is
+    # returned, because callers transform it.
     @property
     def bbox_info(self):
-        return self.elements.bbox_info
+        from spira.yevon.geometry.bbox_info import BoundaryInfo
+        elems = self.elements
+        cache = self.__dict__.get('__bbox_info__')
+        if (cache is None) or (cache[0] is not elems):
+            BI = elems.bbox_info
+            elems.__watch__(self)
+            cache = (elems, (BI.west, BI.east, BI.north, BI.south))
+            self.__dict__['__bbox_info__'] = cache
+        return BoundaryInfo(*cache[1])
 
     def append(self, element):
         el = self.elements
@@ -0,0 +1,271 @@
+import numpy as np
+
+
+__all__ = ['CellHierarchy', 'CellSummary', 'reference_counts', 'cell_summary']
+
+
+# NOTE: The references of a cell are cached with its element list,
+# which the cell watches, so that a cell is only read again after
+# its elements have changed.
+def reference_counts(cell):
+    """ Returns a dict of the cells that are referenced by the
+    elements of the cell, with the number of instances of each,
+    in the order in which they are first referenced. """
+    from spira.yevon.gdsii.sref import __RefElement__, ARef
+    elems = cell.elements
+    cache = cell.__dict__.get('__references__')
+    if (cache is None) or (cache[0] is not elems):
+        counts = {}
+        for e in elems:
+            if isinstance(e, ARef):
+                counts[e.reference] = counts.get(e.reference, 0) + len(e)
+            elif isinstance(e, __RefElement__):
+                counts[e.reference] = counts.get(e.reference, 0) + 1
+        elems.__watch__(cell)
+        cache = (elems, counts)
+        cell.__dict__['__references__'] = cache
+    return cache[1]
+
+
+class CellSummary(object):
+    """ The bounding box, the layers and the polygon and vertex
+    counts per layer of a cell, including all cells below it,
+    as in the flattened cell. The counts are keyed by `layer.key`.
+
+    Examples
+    --------
+    >>> S = cell.summary
+    >>> S.has_layer(RDD.PLAYER.M1.METAL)
+    True
+    """
+
+    def __init__(self, bbox=None, layers=None, polygons=None, vertices=None):
+        self.bbox = bbox
+        self.layers = {} if layers is None else layers
+        self.polygons = {} if polygons is None else polygons
+        self.vertices = {} if vertices is None else vertices
+
+    def __repr__(self):
+        class_string = "[SPiRA: CellSummary] (layers {}, polygons {}, vertices {})"
+        return class_string.format(len(self.layers), self.polygon_count, self.vertex_count)
+
+    def __str__(self):
+        return self.__repr__()
+
+    @property
+    def bbox_info(self):
+        from spira.yevon.geometry.bbox_info import BoundaryInfo
+        if self.bbox is None:
+            return BoundaryInfo()
+        return BoundaryInfo(*self.bbox)
+
+    @property
+    def polygon_count(self):
+        return sum(self.polygons.values())
+
+    @property
+    def vertex_count(self):
+        return sum(self.vertices.values())
+
+    def has_layer(self, layer):
+        return layer.key in self.layers
+
+    def add(self, layer, polygons, vertices):
+        key = layer.key
+        self.layers.setdefault(key, layer)
+        self.polygons[key] = self.polygons.get(key, 0) + polygons
+        self.vertices[key] = self.vertices.get(key, 0) + vertices
+
+    def add_summary(self, other, count=1):
+        for key, layer in other.layers.items():
+            self.layers.setdefault(key, layer)
+            self.polygons[key] = self.polygons.get(key, 0) + count * other.polygons[key]
+            self.vertices[key] = self.vertices.get(key, 0) + count * other.vertices[key]
+
+
+def __summary_is_cached__(cell):
+    cache = cell.__dict__.get('__summary__')
+    return (cache is not None) and (cache[0] is cell.elements)
+
+
+def __create_summary__(cell):
+    """ Summarizes the elements of the cell, with the cached
+    summaries of the cells it references. """
+    from spira.yevon.gdsii.group import __Group__
+    from spira.yevon.gdsii.polygon import __ShapeElement__
+    from spira.yevon.gdsii.polygon_array import PolygonArray
+    from spira.yevon.gdsii.sref import __RefElement__, ARef
+    S = CellSummary()
+    stack = [iter(cell.elements)]
+    while len(stack) > 0:
+        e = next(stack[-1], None)
+        if e is None:
+            stack.pop()
+        elif isinstance(e, __ShapeElement__):
+            S.add(e.layer, 1, len(e.shape.points))
+        elif isinstance(e, PolygonArray):
+            polygons = np.bincount(e.layer_index, minlength=len(e.layers))
+            vertices = np.bincount(e.layer_index, weights=np.diff(e.offsets), minlength=len(e.layers))
+            for layer, n, k in zip(e.layers, polygons.tolist(), vertices.tolist()):
+                if n > 0:
+                    S.add(layer, n, int(k))
+        elif isinstance(e, __RefElement__):
+            count = len(e) if isinstance(e, ARef) else 1
+            S.add_summary(cell_summary(e.reference), count)
+        elif isinstance(e, __Group__):
+            stack.append(iter(e.elements))
+    BI = cell.bbox_info
+    if BI.__is_initialized__():
+        S.bbox = (BI.west, BI.east, BI.north, BI.south)
+    return S
+
+
+# NOTE: The summaries are cached like the references of a cell. A
+# change below a cell drops the summaries of the cells above it, so
+# that only those are summarized again, bottom-up in the order of
+# the hierarchy.
+def cell_summary(cell):
+    """ Returns the `CellSummary` of the cell. """
+    if not __summary_is_cached__(cell):
+        for c in CellHierarchy([cell]).topological_order:
+            if not __summary_is_cached__(c):
+                S = __create_summary__(c)
+                c.elements.__watch__(c)
+                c.__dict__['__summary__'] = (c.elements, S)
+    return cell.__dict__['__summary__'][1]
+
+
+class CellHierarchy(object):
+    """ The reference graph of the cells below a list of top cells.
+
+    Every cell is visited once, so that shared cells are not traversed
+    again for every path to them. The graph has the reference counts
+    of each cell, the reverse edges and a topological order, in which
+    each cell comes after all the cells it references.
+
+    Examples
+    --------
+    >>> H = CellHierarchy([top])
+    >>> H.parents[cell]
+    {top: 2}
+    """
+
+    def __init__(self, cells):
+        self.children = {}
+        self.parents = {}
+        self.topological_order = []
+        for cell in cells:
+            self.__visit__(cell)
+
+    def __visit__(self, top):
+        if top in self.children:
+            return
+        self.parents.setdefault(top, {})
+        self.children[top] = reference_counts(top)
+        stack = [(top, iter(self.children[top]))]
+        while len(stack) > 0:
+            cell, it = stack[-1]
+            child = next(it, None)
+            if child is None:
+                stack.pop()
+                self.topological_order.append(cell)
+                continue
+            parents = self.parents.setdefault(child, {})
+            parents[cell] = self.children[cell][child]
+            if child not in self.children:
+                self.children[child] = reference_counts(child)
+                stack.append((child, iter(self.children[child])))
+
+    def __len__(self):
+        return len(self.children)
+
+    def __contains__(self, cell):
+        return cell in self.children
+
+    def __dependency_order__(self, cell):
+        order, seen = [], set([cell])
+        stack = [iter(self.children[cell])]
+        while len(stack) > 0:
+            child = next(stack[-1], None)
+            if child is None:
+                stack.pop()
+            elif child not in seen:
+                seen.add(child)
+                order.append(child)
+                stack.append(iter(self.children[child]))
+        order.append(cell)
+        return order
+
+    def dependencies(self, cell):
+        """ Returns the cells below the cell, followed by the cell,
+        in the order of `Cell.dependencies`: each referenced cell
+        is followed by the cells below it. """
+        from spira.yevon.gdsii.cell_list import CellList
+        return CellList(self.__dependency_order__(cell))
+
+    def depth(self, cell):
+        """ The number of reference levels below the cell. """
+        depth = {}
+        for c in self.topological_order:
+            depth[c] = max([depth[d] + 1 for d in self.children[c]], default=0)
+            if c is cell:
+                return depth[c]
+        raise KeyError('Cell {} is not in the hierarchy.'.format(cell))
+
+    def instance_count(self, cell):
+        """ Returns a dict with the number of instances of each cell
+        below the cell, as in the flattened cell. """
+        cells = self.__dependency_order__(cell)
+        count = dict.fromkeys(cells, 0)
+        count[cell] = 1
+        for c in self.__top_down__(cells):
+            for d, n in self.children[c].items():
+                count[d] += count[c] * n
+        del count[cell]
+        return count
+
+    def __top_down__(self, cells):
+        """ Returns the cells in reverse topological order. """
+        cells = set(cells)
+        return [c for c in reversed(self.topological_order) if c in cells]
+
+
+class HierarchyNode(object):
+    """ The position of a cell in the reference graph,
+    returned by `cell.hierarchy`. """
+
+    def __init__(self, cell):
+        self.cell = cell
+        self.graph = CellHierarchy([cell])
+
+    def __repr__(self):
+        class_string = "[SPiRA: HierarchyNode] ({}, children {}, depth {})"
+        return class_string.format(self.cell.name, len(self.children), self.depth)
+
+    @property
+    def children(self):
+        """ The cells that are referenced by the cell. """
+        from spira.yevon.gdsii.cell_list import CellList
+        return CellList(list(self.graph.children[self.cell]))
+
+    @property
+    def parents(self):
+        """ The cells of the library of the cell that reference it. """
+        from spira import settings
+        from spira.yevon.gdsii.cell_list import CellList
+        library = self.cell.__dict__.get('library', None)
+        if library is None:
+            library = settings.get_current_library()
+        return CellList(list(library.hierarchy.parents.get(self.cell, {})))
+
+    @property
+    def depth(self):
+        return self.graph.depth(self.cell)
+
+    @property
+    def instance_count(self):
+        return self.graph.instance_count(self.cell)
+
+    @property
+    def dependencies(self):
+        return self.graph.dependencies(self.cell)
@@ -87,11 +87,27 @@ class Library(__Library__):
             referred_to_list.append(s.dependencies())
         return referred_to_list
 
+    # NOTE: The graph is cached with the cell list and its version,
+    # and the library watches its cells, so that it is dropped when
+    # the references of one of the cells change.
+    @property
+    def hierarchy(self):
+        """ The `CellHierarchy` of all cells in the library. """
+        from spira.yevon.gdsii.hierarchy import CellHierarchy
+        cells = self.cells
+        cache = self.__dict__.get('__hierarchy__')
+        if (cache is None) or (cache[0] is not cells) or (cache[1] != cells.version):
+            cache = (cells, cells.version, CellHierarchy(cells))
+            self.__dict__['__hierarchy__'] = cache
+            for c in cells:
+                c.__watch__(self)
+        return cache[2]
+
+    def __changed__(self):
+        self.__dict__.pop('__hierarchy__', None)
+
     def get_cell(self, cell_name):
-        for C in self.cells:
-            if C.name == cell_name:
-                return C
-        return None
+        return self.cells.get(cell_name)
 
     def is_empty(self):
         return len(self.cells) == 0
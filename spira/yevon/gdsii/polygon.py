@@ -1,4 +1,5 @@
 import gdspy
+import struct
 import pyclipper
 import numpy as np
 
@@ -38,13 +39,16 @@ class __ShapeElement__(__LayerElement__):
 
     shape = ShapeParameter()
 
+    def __watched_parts__(self):
+        return (self.shape, self.transformation)
+
     @property
     def points(self):
         return self.shape.points
         
     @property
     def area(self):
-        return gdspy.Polygon(self.shape.points).area()
+        return self.shape.area
 
     @property
     def count(self):
@@ -62,9 +66,19 @@ class __ShapeElement__(__LayerElement__):
     def bbox_info(self):
         return self.shape.bbox_info.transform_copy(self.transformation)
 
+    # NOTE: The key is built from the cached shape hash and the
+    # layer and transform keys, so it is not cached itself and
+    # stays valid when the shape or transform is changed in place.
+    # Equal polygons with a different split between shape and
+    # transformation have different keys.
+    @property
+    def key(self):
+        """ Structural identity of the element, used by
+        `__hash__`, `id_string` and the GDSII output. """
+        return (self.alias, self.layer.key, self.shape.geometric_hash, self.transformation.key)
+
     def id_string(self):
-        sid = '{} - hash {}'.format(self.__repr__(), self.shape.hash_string)
-        return sid
+        return '{} {} - hash {:016x} - {}'.format(self.alias, self.layer.key, self.shape.geometric_hash, self.transformation.key)
 
     def is_empty(self):
         """ Returns `False` is the polygon shape has no points. """
@@ -89,12 +103,39 @@ class __ShapeElement__(__LayerElement__):
         """ Converts a SPiRA polygon to a Gdspy polygon.
         The extra transformation parameter is the
         polygon edge ports. """
+        from spira import settings
         layer = RDD.GDSII.EXPORT_LAYER_MAP[self.layer]
         T = self.transformation + transformation
         shape = self.shape.transform_copy(T)
+        if settings.get_database_units():
+            return __GdspyGridPolygon__(shape.grid_points, settings.get_grids_per_unit(), layer=layer.number, datatype=layer.datatype)
         return gdspy.Polygon(points=shape.points, layer=layer.number, datatype=layer.datatype)
 
 
+class __GdspyGridPolygon__(gdspy.Polygon):
+    """ Gdspy polygon that writes its integer grid points to
+    GDSII directly, instead of rounding its float points. """
+
+    def __init__(self, grid_points, grids_per_unit, layer=0, datatype=0):
+        super().__init__(points=grid_points / grids_per_unit, layer=layer, datatype=datatype)
+        self.grid_points = grid_points
+        self.grids_per_unit = grids_per_unit
+
+    def to_gds(self, multiplier):
+        n = len(self.grid_points)
+        if (len(self.polygons) != 1) or (n > 8190) or (abs(multiplier / self.grids_per_unit - 1) > 1e-9):
+            return super().to_gds(multiplier)
+        xy = np.empty((n + 1, 2), dtype='>i4')
+        xy[:-1] = self.grid_points
+        xy[-1] = xy[0]
+        return b''.join([
+            struct.pack('>4Hh2Hh2H', 4, 0x0800, 6, 0x0D02, self.layers[0], 6, 0x0E02,
+                self.datatypes[0], 12 + 8 * n, 0x1003),
+            xy.tobytes(),
+            struct.pack('>2H', 4, 0x1100)
+        ])
+
+
 class __Polygon__(__ShapeElement__):
 
     enable_edges = BoolParameter(default=True)
@@ -187,6 +228,70 @@ class Polygon(__Polygon__):
         self.uid = Polygon._next_uid
         Polygon._next_uid += 1
 
+    @classmethod
+    def from_arrays(cls, points_list, layers, transformations=None):
+        """ Creates a list of polygons from a list of point arrays.
+
+        The values are validated in a single pass and written directly
+        to the parameter stores, which avoids the per-parameter setters.
+        The polygons are the same as the ones created with
+        `Polygon(shape=points, layer=layer, transformation=transformation)`.
+        The `layers` and `transformations` can either be a single value
+        or a list with a value for each polygon.
+
+        Examples
+        --------
+        >>> pts = [[[0,0], [1,0], [1,1]], [[0,0], [2,0], [2,2]]]
+        >>> elems = spira.Polygon.from_arrays(pts, layers=RDD.PLAYER.M1.METAL)
+        """
+        n = len(points_list)
+        if not isinstance(layers, (list, tuple)):
+            layers = [layers] * n
+        if not isinstance(transformations, (list, tuple)):
+            transformations = [transformations] * n
+        if (len(layers) != n) or (len(transformations) != n):
+            raise ValueError('Expected a layer and a transformation for each of the {} polygons.'.format(n))
+
+        P = shapes.Shape.__params__['points']
+        arrays = [p if isinstance(p, shapes.Shape) else P.__process__(p) for p in points_list]
+        points = [a for a in arrays if not isinstance(a, shapes.Shape)]
+        if len(points) > 0:
+            try:
+                pts = np.concatenate(points)
+            except ValueError:
+                pts = None
+            if (pts is None) or (pts.ndim != 2) or (pts.shape[1] != 2) or (not np.issubdtype(pts.dtype, np.number)):
+                raise ValueError('Polygon points must be numeric arrays of shape (n, 2).')
+
+        layer_values = cls.__preprocess_parameter_values__('layer', layers)
+        T = [t for t in transformations if t is not None]
+        T = iter(cls.__preprocess_parameter_values__('transformation', T))
+
+        # NOTE: Every object gets its own identity transform,
+        # unless it is a shared frozen transform.
+        identity = cls.__preprocess_parameter_values__('transformation', [None])[0]
+        if identity.is_frozen():
+            new_identity = lambda: identity
+        else:
+            new_identity = identity.__shallow_copy__
+
+        elems = []
+        for p, a, l, layer, t in zip(points_list, arrays, layers, layer_values, transformations):
+            if isinstance(a, shapes.Shape):
+                shape = a
+            else:
+                shape = shapes.Shape.__from_parameter_values__({'points': a, 'transformation': new_identity()})
+            if t is None:
+                transformation = new_identity()
+            else:
+                transformation = next(T)
+            e = cls.__from_parameter_values__({'shape': shape, 'layer': layer, 'transformation': transformation})
+            e.uid = Polygon._next_uid
+            Polygon._next_uid += 1
+            e.__keywords__ = {'shape': p, 'layer': l, 'transformation': t}
+            elems.append(e)
+        return elems
+
     def __repr__(self):
         if self is None:
             return 'Polygon is None!'
@@ -198,20 +303,18 @@ class Polygon(__Polygon__):
         return self.__repr__()
 
     def __hash__(self):
-        return hash(self.__repr__())
+        return hash(self.key)
 
     # NOTE: We are not copying the ports, so they
     # can be re-calculated for the transformed shape.
     def __deepcopy__(self, memo):
-        return self.__class__(
-            shape=deepcopy(self.shape),
-            layer=deepcopy(self.layer),
-            transformation=deepcopy(self.transformation)
-        )
+        return self.clone()
 
-    def id_string(self):
-        sid = '{} - hash {}'.format(self.__repr__(), self.shape.hash_string)
-        return sid
+    def clone(self):
+        P = super().clone()
+        P.uid = Polygon._next_uid
+        Polygon._next_uid += 1
+        return P
 
     def create_edges(self):
         """ Generate default edges for this polygon.
@@ -240,7 +343,7 @@ class Polygon(__Polygon__):
             if RDD.ENGINE.GEOMETRY == 'GMSH_ENGINE':
                 geometry = GmshGeometry(lcar=lcar,
                     process=self.layer.process,
-                    process_polygons=[deepcopy(self)])
+                    process_polygons=[self.clone()])
 
             cc = []
             for p in self.ports:
@@ -248,9 +351,9 @@ class Polygon(__Polygon__):
                     cc.append(p)
 
             F = filters.ToggledCompoundFilter()
-            F += filters.NetProcessLabelFilter(process_polygons=[deepcopy(self)])
+            F += filters.NetProcessLabelFilter(process_polygons=[self.clone()])
             F += filters.NetDeviceLabelFilter(device_ports=cc)
-            F += filters.NetEdgeFilter(process_polygons=[deepcopy(self)])
+            F += filters.NetEdgeFilter(process_polygons=[self.clone()])
 
             net = Net(name=self.process, geometry=geometry)
 
@@ -0,0 +1,285 @@
+import zlib
+import struct
+import gdspy
+import numpy as np
+
+from spira.yevon.gdsii.base import __Element__
+from spira.yevon.geometry.coord import CoordArray
+from spira.core.parameters.variables import *
+from spira.core.parameters.descriptor import Parameter
+from spira.yevon.process import get_rule_deck
+
+
+RDD = get_rule_deck()
+
+
+__all__ = ['PolygonArray']
+
+
+class PolygonArray(__Element__):
+    """ Element that stores many polygons in one contiguous buffer.
+
+    The points of all polygons are stored in a single (N,2) float64
+    or int64 array, and polygon `i` is given by the points from
+    `offsets[i]` to `offsets[i+1]`. Each polygon has the index of its
+    layer in `layers`, and all polygons share the transformation of
+    the array. Transforms, bounding boxes, areas and GDSII output are
+    computed for all polygons at once.
+
+    Indexing or iterating the array returns `Polygon` elements, which
+    can be changed without changing the array.
+
+    Examples
+    --------
+    >>> pts = [[[0,0], [1,0], [1,1]], [[0,0], [2,0], [2,2]]]
+    >>> P = spira.PolygonArray(pts, layers=RDD.PLAYER.M1.METAL)
+    >>> elems = P.to_elements()
+    """
+
+    points = NumpyArrayParameter(doc='The points of all polygons in one (N,2) array.')
+    offsets = NumpyArrayParameter(doc='The start of each polygon in the points, and the total number of points.')
+    layers = ListParameter(doc='The layers used by the polygons.')
+    layer_index = NumpyArrayParameter(doc='The index in `layers` of the layer of each polygon.')
+    buffer_hash = Parameter(fdef_name='create_buffer_hash', doc='Hash of the points, offsets and layer index buffers.')
+
+    def __init__(self, points_list=None, layers=None, transformation=None, **kwargs):
+        if points_list is not None:
+            arrays = [CoordArray(p).to_numpy_array() for p in points_list]
+            offsets = np.zeros(len(arrays) + 1, dtype=np.intp)
+            offsets[1:] = np.cumsum([len(p) for p in arrays])
+            kwargs['points'] = np.concatenate(arrays) if offsets[-1] > 0 else np.zeros((0, 2))
+            kwargs['offsets'] = offsets
+        # NOTE: With a `layer_index`, the layers are the layer table.
+        if (layers is not None) and ('layer_index' in kwargs):
+            kwargs['layers'] = layers
+        elif layers is not None:
+            n = len(kwargs['offsets']) - 1
+            if not isinstance(layers, (list, tuple)):
+                layers = [layers] * n
+            if len(layers) != n:
+                raise ValueError('Expected a layer for each of the {} polygons.'.format(n))
+            table, index = {}, []
+            for layer in layers:
+                index.append(table.setdefault(layer.key, (len(table), layer))[0])
+            kwargs['layers'] = [layer for i, layer in table.values()]
+            kwargs['layer_index'] = np.array(index, dtype=np.intp)
+        super().__init__(transformation=transformation, **kwargs)
+
+    @classmethod
+    def from_elements(cls, elements, transformation=None):
+        """ Creates an array from the polygons in a list of elements,
+        with their transformations applied to their points. """
+        from spira.yevon.gdsii.polygon import __ShapeElement__
+        points_list, layers = [], []
+        for e in elements:
+            if isinstance(e, __ShapeElement__):
+                points_list.append(e.shape.transform_copy(e.transformation).points)
+                layers.append(e.layer)
+            elif isinstance(e, PolygonArray):
+                points_list.extend(e.__expanded_points__())
+                layers.extend(e.polygon_layers)
+        return cls(points_list, layers=layers, transformation=transformation)
+
+    def __repr__(self):
+        class_string = "[SPiRA: PolygonArray] (polygons {}, vertices {}, layers {})"
+        return class_string.format(len(self), len(self.points), len(self.layers))
+
+    def __str__(self):
+        return self.__repr__()
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        from spira.yevon.gdsii.polygon import Polygon
+        if isinstance(index, slice):
+            raise TypeError('PolygonArray indices must be integers, not slices.')
+        index = range(len(self))[index]
+        o = self.offsets
+        T = self.transformation
+        return Polygon(
+            shape=np.array(self.points[o[index]:o[index+1]]),
+            layer=self.layers[self.layer_index[index]],
+            transformation=T.__shallow_copy__()
+        )
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    @property
+    def polygon_layers(self):
+        """ The layer of each polygon. """
+        return [self.layers[i] for i in self.layer_index.tolist()]
+
+    @property
+    def count(self):
+        return len(self.points)
+
+    def create_buffer_hash(self):
+        data = self.points.tobytes() + self.offsets.tobytes() + self.layer_index.tobytes()
+        return (str(self.points.dtype), zlib.crc32(data), zlib.adler32(data))
+
+    @property
+    def key(self):
+        """ Structural identity of the array, used by the GDSII output. """
+        layers = tuple(layer.key for layer in self.layers)
+        return ('PolygonArray', layers) + self.buffer_hash + (self.transformation.key,)
+
+    def id_string(self):
+        return '{} - {}'.format(self.__class__.__name__, self.key)
+
+    def is_empty(self):
+        return len(self.points) == 0
+
+    def __split__(self, points):
+        return np.split(points, self.offsets[1:-1])
+
+    def __expanded_points__(self):
+        """ Returns the transformed points of each polygon. """
+        T = self.transformation
+        if T.is_identity():
+            return self.__split__(self.points)
+        return self.__split__(T.apply_to_array(np.array(self.points, dtype=np.float64)))
+
+    def expand_transform(self):
+        """ Applies the transform to the points of all polygons. The
+        points are float64 afterwards, as for `Shape.transform_copy`. """
+        from spira.core.transforms.identity import IdentityTransform
+        if not self.transformation.is_identity():
+            self.points = self.transformation.apply_to_array(np.array(self.points, dtype=np.float64))
+            self.transformation = IdentityTransform()
+        return self
+
+    def flat_copy(self, level=-1):
+        """ Flatten a copy of the polygon array. """
+        return self.clone().expand_transform()
+
+    def flatten(self, level=-1):
+        """ Flatten the polygon array without creating a copy. """
+        return self.expand_transform()
+
+    def to_elements(self):
+        """ Returns the polygons as a list of `Polygon` elements. """
+        from spira.yevon.gdsii.polygon import Polygon
+        n = len(self)
+        T = self.transformation
+        transformations = None if T.is_identity() else [T.__shallow_copy__() for i in range(n)]
+        points = [np.array(P) for P in self.__split__(self.points)]
+        return Polygon.from_arrays(points, self.polygon_layers, transformations)
+
+    @property
+    def bbox_array(self):
+        """ The (xmin, ymin, xmax, ymax) of each polygon, as an
+        (N,4) array in the coordinates of the array. """
+        o = self.offsets
+        filled = np.diff(o) > 0
+        starts = o[:-1][filled]
+        x, y = self.points[:, 0], self.points[:, 1]
+        B = np.zeros((len(self), 4))
+        if len(starts) > 0:
+            B[filled, 0] = np.minimum.reduceat(x, starts)
+            B[filled, 1] = np.minimum.reduceat(y, starts)
+            B[filled, 2] = np.maximum.reduceat(x, starts)
+            B[filled, 3] = np.maximum.reduceat(y, starts)
+        return B[filled]
+
+    @property
+    def bbox_info(self):
+        """ The bounding box of the transformed polygon boxes,
+        which is the same as for a list of the polygons. """
+        from spira.yevon.geometry.bbox_info import BoundaryInfo
+        B = self.bbox_array
+        if len(B) == 0:
+            return BoundaryInfo()
+        A = self.transformation.affine
+        if A is None:
+            P = self.transformation.apply_to_array(np.array(self.points, dtype=np.float64))
+            LB, TR = np.min(P, 0), np.max(P, 0)
+            return BoundaryInfo(LB[0], TR[0], TR[1], LB[1])
+        a, b, tx, c, d, ty = A
+        x = B[:, [0, 2, 2, 0]]
+        y = B[:, [1, 1, 3, 3]]
+        # NOTE: The same operations as `apply_affine_to_array`.
+        X = x * a
+        X += y * b
+        X += tx
+        Y = x * c
+        Y += y * d
+        Y += ty
+        return BoundaryInfo(X.min(), X.max(), Y.max(), Y.min())
+
+    @property
+    def metrics(self):
+        """ The `PolygonMetrics` of the transformed polygons. """
+        from spira.yevon.geometry.metrics import polygon_metrics
+        P = np.array(self.points, dtype=np.float64)
+        if not self.transformation.is_identity():
+            P = self.transformation.apply_to_array(P)
+        return polygon_metrics(points=P, offsets=self.offsets)
+
+    @property
+    def area(self):
+        """ The total area of the polygons. """
+        return self.metrics.total_area
+
+    def convert_to_gdspy(self, transformation=None):
+        """ Converts the polygons to a single Gdspy polygon set,
+        with the GDSII layer and datatype of each polygon. """
+        from spira import settings
+        T = self.transformation + transformation
+        P = np.array(self.points, dtype=np.float64)
+        if not T.is_identity():
+            P = T.apply_to_array(P)
+        numbers, datatypes = [], []
+        for layer in self.layers:
+            L = RDD.GDSII.EXPORT_LAYER_MAP[layer]
+            numbers.append(L.number)
+            datatypes.append(L.datatype)
+        index = self.layer_index.tolist()
+        if settings.get_database_units():
+            grids_per_unit = settings.get_grids_per_unit()
+            grid_points = settings.grid_points(P, grids_per_unit)
+            P = grid_points / grids_per_unit
+        else:
+            grids_per_unit, grid_points = None, None
+        polygons = __GdspyPolygonArray__(P, self.offsets, grid_points, grids_per_unit)
+        polygons.layers = [numbers[i] for i in index]
+        polygons.datatypes = [datatypes[i] for i in index]
+        return polygons
+
+
+class __GdspyPolygonArray__(gdspy.PolygonSet):
+    """ Gdspy polygon set that keeps the ragged point buffer, and
+    rounds and writes all its polygons to GDSII at once. Integer
+    grid points are written directly, as for `__GdspyGridPolygon__`. """
+
+    def __init__(self, points, offsets, grid_points=None, grids_per_unit=None):
+        super().__init__([])
+        self.polygons = np.split(points, offsets[1:-1])
+        self.points = points
+        self.offsets = offsets
+        self.grid_points = grid_points
+        self.grids_per_unit = grids_per_unit
+
+    def to_gds(self, multiplier):
+        o = self.offsets
+        n = len(o) - 1
+        counts = np.diff(o)
+        if (n == 0) or (len(self.polygons) != n) or (counts.max() > 8190) or (counts.min() == 0):
+            return super().to_gds(multiplier)
+        if (self.grid_points is not None) and (abs(multiplier / self.grids_per_unit - 1) <= 1e-9):
+            xy = self.grid_points
+        else:
+            xy = np.round(self.points * multiplier)
+        # NOTE: Each polygon is closed with its first point.
+        xy = np.insert(xy, o[1:], xy[o[:-1]], axis=0).astype('>i4').tobytes()
+        data = []
+        start = 0
+        for k, layer, datatype in zip(counts.tolist(), self.layers, self.datatypes):
+            end = start + 8 * (k + 1)
+            data.append(struct.pack('>4Hh2Hh2H', 4, 0x0800, 6, 0x0D02, layer, 6, 0x0E02, datatype, 12 + 8 * k, 0x1003))
+            data.append(xy[start:end])
+            data.append(struct.pack('>2H', 4, 0x1100))
+            start = end
+        return b''.join(data)
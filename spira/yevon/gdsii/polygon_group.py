@@ -43,8 +43,8 @@ class PolygonGroup(Group, __LayerElement__):
                 # e2 = deepcopy(e2)
                 # shape1 = e1.shape.transform_copy(e1.transformation)
                 # shape2 = e2.shape.transform_copy(e2.transformation)
-                shape1 = deepcopy(e1.shape).transform(e1.transformation)
-                shape2 = deepcopy(e2.shape).transform(e2.transformation)
+                shape1 = e1.shape.clone().transform(e1.transformation)
+                shape2 = e2.shape.clone().transform(e2.transformation)
                 # if shape1 != shape2:
                 # if e1.shape != e2.shape:
                 # if (e1.shape != e2.shape) and (e1.layer == e2.layer):
@@ -93,8 +93,8 @@ class PolygonGroup(Group, __LayerElement__):
     @property
     def intersect(self):
         elems = ElementList()
-        el1 = deepcopy(self.elements)
-        el2 = deepcopy(self.elements)
+        el1 = self.elements.clone()
+        el2 = self.elements.clone()
         for i, e1 in enumerate(el1):
             for j, e2 in enumerate(el2):
                 if e1.shape != e2.shape:
@@ -27,6 +27,13 @@ class __RefElement__(__Element__):
     def __init__(self, transformation=None, **kwargs):
         super().__init__(transformation=transformation, **kwargs)
 
+    def __watched_parts__(self):
+        return (self.reference, self.transformation)
+
+    def __clear_cached_values_in_store__(self, name=None):
+        self.__dict__.pop('__flat_transform__', None)
+        super().__clear_cached_values_in_store__(name)
+
     @property
     def bbox_info(self):
         T = self.transformation + Translation(self.midpoint)
@@ -48,6 +55,10 @@ class SRef(__RefElement__):
     """
 
     midpoint = CoordParameter(default=(0,0))
+
+    # NOTE: Cells are unique by name in the
+    # library, so clones share the reference.
+    __clone_shared__ = ('reference',)
     
     def __init__(self, reference, midpoint=(0,0), alias=None, transformation=None, **kwargs):
         super().__init__(reference=reference, midpoint=midpoint, alias=alias, transformation=transformation, **kwargs)
@@ -61,7 +72,7 @@ class SRef(__RefElement__):
         return self.__repr__()
 
     def __hash__(self):
-        return hash(self.__repr__())
+        return hash(self.key)
 
     def __deepcopy__(self, memo):
         return SRef(
@@ -76,14 +87,16 @@ class SRef(__RefElement__):
     def __eq__(self, other):
         if not isinstance(other, SRef):
             return False
-        return (
-            (self.reference == other.ref) and
-            (self.midpoint == other.position) and
-            (self.transformation == other.transformation)
-        )
+        return self.key == other.key
+
+    @property
+    def key(self):
+        """ Structural identity of the reference, used by
+        `__hash__`, `__eq__`, `id_string` and the GDSII output. """
+        return (self.alias, self.reference.name, self.midpoint.x, self.midpoint.y, self.transformation.key)
 
     def id_string(self):
-        return self.__repr__()
+        return '{} {} - midpoint ({}, {}) - {}'.format(self.alias, self.reference.name, self.midpoint.x, self.midpoint.y, self.transformation.key)
 
     def dependencies(self):
         from spira.yevon.gdsii.cell_list import CellList
@@ -99,8 +112,8 @@ class SRef(__RefElement__):
 
         C = self.reference.__class__(
             name='{}_{}'.format(self.reference.name, self.transformation.id_string()),
-            elements=deepcopy(self.reference.elements),
-            ports=deepcopy(self.reference.ports))
+            elements=self.reference.elements.clone(),
+            ports=self.reference.ports.clone())
 
         T = self.transformation + spira.Translation(self.midpoint)
 
@@ -403,7 +416,165 @@ class SRef(__RefElement__):
 
 
 class ARef(__RefElement__):
-    pass
+    """
+    Array reference (ARef) places a cell on a grid of `columns`
+    by `rows` instances, with the given spacing between them.
+
+    The grid is defined in the frame of the reference, and then
+    transformed as a whole with the transformation and moved to
+    the origin, so that instance (i, j) is the same as a reference
+    with `Translation((i*spacing[0], j*spacing[1])) + transformation
+    + Translation(origin)`. The instances are not created, unless
+    they are indexed, and the array is written as one GDSII AREF.
+
+    Examples
+    --------
+    >>> cell = spira.Cell(name='Junction')
+    >>> aref = spira.ARef(cell, columns=100, rows=100, spacing=(10,10))
+    >>> aref[3,4]
+    [SPiRA: SRef] ("Junction", alias None, midpoint (30,40), transforms None)
+    """
+
+    columns = IntegerParameter(default=1)
+    rows = IntegerParameter(default=1)
+    spacing = CoordParameter(default=(0,0), doc='Distance between the columns and between the rows.')
+    origin = CoordParameter(default=(0,0), doc='Position of the first instance.')
+
+    positions = Parameter(fdef_name='create_positions', doc='The midpoints of the instances, as for an SRef.')
+    ports = Parameter(fdef_name='create_ports', doc='The ports of all instances.')
+
+    # NOTE: Cells are unique by name in the
+    # library, so clones share the reference.
+    __clone_shared__ = ('reference',)
+
+    def __init__(self, reference, columns=1, rows=1, spacing=(0,0), origin=(0,0), alias=None, transformation=None, **kwargs):
+        super().__init__(reference=reference, columns=columns, rows=rows, spacing=spacing, origin=origin, alias=alias, transformation=transformation, **kwargs)
+
+    def __repr__(self):
+        name = self.reference.name
+        ps = "[SPiRA: ARef] (\"{}\", {} x {}, spacing {}, origin {}, transforms {})"
+        return (ps.format(name, self.columns, self.rows, self.spacing, self.origin, self.transformation))
+
+    def __str__(self):
+        return self.__repr__()
+
+    def __len__(self):
+        return self.columns * self.rows
+
+    def __getitem__(self, index):
+        """ Returns instance `index`, or instance (i, j) for a column
+        and row, as an SRef. The instances are ordered by column. """
+        if isinstance(index, tuple):
+            i, j = index
+            index = range(self.columns)[i] * self.rows + range(self.rows)[j]
+        else:
+            index = range(len(self))[index]
+        p = self.positions[index]
+        return SRef(reference=self.reference, midpoint=(p[0], p[1]), alias=self.alias, transformation=self.transformation.__shallow_copy__())
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def __eq__(self, other):
+        if not isinstance(other, ARef):
+            return False
+        return self.key == other.key
+
+    @property
+    def key(self):
+        """ Structural identity of the array, used by
+        `__hash__`, `__eq__`, `id_string` and the GDSII output. """
+        return (self.alias, self.reference.name, self.columns, self.rows, self.spacing.x, self.spacing.y,
+            self.origin.x, self.origin.y, self.transformation.key)
+
+    def id_string(self):
+        return '{} {} - {} x {} - spacing ({}, {}) - origin ({}, {}) - {}'.format(self.alias, self.reference.name,
+            self.columns, self.rows, self.spacing.x, self.spacing.y, self.origin.x, self.origin.y, self.transformation.key)
+
+    @property
+    def grid(self):
+        """ The (columns*rows, 2) offsets of the instances in the frame of the reference. """
+        i, j = np.meshgrid(np.arange(self.columns), np.arange(self.rows), indexing='ij')
+        return np.column_stack((i.ravel() * self.spacing.x, j.ravel() * self.spacing.y)).astype(np.float64)
+
+    def create_positions(self):
+        T = self.transformation
+        V = T.apply_to_array(self.grid) - T.apply_to_array(np.zeros((1, 2)))
+        return V + (self.origin.x, self.origin.y)
+
+    def create_ports(self):
+        from spira.yevon.geometry.ports.port_list import PortList
+        P = self.reference.ports.transform_copy(self.transformation)._list
+        if len(P) == 0:
+            return PortList()
+        # NOTE: The midpoints of all instances are computed at once, and
+        # are ordered by instance and then by the ports of the reference.
+        M = np.array([[p.midpoint[0], p.midpoint[1]] for p in P], dtype=np.float64)
+        V = (self.positions[:, None, :] + M[None, :, :]).reshape(-1, 2)
+        return PortList([p.copy(midpoint=(x, y)) for (x, y), p in zip(V.tolist(), P * len(self))])
+
+    def dependencies(self):
+        from spira.yevon.gdsii.cell_list import CellList
+        d = CellList()
+        d.add(self.reference)
+        d.add(self.reference.dependencies())
+        return d
+
+    @property
+    def bbox_info(self):
+        """ The bounding box of the reference at the origin, grown
+        by the extent of the grid, without creating the instances. """
+        from spira.yevon.geometry.bbox_info import BoundaryInfo
+        BI = self.reference.bbox_info.transform(self.transformation)
+        if not BI.__is_initialized__():
+            return BI
+        T = self.transformation
+        w, h = (self.columns - 1) * self.spacing.x, (self.rows - 1) * self.spacing.y
+        corners = T.apply_to_array(np.array([[0, 0], [w, 0], [0, h], [w, h]], dtype=np.float64))
+        corners -= T.apply_to_array(np.zeros((1, 2)))
+        LB = corners.min(0) + (self.origin.x, self.origin.y)
+        TR = corners.max(0) + (self.origin.x, self.origin.y)
+        return BoundaryInfo(BI.west + LB[0], BI.east + TR[0], BI.north + TR[1], BI.south + LB[1])
+
+    def expand_transform(self):
+        return self
+
+    def srefs(self):
+        """ Returns the instances as a list of SRefs. """
+        from spira.yevon.gdsii.elem_list import ElementList
+        return ElementList(list(self))
+
+    def flat_copy(self, level=-1):
+        """ Flattens the instances into a single `PolygonArray`, in
+        which the polygons of the reference are repeated at each
+        instance. Other elements are transformed for each instance. """
+        from spira.yevon.gdsii.elem_list import ElementList
+        from spira.yevon.gdsii.polygon import __ShapeElement__
+        from spira.yevon.gdsii.polygon_array import PolygonArray
+        if level == 0: return ElementList(self.clone())
+        elems = self.reference.elements.flat_copy(level-1)
+        polygons = [e for e in elems if isinstance(e, (__ShapeElement__, PolygonArray))]
+        others = [e for e in elems if not isinstance(e, (__ShapeElement__, PolygonArray))]
+        T = self.transformation
+        V = self.positions
+        flat = ElementList()
+        if len(polygons) > 0:
+            A = PolygonArray.from_elements(polygons, transformation=T.__shallow_copy__()).expand_transform()
+            n, k = len(A.points), len(V)
+            points = (A.points[None, :, :] + V[:, None, :]).reshape((-1, 2))
+            offsets = np.append((A.offsets[:-1][None, :] + n * np.arange(k)[:, None]).ravel(), n * k)
+            flat += PolygonArray(points=points, offsets=offsets, layers=A.layers, layer_index=np.tile(A.layer_index, k))
+        for p in V.tolist():
+            for e in others:
+                flat += e.transform_copy(T + Translation(p))
+        return flat
+
+    def flatten(self, level=-1):
+        return self.flat_copy(level)
 
 
 
@@ -1,6 +1,6 @@
 from spira.core.parameters.initializer import ParameterInitializer
 from spira.core.parameters.descriptor import Parameter
-from spira.core.parameters.variables import NumberParameter
+from spira.core.parameters.variables import NumberParameter, BoolParameter
 from spira.yevon.process import get_rule_deck
 
 
@@ -17,6 +17,7 @@ class UnitGridContainer(ParameterInitializer):
     units_per_grid = Parameter(fdef_name='create_units_per_grid')
     unit = NumberParameter(default=RDD.GDSII.UNIT)
     grid = NumberParameter(default=RDD.GDSII.GRID)
+    database_units = BoolParameter(default=False, doc='Run booleans and GDSII output on integer grid units.')
 
     def create_grids_per_unit(self):
         return self.unit / self.grid
@@ -13,6 +13,7 @@ __all__ = [
     'bbox_info_from_point_list',
     'bbox_info_from_numpy_array',
     'bbox_info_from_coord',
+    'bbox_info_from_elements',
     'bbox_info_opposite_boundary_port',
     'bbox_info_cell'
 ]
@@ -321,6 +322,47 @@ def bbox_info_from_coord(coord):
     return BoundaryInfo(coord[0], coord[0], coord[1], coord[1])
 
 
+def bbox_info_from_elements(elements):
+    """ Generate bounding box info from a list of elements.
+
+    The shape bounding boxes of the polygons are stacked into an (N,4)
+    array, and their corners are transformed and reduced at once. Other
+    elements, and polygons with a transform that is not affine, use
+    their own `bbox_info`.
+    """
+    from spira.yevon.gdsii.polygon import __ShapeElement__
+    boxes, coefficients, sides = [], [], []
+    for e in elements:
+        if isinstance(e, __ShapeElement__):
+            A = e.transformation.affine
+            if A is not None:
+                B = e.shape.bbox_array
+                if B is not None:
+                    boxes.append(B)
+                    coefficients.append(A)
+                continue
+        BI = e.bbox_info
+        if BI.__is_initialized__():
+            sides.append((BI.west, BI.south, BI.east, BI.north))
+    if len(boxes) > 0:
+        B = np.array(boxes)
+        a, b, tx, c, d, ty = np.array(coefficients).T[:, :, None]
+        x = B[:, [0, 2, 2, 0]]
+        y = B[:, [1, 1, 3, 3]]
+        # NOTE: The same operations as `apply_affine_to_array`.
+        X = x * a
+        X += y * b
+        X += tx
+        Y = x * c
+        Y += y * d
+        Y += ty
+        sides.append((X.min(), Y.min(), X.max(), Y.max()))
+    if len(sides) == 0:
+        return BoundaryInfo()
+    west, south, east, north = zip(*sides)
+    return BoundaryInfo(min(west), max(east), max(north), min(south))
+
+
 def bbox_info(shape):
     """ Generate bounding box info from a shape-like object """
     from spira.yevon.geometry import shapes
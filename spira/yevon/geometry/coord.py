@@ -1,9 +1,11 @@
 import math
+import weakref
 import numpy as np
 from spira.core.parameters.restrictions import RestrictType
 from spira.core.parameters.descriptor import RestrictedParameter
 from spira.core.transformable import Transformable
 from spira.core.parameters.processors import ProcessorTypeCast
+from spira.core.frozen import __Frozen__, freeze_value, get_frozen_values
 
 
 class Coord(Transformable):
@@ -104,6 +106,9 @@ class Coord(Transformable):
     def transform_copy(self, transformation):
         return transformation.apply_to_coord(Coord(self.x, self.y))
 
+    def clone(self):
+        return Coord(self.x, self.y)
+
     def move(self, position):
         """ Move the coordinate by a displacement vector. """
         self.x += position[0]
@@ -138,15 +143,185 @@ class Coord(Transformable):
     def to_list(self):
         return [self.x, self.y]
 
+    def freeze(self):
+        """ Returns the shared, immutable and hashable
+        coordinate with the same value. """
+        return freeze_value(__FrozenCoord__, (self.x, self.y), lambda: Coord(self.x, self.y))
+
+    def is_frozen(self):
+        return False
+
+
+class __FrozenCoord__(__Frozen__, Coord):
+    """ Interned coordinate that cannot be changed. In-place
+    arithmetic returns a new coordinate instead. """
+
+    __interned__ = weakref.WeakValueDictionary()
+
+    def __frozen_key__(self):
+        return (self.x, self.y)
+
+    def __iadd__(self, other):
+        return self.__add__(other)
+
+    def __isub__(self, other):
+        return self.__sub__(other)
+
+    def __imul__(self, other):
+        return self.__mul__(other)
+
+
+class CoordArray(np.ndarray):
+    """ Array of coordinates, stored as an (N,2) float64 or
+    int64 array instead of a list of `Coord` objects.
+
+    Transforms, grid snapping, distances and angles are
+    computed for all coordinates at once. Indexing a single
+    row returns a `Coord`, which is only created at the
+    boundary with the rest of the API.
+
+    Example
+    -------
+    >>> c = CoordArray([[0,0], [1,0], [1,1]])
+    >>> c.distance((0,0))
+    array([0.        , 1.        , 1.41421356])
+    """
+
+    def __new__(cls, coords=None, dtype=None):
+        if coords is None:
+            coords = np.ndarray((0, 2))
+        elif isinstance(coords, Coord):
+            coords = [(coords.x, coords.y)]
+        elif isinstance(coords, (list, tuple)) and len(coords) and isinstance(coords[0], Coord):
+            coords = [(c.x, c.y) for c in coords]
+        A = np.asarray(coords, dtype=dtype)
+        if A.dtype.kind in 'iub':
+            A = A.astype(np.int64, copy=False)
+        elif A.dtype != np.float64:
+            A = A.astype(np.float64)
+        if A.size == 0:
+            A = A.reshape((0, 2))
+        if (A.ndim != 2) or (A.shape[1] != 2):
+            raise ValueError('CoordArray requires an (N,2) array, not {}'.format(A.shape))
+        return A.view(cls)
+
+    def __array_wrap__(self, array, context=None):
+        # NOTE: Reductions and column slices are not
+        # coordinates, so they are returned as plain arrays.
+        if (array.ndim == 2) and (array.shape[1] == 2):
+            return array.view(CoordArray)
+        if array.ndim == 0:
+            return array[()]
+        return array.view(np.ndarray)
+
+    def __getitem__(self, index):
+        value = np.ndarray.__getitem__(self, index)
+        if not isinstance(value, np.ndarray):
+            return value
+        if isinstance(index, (int, np.integer)):
+            return Coord(value[0], value[1])
+        if (value.ndim == 2) and (value.shape[1] == 2):
+            return value
+        return value.view(np.ndarray)
+
+    def __repr__(self):
+        return 'CoordArray({})'.format(self.tolist())
+
+    @property
+    def x(self):
+        """ Returns the x coordinates """
+        return self.view(np.ndarray)[:, 0]
+
+    @property
+    def y(self):
+        """ Returns the y coordinates """
+        return self.view(np.ndarray)[:, 1]
+
+    def to_coords(self):
+        """ Returns a list of `Coord` objects. """
+        return [Coord(x, y) for x, y in self.tolist()]
+
+    def to_numpy_array(self):
+        return self.view(np.ndarray)
+
+    def clone(self):
+        return self.copy()
+
+    def transform(self, transformation):
+        """ Transforms the coordinates in place. Integer
+        coordinates are rounded to the nearest integer. """
+        T = transformation.apply_to_array(self.view(np.ndarray))
+        if self.dtype.kind == 'i':
+            T = np.floor(T + 0.5)
+        np.copyto(self, T, casting='unsafe')
+        return self
+
+    def transform_copy(self, transformation):
+        """ Returns the transformed coordinates as a
+        new float64 array, even for integer coordinates. """
+        return CoordArray(transformation.apply_to_array(self.view(np.ndarray).astype(np.float64)))
+
+    def move(self, position):
+        """ Moves the coordinates by a displacement vector. """
+        self += (position[0], position[1])
+        return self
+
+    def move_copy(self, position):
+        return self + (position[0], position[1])
+
+    def snap_to_grid(self, grids_per_unit=None):
+        """ Snaps the coordinates in place to the given or current
+        grid. Integer coordinates are already on the grid. """
+        from spira import settings
+        if self.dtype.kind == 'i':
+            return self
+        if grids_per_unit is None:
+            grids_per_unit = settings.get_grids_per_unit()
+        A = self.view(np.ndarray)
+        A *= grids_per_unit
+        A += 0.5
+        np.floor(A, out=A)
+        A /= grids_per_unit
+        return self
+
+    def distance(self, other):
+        """ The distances to another coordinate, or to
+        each coordinate of an array of the same length. """
+        D = np.subtract(other, self.view(np.ndarray))
+        return np.sqrt(D[..., 0]**2 + D[..., 1]**2)
+
+    def angle_deg(self, other=(0.0, 0.0)):
+        """ The angles with respect to another coordinate, in degrees """
+        return 180.0 / np.pi * self.angle_rad(other)
+
+    def angle_rad(self, other=(0.0, 0.0)):
+        """ The angles with respect to another coordinate, in radians """
+        D = np.subtract(self.view(np.ndarray), other)
+        return np.arctan2(D[..., 1], D[..., 0])
+
 
 RESTRICT_COORD = RestrictType(Coord)
 
 
+class ProcessorCoord(ProcessorTypeCast):
+    """ Casts the value to a coordinate, and freezes
+    it when frozen values are enabled. """
+
+    def __init__(self):
+        ProcessorTypeCast.__init__(self, Coord)
+
+    def process(self, value, obj=None):
+        value = ProcessorTypeCast.process(self, value, obj)
+        if get_frozen_values():
+            return value.freeze()
+        return value
+
+
 def CoordParameter(local_name=None, restriction=None, preprocess=None, **kwargs):
     if 'default' not in kwargs:
         kwargs['default'] = Coord(0,0)
     R = RESTRICT_COORD & restriction
-    P = ProcessorTypeCast(Coord) + preprocess
+    P = ProcessorCoord() + preprocess
     return RestrictedParameter(local_name, restriction=R, preprocess=P, **kwargs)
 
 
@@ -0,0 +1,129 @@
+import numpy as np
+
+
+__all__ = [
+    'PolygonMetrics',
+    'signed_area',
+    'ragged_points',
+    'polygon_metrics',
+    'element_metrics'
+]
+
+
+def signed_area(points):
+    """ Returns the signed shoelace area of a closed polygon,
+    positive when the points are counterclockwise. """
+    P = np.asarray(points, dtype=np.float64).reshape((-1, 2))
+    if len(P) < 3:
+        return 0.0
+    x, y = P[:, 0], P[:, 1]
+    a = np.dot(x[:-1], y[1:]) - np.dot(x[1:], y[:-1]) + x[-1] * y[0] - x[0] * y[-1]
+    return 0.5 * float(a)
+
+
+def ragged_points(points_list):
+    """ Returns the points of all polygons in one (N,2) float64 array,
+    and the offsets of the polygons, so that polygon `i` is given
+    by `points[offsets[i]:offsets[i+1]]`. """
+    arrays = [np.asarray(p, dtype=np.float64).reshape((-1, 2)) for p in points_list]
+    offsets = np.zeros(len(arrays) + 1, dtype=np.intp)
+    offsets[1:] = np.cumsum([len(p) for p in arrays])
+    if offsets[-1] == 0:
+        return np.zeros((0, 2)), offsets
+    return np.concatenate(arrays), offsets
+
+
+class PolygonMetrics(object):
+    """ The area, orientation, perimeter, centroid and bounding box
+    of a list of polygons, as arrays with one entry per polygon.
+
+    Examples
+    --------
+    >>> M = polygon_metrics([[[0,0], [2,0], [2,1], [0,1]]])
+    >>> M.area
+    array([2.])
+    """
+
+    def __init__(self, signed_area, perimeter, centroid, bbox):
+        self.signed_area = signed_area
+        self.perimeter = perimeter
+        self.centroid = centroid
+        self.bbox = bbox
+
+    def __len__(self):
+        return len(self.signed_area)
+
+    def __repr__(self):
+        return '[SPiRA: PolygonMetrics] (polygons {}, area {})'.format(len(self), self.total_area)
+
+    @property
+    def area(self):
+        return np.abs(self.signed_area)
+
+    @property
+    def orientation(self):
+        """ Counterclockwise polygons give +1 and clockwise polygons -1. """
+        return np.sign(self.signed_area)
+
+    @property
+    def total_area(self):
+        return float(self.area.sum())
+
+
+def polygon_metrics(points_list=None, points=None, offsets=None):
+    """ Computes the metrics of many polygons in one pass over their
+    points, given as a list of point arrays or as a ragged buffer
+    of `points` and `offsets` (see `ragged_points`). """
+    if points is None:
+        points, offsets = ragged_points(points_list)
+    n = len(offsets) - 1
+    counts = np.diff(offsets)
+    filled = counts > 0
+    starts = offsets[:-1][filled]
+
+    # NOTE: The next point of the last point of each
+    # polygon is its first point, so that it is closed.
+    nxt = np.arange(1, len(points) + 1)
+    nxt[offsets[1:][filled] - 1] = starts
+
+    x, y = points[:, 0], points[:, 1]
+    xn, yn = x[nxt], y[nxt]
+    cross = x * yn - xn * y
+    length = np.sqrt((xn - x)**2 + (yn - y)**2)
+
+    A = np.zeros(n)
+    L = np.zeros(n)
+    C = np.zeros((n, 2))
+    B = np.zeros((n, 4))
+    if len(starts) > 0:
+        A[filled] = 0.5 * np.add.reduceat(cross, starts)
+        L[filled] = np.add.reduceat(length, starts)
+        cx = np.add.reduceat((x + xn) * cross, starts)
+        cy = np.add.reduceat((y + yn) * cross, starts)
+        mean = np.add.reduceat(points, starts) / counts[filled, None]
+        a = A[filled]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            C[filled] = np.where((a != 0)[:, None], np.column_stack((cx, cy)) / (6.0 * a[:, None]), mean)
+        B[filled, 0] = np.minimum.reduceat(x, starts)
+        B[filled, 1] = np.minimum.reduceat(y, starts)
+        B[filled, 2] = np.maximum.reduceat(x, starts)
+        B[filled, 3] = np.maximum.reduceat(y, starts)
+    return PolygonMetrics(signed_area=A, perimeter=L, centroid=C, bbox=B)
+
+
+def element_metrics(elements):
+    """ Computes the metrics of the shape elements in an `ElementList`,
+    in the coordinates of the list, so with their transformations. """
+    from spira.yevon.gdsii.polygon import __ShapeElement__
+    from spira.yevon.gdsii.polygon_array import PolygonArray
+    points_list = []
+    for e in elements:
+        if isinstance(e, __ShapeElement__):
+            P = e.shape.points
+            T = e.transformation
+            if (T is not None) and (not T.is_identity()):
+                P = T.apply_to_array(np.array(P, dtype=np.float64))
+            points_list.append(P)
+        elif isinstance(e, PolygonArray):
+            points_list.extend(e.__expanded_points__())
+    return polygon_metrics(points_list)
@@ -5,7 +5,7 @@ import spira.all as spira
 from copy import deepcopy
 from spira.core.parameters.variables import GraphParameter, StringParameter
 from spira.core.parameters.descriptor import Parameter
-from spira.yevon.geometry.coord import Coord
+from spira.yevon.geometry.coord import Coord, CoordArray
 from spira.yevon.vmodel.geometry import GeometryParameter
 from spira.yevon.geometry.ports.base import __Port__
 from spira.yevon.process import get_rule_deck
@@ -75,8 +75,9 @@ class Net(__Net__):
 
         for n, triangle in enumerate(self.triangles):
             self._add_edges(n, triangle, A)
+        positions = self._triangle_positions()
         for n, triangle in enumerate(self.triangles):
-            self._add_positions(n, triangle)
+            self._add_positions(n, triangle, positions[n])
 
     def _add_edges(self, n, tri, A):
         def update_adj(self, t1, adj_mat, v_pair):
@@ -91,17 +92,18 @@ class Net(__Net__):
         for v_pair in list(zip(v1, v2)):
             update_adj(self, n, A, v_pair)
 
-    def _add_positions(self, n, triangle):
+    def _triangle_positions(self):
+        """ Returns the centers of all triangles, scaled to the grid. """
         from spira import settings
-        pp = self.mesh_data.points
-        grids_per_unit = settings.get_grids_per_unit()
-        n1, n2, n3 = pp[triangle[0]], pp[triangle[1]], pp[triangle[2]]
-        x = (n1[0] + n2[0] + n3[0]) / 3
-        y = (n1[1] + n2[1] + n3[1]) / 3
-        x = x * grids_per_unit
-        y = y * grids_per_unit
+        pp = self.mesh_data.points[:, 0:2]
+        T = np.asarray(self.triangles).reshape(-1, 3)
+        C = CoordArray((pp[T[:, 0]] + pp[T[:, 1]] + pp[T[:, 2]]) / 3)
+        C *= settings.get_grids_per_unit()
+        return C
+
+    def _add_positions(self, n, triangle, position):
         self.g.node[n]['vertex'] = triangle
-        self.g.node[n]['position'] = Coord(x, y)
+        self.g.node[n]['position'] = position
         self.g.node[n]['display'] = RDD.DISPLAY.STYLE_SET[RDD.PLAYER.METAL]
 
     def create_mesh_data(self):
@@ -177,7 +177,7 @@ class __Port__(ParameterInitializer, metaclass=MetaPort):
 
     def move(self, coordinate):
         """ Move the port midpoint to coordinate. """
-        self.midpoint.move(coordinate)
+        self.midpoint = self.midpoint.move_copy(coordinate)
         return self
 
     def distance(self, other):
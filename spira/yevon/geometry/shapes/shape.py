@@ -11,9 +11,10 @@ from spira.yevon import constants
 from spira.yevon.geometry import bbox_info
 from spira.core.parameters.variables import *
 from spira.core.transformable import Transformable
+from spira.core.clone import share_array
 from spira.yevon.geometry.ports.port_list import PortList
 from spira.core.parameters.variables import ListParameter
-from spira.yevon.geometry.coord import CoordParameter, Coord
+from spira.yevon.geometry.coord import CoordParameter, Coord, CoordArray
 from spira.core.parameters.initializer import ParameterInitializer
 from spira.core.parameters.processors import ProcessorTypeCast
 from spira.core.parameters.descriptor import ParameterDescriptor, Parameter
@@ -23,7 +24,7 @@ from spira.yevon.process import get_rule_deck
 RDD = get_rule_deck()
 
 
-__all__ = ['Shape', 'ShapeParameter', 'PointArrayParameter', 'shape_edge_ports']
+__all__ = ['Shape', 'ShapeParameter', 'PointArrayParameter', 'shape_edge_ports', 'intersections_many']
 
 
 class PointArrayParameter(ParameterDescriptor):
@@ -70,6 +71,10 @@ class __Shape__(Transformable, ParameterInitializer):
     center = CoordParameter()
     clockwise = BoolParameter(default=False)
     points = PointArrayParameter(fdef_name='create_points')
+    grid_points = Parameter(fdef_name='create_grid_points', doc='The points in integer grid units.')
+    geometric_hash = Parameter(fdef_name='create_geometric_hash', doc='Hash of the grid points, independent of the start vertex.')
+    signed_area = Parameter(fdef_name='create_signed_area', doc='The shoelace area, positive for counterclockwise points.')
+    bbox_array = Parameter(fdef_name='create_bbox_array', doc='The (xmin, ymin, xmax, ymax) of the points, or None if empty.')
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
@@ -77,6 +82,26 @@ class __Shape__(Transformable, ParameterInitializer):
     def create_points(self, points):
         return points
 
+    def create_grid_points(self):
+        from spira.settings import grid_points
+        return CoordArray(share_array(grid_points(self.points)))
+
+    def create_geometric_hash(self):
+        from spira.yevon.utils.geometry import points_hash
+        return points_hash(self.grid_points)
+
+    def create_bbox_array(self):
+        pts = self.points
+        if len(pts) == 0:
+            return None
+        LB = np.min(pts, 0)
+        TR = np.max(pts, 0)
+        return (LB[0], LB[1], TR[0], TR[1])
+
+    def create_signed_area(self):
+        from spira.yevon.geometry.metrics import signed_area
+        return signed_area(self.points)
+
     @property
     def x_coords(self):
         """ Returns the x coordinates """
@@ -87,6 +112,12 @@ class __Shape__(Transformable, ParameterInitializer):
         """ Returns the y coordinates """
         return self.points[:, 1]
 
+    @property
+    def coords(self):
+        """ Returns a read-only `CoordArray` view of the points. Use
+        `transform` or set `points` to change the shape. """
+        return CoordArray(share_array(self.points))
+
     @property
     def is_closed(self):
         return True
@@ -102,23 +133,16 @@ class __Shape__(Transformable, ParameterInitializer):
     def orientation(self):
         """ Returns the orientation of the shape.
         Counterclockwise returns +1 and clockwise returns -1. """
-        pts = self.points
-        T = np.roll(np.roll(pts, 1, 1), 1, 0)
-        return -np.sign(sum(np.diff(pts * T, 1, 1)))
+        return np.sign(self.signed_area)
 
     @property
     def area(self):
         """ Returns the area of the shape. """
-        pts = self.points
-        T = np.roll(np.roll(pts, 1, 1), 1, 0)
-        return sum(abs(np.diff(pts * T, 1, 1))) * 0.5
+        return abs(self.signed_area)
 
     @property
     def hash_string(self):
-        import hashlib
-        pts = np.array([self.points])
-        hash_key = np.sort([hashlib.sha1(p).hexdigest() for p in pts])
-        return str(hash_key)
+        return '{:016x}'.format(self.geometric_hash)
 
     @property
     def count(self):
@@ -162,7 +186,7 @@ class __Shape__(Transformable, ParameterInitializer):
 
     def move(self, pos):
         p = np.array([pos[0], pos[1]])
-        self.points += p
+        self.points = self.points + p
         return self
 
     def transform(self, transformation):
@@ -217,39 +241,11 @@ class __Shape__(Transformable, ParameterInitializer):
 
     def intersections(self, other_shape):
         """ the intersections with this shape and the other shape """
-        from spira.yevon.utils.geometry import intersection, lines_cross, lines_coincide, sort_points_on_line, points_unique
-
-        s = Shape(self.points)
-        s.remove_straight_angles()
-        segments1 = s.segments()
-        if len(segments1) < 1:
-            return []
-
-        s = Shape(other_shape)
-        s.remove_straight_angles()
-        segments2 = s.segments()
-        if len(segments2) < 1:
+        A = [__intersection_segments__(self)]
+        B = [__intersection_segments__(other_shape)]
+        if (A[0] is None) or (B[0] is None):
             return []
-
-        intersections = []
-        for s1 in segments1:
-            intersected_points = []
-            for s2 in segments2:
-                if lines_cross(s1[0], s1[1], s2[0], s2[1], inclusive=True):
-                    # print(s1, s2)
-                    c = [intersection(s1[0], s1[1], s2[0], s2[1])]
-                    # print(c)
-                    # print('wjefbwefb')
-                    intersected_points += c
-
-            # FIXME Must this be a 0 or a 1!!!
-            if len(intersected_points) > 0:
-            # if len(intersected_points) > 1:
-                pl = sort_points_on_line([*s1, *intersected_points])
-                intersections += [pl[1], pl[2]]
-
-        intersections = points_unique(intersections)
-        return Shape(intersections)
+        return __intersections__(A, B).get((0, 0), Shape([]))
 
     def insert(self, i, item):
         """ Inserts a list of points. """
@@ -346,41 +342,151 @@ def shape_edge_ports(shape, layer, local_pid='None', center=(0,0), loc_name=''):
 
     edges = PortList()
 
-    xpts = list(shape.x_coords)
-    ypts = list(shape.y_coords)
-
-    n = len(xpts)
-
-    xpts.append(xpts[0])
-    ypts.append(ypts[0])
+    pts = shape.coords
+    n = len(pts)
+    if n == 0:
+        return edges
 
-    clockwise = 0
-    for i in range(0, n):
-        clockwise += ((xpts[i+1] - xpts[i]) * (ypts[i+1] + ypts[i]))
+    nxt = np.roll(pts, -1, axis=0)
+    dx = nxt.x - pts.x
+    dy = nxt.y - pts.y
 
-    if layer.name == 'BBOX': bbox = True
-    else: bbox = False
+    clockwise = np.sign(np.sum(dx * (nxt.y + pts.y)))
 
     layer = RDD.GDSII.IMPORT_LAYER_MAP[layer]
 
+    # NOTE: The edge normals, midpoints and widths are calculated for all
+    # edges at once, so that only the port midpoints are created as `Coord`.
+    orientations = (np.arctan2(clockwise * dx, clockwise * (pts.y - nxt.y)) * constants.RAD2DEG).tolist()
+    midpoints = ((pts + nxt) / 2).tolist()
+    widths = pts.distance(nxt).tolist()
+
+    purpose = RDD.PURPOSE.PORT.OUTSIDE_EDGE_DISABLED
     for i in range(0, n):
         # name = 'E{}_{}'.format(i, layer.process.symbol)
         # name = 'E{}_{}_{}'.format(i, layer.process.symbol, shape.bbox_info.center)
         name = '{}E{}_{}'.format(loc_name, i, layer.process.symbol)
-        x = np.sign(clockwise) * (xpts[i+1] - xpts[i])
-        y = np.sign(clockwise) * (ypts[i] - ypts[i+1])
-        orientation = (np.arctan2(x, y) * constants.RAD2DEG)
-        midpoint = [(xpts[i+1] + xpts[i])/2, (ypts[i+1] + ypts[i])/2]
-        width = np.abs(np.sqrt((xpts[i+1] - xpts[i])**2 + (ypts[i+1]-ypts[i])**2))
         P = Port(
             name=name,
             process=layer.process,
-            purpose=RDD.PURPOSE.PORT.OUTSIDE_EDGE_DISABLED,
-            midpoint=midpoint,
-            orientation=orientation,
-            width=width,
+            purpose=purpose,
+            midpoint=Coord(midpoints[i][0], midpoints[i][1]),
+            orientation=orientations[i],
+            width=widths[i],
             length=0.2,
             local_pid=local_pid
         )
         edges += P
     return edges
+
+
+def __intersection_segments__(shape):
+    """ Returns the (N,2,2) array of segments of the closed shape, after
+    `remove_straight_angles`, or None if it has less than two points. """
+    from spira import settings
+    pts = shape.points if isinstance(shape, Shape) else Shape(shape).points
+    # NOTE: The same as `remove_identicals` and `remove_straight_angles`,
+    # on the points array instead of on a new shape.
+    if len(pts) > 1:
+        identicals = np.prod(abs(pts - np.roll(pts, -1, 0)) < 0.5 / settings.get_grids_per_unit(), 1)
+        pts = np.delete(pts, identicals.nonzero()[0], 0)
+    if len(pts) > 1:
+        R = np.roll(pts, -1, 0)
+        a = np.arctan2(R[:, 1] - pts[:, 1], R[:, 0] - pts[:, 0])
+        turns = (a - np.roll(a, 1, 0) + np.pi) % (2 * np.pi) - np.pi
+        straight = (abs(abs((turns + (0.5 * np.pi)) % np.pi) - 0.5 * np.pi) < 0.00001)
+        pts = np.delete(pts, straight.nonzero()[0], 0)
+    if len(pts) < 2:
+        return None
+    return np.stack((pts, np.roll(pts, -1, 0)), axis=1)
+
+
+def __stack_segments__(segments):
+    """ Returns the segments of all shapes in one array,
+    and the index of the shape of every segment. """
+    S = [s for s in segments if s is not None]
+    if len(S) == 0:
+        return np.zeros((0, 2, 2)), np.zeros(0, dtype=np.intp)
+    index = [np.full(len(s), k) for k, s in enumerate(segments) if s is not None]
+    return np.concatenate(S), np.concatenate(index)
+
+
+def __segment_boxes__(S):
+    return np.column_stack((S[:, :, 0].min(1), S[:, :, 1].min(1), S[:, :, 0].max(1), S[:, :, 1].max(1)))
+
+
+def __unique_points__(points):
+    """ Same as `points_unique`, for an (N,2) array of points. """
+    D = abs(points[:, None, :] - points[None, :, :]) < 10e-10
+    E = D[:, :, 0] & D[:, :, 1]
+    unique = []
+    for k in range(len(points)):
+        if not E[k, unique].any():
+            unique.append(k)
+    return points[unique]
+
+
+def intersections_many(shapes_a, shapes_b):
+    """ Returns the intersections of the shapes in `shapes_a` with the
+    shapes in `shapes_b`, as a dictionary with a shape for each pair
+    `(i, j)` of shapes that intersect. Every shape is the same as
+    `Shape.intersections`, and the pairs that do not intersect are left
+    out, so that the result is not a full table of the two lists.
+
+    The segments of all shapes are stacked into arrays. The candidate
+    segment pairs are found with a sweep over their bounding boxes, and
+    are tested and intersected at once instead of pair by pair.
+
+    Examples
+    --------
+    >>> R = intersections_many(edge_shapes, overlap_shapes)
+    >>> for (i, j), shape in R.items():
+    ...     shape.points
+    """
+    A = [__intersection_segments__(s) for s in shapes_a]
+    B = [__intersection_segments__(s) for s in shapes_b]
+    return __intersections__(A, B)
+
+
+def __intersections__(A, B):
+    """ Returns the intersections of the shapes with the segments
+    in `A` with the shapes with the segments in `B`. """
+    from spira.yevon.utils.geometry import overlapping_boxes, segments_intersections
+
+    SA, ia = __stack_segments__(A)
+    SB, ib = __stack_segments__(B)
+
+    tolerance = 0.0
+    if len(SA) and len(SB):
+        tolerance = 1e-9 * (1.0 + max(abs(SA).max(), abs(SB).max()))
+    i, j = overlapping_boxes(__segment_boxes__(SA), __segment_boxes__(SB), tolerance)
+    crossed, P = segments_intersections(SA[i], SB[j])
+    i, j = i[crossed], j[crossed]
+
+    # NOTE: For every segment of a shape in `shapes_a` that crosses a shape
+    # in `shapes_b`, its end point and the intersections are sorted on the
+    # distance to its begin point, and the first two are kept, like with
+    # `sort_points_on_line`. Ties keep the end point first and then the
+    # segment order of the other shape.
+    nb = len(B)
+    group = i * nb + ib[j]
+    ends = np.unique(group)
+    G = np.concatenate((ends, group))
+    rank = np.concatenate((np.full(len(ends), -1), j))
+    points = np.concatenate((SA[ends // nb, 1], P))
+    begin = SA[G // nb, 0]
+    d = np.sqrt((points[:, 0] - begin[:, 0])**2 + (points[:, 1] - begin[:, 1])**2)
+    order = np.lexsort((rank, d, G))
+    G, points = G[order], points[order]
+    first = np.arange(len(G)) - np.searchsorted(G, G) < 2
+    G, points = G[first], points[first]
+
+    pair = ia[G // nb] * nb + G % nb
+    order = np.argsort(pair, kind='stable')
+    pair, points = pair[order], points[order]
+    keys, index = np.unique(pair, return_index=True)
+
+    results = {}
+    for k, p in zip(keys.tolist(), np.split(points, index[1:])):
+        results[(k // nb, k % nb)] = Shape(__unique_points__(p))
+    return results
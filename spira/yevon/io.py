@@ -37,7 +37,7 @@ def wrap_references(cell, c2dmap):
     """ Move all cell centers to the origin. """
 
     for e in cell.references:
-        ref_device = deepcopy(c2dmap[e.ref_cell])
+        ref_device = c2dmap[e.ref_cell].clone()
         center = ref_device.center
         D = ref_device.move(midpoint=center, destination=(0,0))
 
@@ -55,13 +55,26 @@ def wrap_references(cell, c2dmap):
             S.transform(T)
 
         midpoint.move(center)
-        S.translate(midpoint)
+
+        # NOTE: Arrays are not expanded, and
+        # their grid is placed like a reference.
+        if isinstance(e, gdspy.CellArray):
+            S = spira.ARef(
+                reference=D,
+                columns=int(e.columns),
+                rows=int(e.rows),
+                spacing=e.spacing,
+                origin=midpoint,
+                transformation=S.transformation)
+        else:
+            S.translate(midpoint)
 
         c2dmap[cell] += S
 
 
-def import_gds(filename, cellname=None, flatten=False, pcell=True):
-    """  """
+def import_gds(filename, cellname=None, flatten=False, pcell=True, polygon_arrays=False):
+    """ Imports a GDSII file. If `polygon_arrays` is `True`, the
+    polygons of each cell are stored in a single `PolygonArray`. """
 
     gdsii_lib = gdspy.GdsLibrary(name='SPiRA-Cell')
     gdsii_lib.read_gds(filename)
@@ -87,12 +100,20 @@ def import_gds(filename, cellname=None, flatten=False, pcell=True):
     c2dmap = {}
     for cell in gdsii_lib.cell_dict.values():
         D = spira.Cell(name=cell.name)
+        points_list, layers = [], []
         for e in cell.polygons:
 
             # FIXME: Maybe check the datatype.
             for n, p in zip(e.layers, e.polygons):
-                layer = spira.Layer(number=n, datatype=0)
-                D += spira.Polygon(shape=p, layer=layer)
+                layer = spira.Layer(number=int(n), datatype=0)
+                if polygon_arrays is True:
+                    points_list.append(p)
+                    layers.append(layer)
+                else:
+                    D += spira.Polygon(shape=p, layer=layer)
+
+        if len(points_list) > 0:
+            D += spira.PolygonArray(points_list, layers=layers)
 
         c2dmap.update({cell:D})
         cell_list.append(cell)
@@ -10,6 +10,7 @@ from spira.core.parameters.descriptor import RestrictedParameter
 from spira.core.parameters.initializer import ParameterInitializer, MetaInitializer
 from spira.core.parameters.descriptor import ParameterDescriptor
 from spira.core.typed_list import TypedList
+from spira.core.frozen import get_frozen_values
 
 import inspect
 
@@ -40,14 +41,15 @@ class MetaLayer(MetaInitializer):
         if layerlist is None:
             layerlist = settings.get_current_layerlist()
 
-        cls.__keywords__ = kwargs
         L = super().__call__(**kwargs)
+        L.__keywords__ = kwargs
         layer = layerlist.__fast_get_layer__(L.key)
         if layer is None:
             list.append(layerlist, L)
-            return L
-        else:
-            return layer
+            layer = L
+        if get_frozen_values() and hasattr(layer, 'freeze'):
+            return layer.freeze()
+        return layer
 
 
 class __Layer__(ParameterInitializer, metaclass=MetaLayer):
@@ -97,6 +99,11 @@ class __Layer__(ParameterInitializer, metaclass=MetaLayer):
     def __invert__(self):
         return __DerivedLayerNot__(self)
 
+    # NOTE: Layers are unique in the layer list,
+    # so clones share the layer instance.
+    def clone(self):
+        return self
+
 
 class __DerivedLayer__(__Layer__):
     name = StringParameter(allow_none=True, default=None)
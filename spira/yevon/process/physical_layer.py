@@ -1,9 +1,11 @@
+import weakref
 from spira.core.parameters.variables import StringParameter, IntegerParameter
 from spira.yevon.process.gdsii_layer import Layer
 from spira.yevon.process.technology import ProcessLayerDatabase
 from spira.yevon.process.process_layer import ProcessParameter
 from spira.yevon.process.purpose_layer import PurposeLayerParameter
-from spira.core.parameters.initializer import ParameterInitializer
+from spira.core.parameters.initializer import ParameterInitializer, MetaInitializer
+from spira.core.frozen import __Frozen__, freeze_value
 from spira.core.parameters.descriptor import RestrictedParameter
 from spira.core.parameters.restrictions import RestrictType
 from spira.yevon.process.gdsii_layer import Layer
@@ -34,7 +36,7 @@ class PhysicalLayer(Layer):
         return 'PLayer {}-{}'.format(self.process.symbol, self.purpose.symbol)
 
     def __hash__(self):
-        return hash(self.__str__())
+        return hash(self.key)
 
     def __eq__(self, other):
         if not isinstance(other, PhysicalLayer):
@@ -75,6 +77,27 @@ class PhysicalLayer(Layer):
     def key(self):
         return (self.process.symbol, self.purpose.symbol)
 
+    def freeze(self):
+        """ Returns the shared, immutable and hashable
+        physical layer with the same process and purpose. """
+        kwargs = {}
+        for p in self.__external_parameters__():
+            kwargs[p] = getattr(self, p)
+        # NOTE: Bypass the layer list lookup in `MetaLayer`.
+        return freeze_value(__FrozenPhysicalLayer__, self.key, lambda: MetaInitializer.__call__(PhysicalLayer, **kwargs))
+
+    def is_frozen(self):
+        return False
+
+
+class __FrozenPhysicalLayer__(__Frozen__, PhysicalLayer):
+    """ Interned physical layer that cannot be changed. """
+
+    __interned__ = weakref.WeakValueDictionary()
+
+    def __frozen_key__(self):
+        return self.key
+
 
 PLayer = PhysicalLayer
 
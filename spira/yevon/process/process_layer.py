@@ -53,6 +53,10 @@ class ProcessLayer(ParameterInitializer, metaclass=MetaProcessLayer):
     def __ne__(self, other):
         return (not self.__eq__(other))    
 
+    # NOTE: Process layers are unique by symbol.
+    def clone(self):
+        return self
+
     def __repr__(self):
         return "[SPiRA: Process] (name {}, symbol {})".format(self.name, self.symbol)
 
@@ -49,6 +49,10 @@ class PurposeLayer(ParameterInitializer, metaclass=MetaPurposeLayer):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
 
+    # NOTE: Purpose layers are unique by symbol.
+    def clone(self):
+        return self
+
     def __repr__(self):
         string = '[SPiRA: PurposeLayer] (\'{}\', symbol \'{}\')'
         return string.format(self.name, self.symbol)
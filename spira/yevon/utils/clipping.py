@@ -3,8 +3,10 @@ import numpy as np
 import spira.all as spira
 
 from copy import deepcopy
+from spira import settings
 from spira.yevon import constants
 from spira.yevon.gdsii.elem_list import ElementList
+from spira.yevon.geometry.shapes.shape import __Shape__
 from spira.yevon.process import get_rule_deck
 
 
@@ -15,11 +17,37 @@ st = pyclipper.scale_to_clipper
 sf = pyclipper.scale_from_clipper
 
 
+# NOTE: In database unit mode the clipper integers are the integer grid
+# units of the library, so that points are rounded with numpy instead of
+# being scaled one by one by `scale_to_clipper` and `scale_from_clipper`.
+def to_clipper(pts):
+    """ Converts a list of polygons to clipper integers.
+    Shapes can be given instead of points, in which case
+    their cached grid points are used. """
+    if settings.get_database_units():
+        return [(p.grid_points if isinstance(p, __Shape__) else settings.grid_points(p)).tolist() for p in pts]
+    return st([p.points if isinstance(p, __Shape__) else p for p in pts], constants.CLIPPER_SCALE)
+
+
+def from_clipper(pts):
+    """ Converts a list of clipper polygons back to micrometres. """
+    if settings.get_database_units():
+        grids_per_unit = settings.get_grids_per_unit()
+        return [(np.array(p) / grids_per_unit).tolist() for p in pts]
+    return sf(pts, constants.CLIPPER_SCALE)
+
+
+def clipper_scale():
+    """ The number of clipper integers per micrometre. """
+    if settings.get_database_units():
+        return settings.get_grids_per_unit()
+    return constants.CLIPPER_SCALE
+
+
 def boolean(subj, clip=None, clip_type=None, closed=True):
     """ Apply boolean operation of polygons. """
     if clip is None and len(subj) <= 1: return subj
     pc = pyclipper.Pyclipper()
-    sc = constants.CLIPPER_SCALE
     if clip is not None:
         clip_pts = reverse_points(clip)
         pc.AddPaths(clip_pts, pyclipper.PT_CLIP, True)
@@ -44,7 +72,7 @@ def boolean(subj, clip=None, clip_type=None, closed=True):
 def offset(points, grow=1, jointype='miter'):
     """ Grow polygons and return the grown structures. """
     if grow == 0: return points
-    sc = constants.CLIPPER_SCALE
+    sc = clipper_scale()
     pco = pyclipper.PyclipperOffset()
     jt = {
         'round' : pyclipper.JT_ROUND,
@@ -56,16 +84,15 @@ def offset(points, grow=1, jointype='miter'):
         print("jointype should be one of 'round', 'square', 'miter'.")
         print("Using default ('round')")
         jointype = 'round'
-    pco.AddPaths(st([points], sc), jt[jointype], pyclipper.ET_CLOSEDPOLYGON)
-    return sf(pco.Execute(grow*sc), sc)
+    pco.AddPaths(to_clipper([points]), jt[jointype], pyclipper.ET_CLOSEDPOLYGON)
+    return from_clipper(pco.Execute(grow*sc))
 
 
 # NOTE: Maybe automate this in Shape().
 def reverse_points(pts):
     """ If orientation is clockwise, convert to counter-clockwise. """
     points = []
-    sc = constants.CLIPPER_SCALE
-    for poly in st(pts, sc):
+    for poly in to_clipper(pts):
         if pyclipper.Orientation(poly) is False:
             reverse_poly = pyclipper.ReversePath(poly)
             solution = pyclipper.SimplifyPolygon(reverse_poly)
@@ -88,18 +115,16 @@ def simplify_points(points, value=100):
 def clean_points(pts):
     """ Clean the polygon by getting rid of numerical artifacts. 
     This is required to overcome Gmsh parsing errors. """
-    sc = constants.CLIPPER_SCALE
     spl_pts = pyclipper.SimplifyPolygons(pts)
     cln_pts = pyclipper.CleanPolygons(spl_pts)
-    pts = sf(cln_pts, sc)
+    pts = from_clipper(cln_pts)
     return np.array(pts)
 
 
 def encloses(coord, points):
     """  """
-    sc = constants.CLIPPER_SCALE
-    coord = st(coord.to_list(), sc)
-    points = st(points, sc)
+    coord = to_clipper([coord.to_list()])[0]
+    points = to_clipper([points])[0]
     return pyclipper.PointInPolygon(coord, points) != 0
 
 
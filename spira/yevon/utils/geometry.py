@@ -1,3 +1,4 @@
+import zlib
 import gdspy
 import math
 import pyclipper
@@ -154,3 +155,120 @@ def distance(coord, origin=(0,0)):
     return np.sqrt((coord[0] - origin[0])**2 + (coord[1] - origin[1])**2)
 
 
+def __window_pairs__(lo, hi, order, accept, chunk=1 << 20):
+    """ Returns the index arrays (i, j) of the pairs with every j in
+    `order[lo[i]:hi[i]]` for which `accept(i, j)` is true. The pairs
+    are expanded and tested in chunks of about `chunk` pairs. """
+    counts = np.maximum(hi - lo, 0)
+    ends = np.cumsum(counts)
+    I, J = [np.zeros(0, dtype=np.intp)], [np.zeros(0, dtype=np.intp)]
+    first = 0
+    while first < len(counts):
+        last = max(int(np.searchsorted(ends, ends[first] - counts[first] + chunk, 'right')), first + 1)
+        c = counts[first:last]
+        i = np.repeat(np.arange(first, last), c)
+        start = np.repeat(np.cumsum(c) - c - lo[first:last], c)
+        j = order[np.arange(len(i)) - start]
+        keep = accept(i, j)
+        I.append(i[keep])
+        J.append(j[keep])
+        first = last
+    return np.concatenate(I), np.concatenate(J)
+
+
+def overlapping_boxes(B1, B2, tolerance=0.0):
+    """ Returns the index arrays (i, j) of the pairs of boxes in the (N,4)
+    arrays `B1` and `B2` of (xmin, ymin, xmax, ymax) that touch or overlap.
+
+    Two boxes overlap in x if the box of `B2` starts inside the box
+    of `B1`, or the other way around. Both sets are sorted on xmin,
+    so that the boxes that start inside a box are found with a
+    search for each box, and only the pairs that overlap in x are
+    tested on y, instead of all N*M pairs. """
+    n1, n2 = len(B1), len(B2)
+    if (n1 == 0) or (n2 == 0):
+        return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp)
+    xmin1 = B1[:, 0] - tolerance
+    xmax1 = B1[:, 2] + tolerance
+    ymin1 = B1[:, 1] - tolerance
+    ymax1 = B1[:, 3] + tolerance
+
+    def accept(i, j):
+        return (B2[j, 1] <= ymax1[i]) & (B2[j, 3] >= ymin1[i])
+
+    order2 = np.argsort(B2[:, 0], kind='stable')
+    sorted2 = B2[order2, 0]
+    lo = np.searchsorted(sorted2, xmin1, 'left')
+    hi = np.searchsorted(sorted2, xmax1, 'right')
+    i1, j1 = __window_pairs__(lo, hi, order2, accept)
+
+    order1 = np.argsort(xmin1, kind='stable')
+    sorted1 = xmin1[order1]
+    lo = np.searchsorted(sorted1, B2[:, 0], 'right')
+    hi = np.searchsorted(sorted1, B2[:, 2], 'right')
+    j2, i2 = __window_pairs__(lo, hi, order1, lambda j, i: accept(i, j))
+
+    i, j = np.concatenate((i1, i2)), np.concatenate((j1, j2))
+    order = np.lexsort((j, i))
+    return i[order], j[order]
+
+
+def segments_intersections(S1, S2):
+    """ Vectorized `lines_cross(..., inclusive=True)` and `intersection`
+    for the (N,2,2) arrays of segment pairs `S1[k]` and `S2[k]`.
+    Returns the mask of crossing pairs and their intersection points. """
+    b1x, b1y, e1x, e1y = S1[:, 0, 0], S1[:, 0, 1], S1[:, 1, 0], S1[:, 1, 1]
+    b2x, b2y, e2x, e2y = S2[:, 0, 0], S2[:, 0, 1], S2[:, 1, 0], S2[:, 1, 1]
+    A1 = e1y - b1y
+    B1 = -e1x + b1x
+    C1 = b1y * B1 + b1x * A1
+    A2 = e2y - b2y
+    B2 = -e2x + b2x
+    C2 = b2y * B2 + b2x * A2
+    crossed = (
+        (A1 * B2 != A2 * B1) &
+        ((A1 * b2x + B1 * b2y - C1) * (A1 * e2x + B1 * e2y - C1) <= 0) &
+        ((A2 * b1x + B2 * b1y - C2) * (A2 * e1x + B2 * e1y - C2) <= 0)
+    )
+    A1, B1, C1, A2, B2, C2 = [v[crossed] for v in (A1, B1, C1, A2, B2, C2)]
+    x = (C1 * B2 - C2 * B1) / (A1 * B2 - A2 * B1)
+    y = (C1 * A2 - C2 * A1) / (B1 * A2 - B2 * A1)
+    return crossed, np.column_stack((x, y))
+
+
+def __canonical_bytes__(points):
+    """ Returns the bytes of the int64 points of a closed polygon, rotated
+    to start at its smallest vertex and taken in the direction with the
+    smallest bytes, so that the start vertex and orientation drop out. """
+    P = np.ascontiguousarray(points, dtype=np.int64)
+    if (len(P) > 1) and (P[0] == P[-1]).all():
+        P = P[:-1]
+    n = len(P)
+    if n < 2:
+        return P.tobytes()
+    x, y = P[:, 0], P[:, 1]
+    i = np.lexsort((y, x))[0]
+    F = P.tobytes()
+    R = P[::-1].tobytes()
+    # NOTE: Rows are 16 bytes, so that rotating
+    # the polygon is slicing and joining bytes.
+    candidates = []
+    for c in np.nonzero((x == x[i]) & (y == y[i]))[0].tolist():
+        r = n - 1 - c
+        candidates.append(F[16*c:] + F[:16*c])
+        candidates.append(R[16*r:] + R[:16*r])
+    return min(candidates)
+
+
+def canonical_points(points):
+    """ Returns the integer points of a closed polygon, starting at the
+    smallest vertex and in a fixed direction, so that the same polygon
+    gives the same points whatever its start vertex or orientation. """
+    return np.frombuffer(__canonical_bytes__(points), dtype=np.int64).reshape((-1, 2))
+
+
+def points_hash(points):
+    """ Returns a 64 bit hash of integer polygon points, that does not
+    depend on the start vertex or orientation of the polygon. """
+    data = __canonical_bytes__(points)
+    return (zlib.crc32(data) << 32) | zlib.adler32(data)
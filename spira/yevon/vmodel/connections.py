@@ -46,7 +46,7 @@ class ElectricalConnections(__Connection__):
             # self.cell.elements[i].shape = cs
 
             if i == 2:
-                shape = deepcopy(p.shape).transform(p.transformation).snap_to_grid()
+                shape = p.shape.clone().transform(p.transformation).snap_to_grid()
                 # shape = p.shape
                 # print(shape.points)
                 cs = ShapeConnected(original_shape=shape, edges=edges)
@@ -60,7 +60,7 @@ class ElectricalConnections(__Connection__):
 
     def create_edges(self):
         el = ElementList()
-        for p1 in deepcopy(self.cell.elements):
+        for p1 in self.cell.elements.clone():
             el += p1
             for edge in p1.edges:
                 el += edge.outside.transform(edge.transformation)
@@ -74,7 +74,7 @@ class GmshGeometry(__Geometry__):
 
         surfaces = []
         for i, polygon in enumerate(self.process_polygons):
-            ply = deepcopy(polygon)
+            ply = polygon.clone()
             shape = ply.shape.transform(ply.transformation)
             layer = RDD.GDSII.EXPORT_LAYER_MAP[ply.layer]
             pts = [[p[0], p[1], 0] for p in shape.points]
@@ -8,6 +8,7 @@ from spira.yevon.vmodel.derived import get_derived_elements
 from spira.yevon.filters.layer_filter import LayerFilterAllow
 from spira.core.parameters.initializer import ParameterInitializer
 from spira.yevon.vmodel.geometry import GmshGeometry
+from spira.yevon.geometry.shapes.shape import intersections_many
 from spira.yevon.process import get_rule_deck
 
 
@@ -118,13 +119,15 @@ class VirtualConnect(__VirtualModel__):
 
     def _connect_overlap_edges(self, D, edges, overlap_edges):
         """ Connect edges to the overlapping polygon. """
-        for j, e in enumerate(D.overlap_elements):
+        overlap_elements = list(D.overlap_elements)
+        intersections = intersections_many([edge.shape for edge in edges], [e.shape for e in overlap_elements])
+        for e in overlap_elements:
             overlap_edges[e] = []
-            for i, edge in enumerate(edges):
-                if len(edge.shape.intersections(e.shape)) != 0:
-                    edge.pid = '{}'.format(e.shape.hash_string)
-                    edge.layer.purpose = RDD.PURPOSE.PORT.OUTSIDE_EDGE_ENABLED
-                    overlap_edges[e].append(edge)
+        for i, j in sorted(intersections, key=lambda k: (k[1], k[0])):
+            e, edge = overlap_elements[j], edges[i]
+            edge.pid = '{}'.format(e.shape.hash_string)
+            edge.layer.purpose = RDD.PURPOSE.PORT.OUTSIDE_EDGE_ENABLED
+            overlap_edges[e].append(edge)
         return overlap_edges
 
     def _connect_boundary_edges(self, edges, overlap_edges):
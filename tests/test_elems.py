@@ -1,8 +1,9 @@
 import spira.all as spira
 import pytest
 import numpy as np
-from spira import shapes
-from spira.yevon.rdd.layer import PurposeLayer
+from spira.yevon.geometry import shapes
+from spira.yevon.process.purpose_layer import PurposeLayer
+from spira.core.transformation import ReversibleCompoundTransform
 
 UM = 1e6
 
@@ -25,7 +26,7 @@ def test_library():
     assert l1.name == 'spira_library'
     assert l2.name == 'library'
     assert (cell in l1) == True
-    assert l1['C1'] == cell
+    assert l1[cell.name] == cell
 
     l1.clear()
 
@@ -38,19 +39,19 @@ def test_cell_list():
     cl = spira.CellList()
     assert cl.is_empty() == True
 
-    c1 = spira.Cell('C1')
-    c2 = spira.Cell('C2')
-    c3 = spira.Cell('C3')
+    c1 = spira.Cell(name='C1')
+    c2 = spira.Cell(name='C2')
+    c3 = spira.Cell(name='C3')
 
     cl += c1
     cl += [c2, c3]
 
     assert len(cl) == 3
-    assert cl['C2'] == c2
-    assert cl.index('C2') == 1
+    assert cl[c2.name] == c2
+    assert cl.index(c2.name) == 1
     assert cl.index(c2) == 1
 
-    del cl['C1']
+    del cl[c1.name]
 
     assert cl[0] == c2
     assert len(cl) == 2
@@ -59,110 +60,264 @@ def test_cell_list():
 
     assert len(cl) == 1
 
-# ----------------------------------------- spira.ElementalList ------------------------------------
-
-def test_elemental_list():
-    el = spira.ElementalList()
+def test_cell_list_index():
+    from spira.yevon.gdsii.cell_list import CellList
+    a, b, c = spira.Cell(name='A'), spira.Cell(name='B'), spira.Cell(name='C')
+    L = CellList([a, b, c])
+    assert (L[b.name] is b) and (L.index(c.name) == 2)
+    L.add(b)
+    assert len(L) == 3
+    a.name = 'renamed'
+    assert ('renamed' in L) and (L.index('renamed') == 0)
+    del L['renamed']
+    assert ('renamed' not in L) and (L.index(c.name) == 1)
+    d = spira.Cell(name='D')
+    d.name = c.name
+    L.add(d, overwrite=True)
+    assert (L[c.name] is d) and (len(L) == 2)
+    assert spira.settings.get_current_library().get_cell(b.name) is b
+
+    e, f, g = spira.Cell(name='E'), spira.Cell(name='F'), spira.Cell(name='G')
+    L = CellList([a, b, c, g, e])
+    M = CellList([e, a])
+    del L[b.name]
+    del L[c]
+    assert (L.index(e.name) == 2) and (list(L) == [a, g, e])
+    e.name = 'renamed_e'
+    assert (L['renamed_e'] is e) and (M['renamed_e'] is e) and (M.index('renamed_e') == 0)
+    L[1] = f
+    assert (L[f.name] is f) and (g.name not in L) and (list(L) == [a, f, e])
+    version = L.version
+    del L[0]
+    assert (L.version > version) and (L[0] is f) and (a.name not in L)
+
+# -------------------------------------------- spira.ElementList ------------------------------------
+
+def test_element_list():
+    el = spira.ElementList()
     assert len(el) == 0
 
 # -------------------------------------------- spira.Polygon ----------------------------------------
 
 def test_elem_polygon():
-    p1 = [[[0,0], [3,0], [3,1], [0,1]]]
-    p2 = [[[4,0], [7,0], [7,1], [4,1]]]
-    p3 = [[[8,0], [11,0], [11,1], [8,1]]]
+    p1 = [[0,0], [3,0], [3,1], [0,1]]
+    p2 = [[4,0], [7,0], [7,1], [4,1]]
+    p3 = [[8,0], [11,0], [11,1], [8,1]]
 
-    # Create polygon using class parameters.
-    ply1 = spira.Polygon(p1)
+    # Create polygon using positional parameters.
+    ply1 = spira.Polygon(p1, spira.Layer(number=0))
     assert issubclass(type(ply1.shape), shapes.Shape)
-    assert ply1.gds_layer.number == 0
-    assert ply1.gds_layer.datatype == 0
+    assert ply1.layer.number == 0
+    assert ply1.layer.datatype == 0
 
     # Create polygon using new layer number.
     ply2 = spira.Polygon(
         shape=p2,
-        gds_layer=spira.Layer(number=77)
+        layer=spira.Layer(number=77)
     )
     assert issubclass(type(ply2.shape), shapes.Shape)
-    assert ply2.gds_layer.number == 77
-    assert ply2.gds_layer.datatype == 0
+    assert ply2.layer.number == 77
+    assert ply2.layer.datatype == 0
 
     # Create polygon using new shape, number and datatype.
     ply3 = spira.Polygon(
         shape=shapes.Shape(points=p3),
-        gds_layer=spira.Layer(number=51, datatype=1)
+        layer=spira.Layer(number=51, datatype=1)
     )
     assert issubclass(type(ply3.shape), shapes.Shape)
-    assert ply3.gds_layer.number == 51
-    assert ply3.gds_layer.datatype == 1
+    assert ply3.layer.number == 51
+    assert ply3.layer.datatype == 1
+
+def test_polygon_from_arrays():
+    layer = spira.RDD.PLAYER.M1.METAL
+    points = [[[0,0], [i,0], [i,1], [0,1]] for i in range(1, 4)]
+    transformations = [None, spira.Rotation(90), None]
+
+    P1 = [spira.Polygon(shape=p, layer=layer, transformation=t) for p, t in zip(points, transformations)]
+    P2 = spira.Polygon.from_arrays(points, layers=layer, transformations=transformations)
+
+    for p1, p2 in zip(P1, P2):
+        assert sorted(p1.__store__) == sorted(p2.__store__)
+        assert (p1.points == p2.points).all()
+        assert p1.layer is p2.layer
+        assert p1.transformation == p2.transformation
+        assert p1.bbox_info.center == p2.bbox_info.center
+    assert P2[0].transformation is not P2[2].transformation
+    assert P2[1].transformation is transformations[1]
+
+    elems = spira.ElementList().bulk_extend(points, layer)
+    assert len(elems) == 3
+
+    with pytest.raises(ValueError):
+        spira.Polygon.from_arrays([[[0,0], [1]]], layers=layer)
+
+# -------------------------------------------- spira.PolygonArray -----------------------------------
+
+def test_polygon_array():
+    m1, m2 = spira.RDD.PLAYER.M1.METAL, spira.RDD.PLAYER.M2.METAL
+    points = [[[0, 0], [2, 0], [2, 1], [0, 1]], [[0, 0], [1, 0], [1, 3]]]
+    A = spira.PolygonArray(points, layers=[m1, m2], transformation=spira.Translation((10, 0)))
+    assert len(A) == 2
+    assert A.offsets.tolist() == [0, 4, 7]
+    assert A.polygon_layers == [m1, m2]
+    assert A.area == 3.5
+    assert (A.bbox_info.west, A.bbox_info.east, A.bbox_info.north) == (10, 12, 3)
+
+    E = A.to_elements()
+    assert E[1].layer == m2
+    assert E[1].shape.transform_copy(E[1].transformation).points.tolist() == [[10, 0], [11, 0], [11, 3]]
+    A[0].shape.move((5, 0))
+    assert A.points[0].tolist() == [0, 0]
+    assert len(spira.ElementList([A]).polygons) == 2
+
+    B = spira.PolygonArray.from_elements(E)
+    assert B.transformation.is_identity()
+    assert B.points.tolist() == A.flat_copy().points.tolist()
+    assert not A.transformation.is_identity()
+
+    gds = b''.join(e.convert_to_gdspy().to_gds(1e6) for e in E)
+    assert A.convert_to_gdspy().to_gds(1e6) == gds
+
+def test_polygon_array_index():
+    m1 = spira.RDD.PLAYER.M1.METAL
+    A = spira.PolygonArray([[[0, 0], [2, 0], [2, 1]], [[0, 0], [1, 0], [1, 3]]], layers=m1)
+    assert A[-1].shape.points.tolist() == A[1].shape.points.tolist() == [[0, 0], [1, 0], [1, 3]]
+    assert A[-2].shape.points.tolist() == [[0, 0], [2, 0], [2, 1]]
+    for index in (2, -3):
+        with pytest.raises(IndexError):
+            A[index]
+    key = A.key
+    assert A.key == key
+    A.points = A.points + 1
+    assert A.key != key
 
 # -------------------------------------------- spira.Label ------------------------------------------
 
 def test_elem_label():
-    l1 = spira.Label(position=(0,0), text='L1')
+    l1 = spira.Label(position=(0,0), text='L1', layer=spira.Layer(number=5))
     assert all([a == b for a, b in zip(l1.position, [0,0])])
     assert l1.text == 'L1'
-    assert l1.rotation == 0
-    assert l1.magnification == 1
-    assert l1.reflection == False
-    assert l1.texttype == 0
+    assert l1.orientation == 0
+    assert l1.transformation.is_identity()
+    assert l1.layer.number == 5
 
 # -------------------------------------------- spira.Cell -------------------------------------------
 
 def test_elem_cell():
     c1 = spira.Cell(name='CellA')
-    assert c1.name == 'CellA'
+    assert c1.name.startswith('CellA')
     assert len(c1.ports) == 0
-    assert len(c1.elementals) == 0
-
-    c1.ports += spira.Port(name='P1')
-    assert len(c1.ports) == 1
+    assert len(c1.elements) == 0
 
-    c1.elementals += spira.Polygon(shape=[[[0,0], [1,0], [1,1], [0,1]]])
-    assert len(c1.elementals) == 1
+    c1.elements += spira.Polygon(shape=[[0,0], [1,0], [1,1], [0,1]], layer=spira.Layer(number=1))
+    assert len(c1.elements) == 1
 
     c1.center = (0,0)
-    np.testing.assert_array_equal(c1.center, [0,0])
+    assert c1.center == (0,0)
 
     c1.move(midpoint=c1.center, destination=(5,0))
-    np.testing.assert_array_equal(c1.center, [5,0])
+    assert c1.center == (5,0)
+
+    c1.ports += spira.Port(name='P1_M1')
+    assert len(c1.ports) == 1
 
     class CellB(spira.Cell):
-        def create_elementals(self, elems):
+        def create_elements(self, elems):
             elems += spira.Polygon(
-                shape=[[[0,0], [3,0], [3,1], [0,1]]],
-                gds_layer=spira.Layer(number=77)
+                shape=[[0,0], [3,0], [3,1], [0,1]],
+                layer=spira.Layer(number=77)
             )
             return elems
     c2 = CellB()
-    assert c2.name == 'CellB-0'
-    assert len(c1.elementals) == 1
-    assert isinstance(c2.elementals[0], spira.Polygon)
+    assert c2.name.startswith('CellB')
+    assert len(c1.elements) == 1
+    assert isinstance(c2.elements[0], spira.Polygon)
+
+def test_cell_bbox_cache():
+    layer = spira.RDD.PLAYER.M1.METAL
+    C = spira.Cell(name='C')
+    C += spira.Polygon(shape=[[0, 0], [2, 0], [2, 1], [0, 1]], layer=layer, transformation=spira.Rotation(90))
+    D = spira.Cell(name='D')
+    D += spira.SRef(reference=C, midpoint=(10, 0))
+    assert (D.bbox_info.west, D.bbox_info.east, D.bbox_info.north) == (9, 10, 2)
+    assert D.bbox_info is not D.bbox_info
+    D.bbox_info.move((5, 0))
+    assert D.bbox_info.west == 9
+    C += spira.Polygon(shape=[[0, 0], [1, 0], [1, 5]], layer=layer)
+    assert D.bbox_info.north == 5
+    C.elements[0].shape.move((-3, 0))
+    assert D.bbox_info.south == -3
+    D.elements[0].midpoint = (0, 0)
+    assert D.bbox_info.west == -1 and C.bbox_info.west == -1
+    E = spira.Cell(name='E')
+    E += spira.Polygon(shape=[[0, 0], [1, 0], [1, 1]], layer=layer)
+    E.bbox_info
+    E.elements[0].shape.move((100, 0))
+    assert ('__bbox_info__' in D.__dict__) and (E.bbox_info.west == 100)
+    C.elements[1].transformation = spira.Translation((0, 10))
+    assert D.bbox_info.north == 15
+    D.elements[0].transformation = spira.Rotation(90)
+    assert max(p[:, 0].max() for layer, p, path in D.flat_polygons()) == 3
+    D.elements[0].transformation.rotation = 180
+    assert max(p[:, 0].max() for layer, p, path in D.flat_polygons()) == 1
+    E.elements[0].transformation = spira.Translation((0, 0))
+    assert E.bbox_info.west == 100
+    E.elements[0].transformation.translation = (10, 0)
+    assert (E.bbox_info.west, E.bbox_info.east) == (110, 111)
+    T = spira.Translation((0, 0))
+    F = spira.Cell(name='F')
+    F += spira.SRef(reference=E, transformation=ReversibleCompoundTransform([T, spira.Rotation(0)]))
+    assert F.bbox_info.west == 110
+    T.translation = (5, 0)
+    assert F.bbox_info.west == 115
+    F.elements[0].transformation.add(spira.Translation((1, 0)))
+    assert F.bbox_info.west == 116
 
 # -------------------------------------------- spira.SRef -------------------------------------------
 
 def test_elem_sref():
     class CellB(spira.Cell):
-        def create_elementals(self, elems):
+        def create_elements(self, elems):
             elems += spira.Polygon(
-                shape=[[[0,0], [3,0], [3,1], [0,1]]],
-                gds_layer=spira.Layer(number=77)
+                shape=[[0,0], [3,0], [3,1], [0,1]],
+                layer=spira.Layer(number=77)
             )
             return elems
     c2 = CellB()
-    s1 = spira.SRef(structure=c2)
+    s1 = spira.SRef(reference=c2)
     assert all([a == b for a, b in zip(s1.midpoint, [0,0])])
-    assert s1.rotation == 0
-    assert s1.magnification == 1
-    assert s1.reflection == False
+    assert s1.reference is c2
+    assert s1.transformation.is_identity()
+
+def test_identity_keys():
+    layer = spira.RDD.PLAYER.M1.METAL
+    points = [[0, 0], [2, 0], [2, 1], [0, 1]]
+    P1 = spira.Polygon(shape=points, layer=layer, transformation=spira.Rotation(90))
+    P2 = spira.Polygon(shape=points[::-1], layer=layer, transformation=spira.Rotation(90))
+    assert P1.key == P2.key
+    assert hash(P1) == hash(P2)
+    assert P1.id_string() == P2.id_string()
+    assert len({P1.key: P1, P2.key: P2}) == 1
+    P2.shape.move((1, 0))
+    assert P1.key != P2.key
+    P2.transformation = spira.Rotation(180)
+    assert P1.id_string() != P2.id_string()
+
+    D = spira.Cell(name='D')
+    S1 = spira.SRef(reference=D, midpoint=(1, 2), transformation=spira.Rotation(90))
+    S2 = spira.SRef(reference=D, midpoint=(1, 2), transformation=spira.Rotation(90))
+    assert (S1 == S2) and (hash(S1) == hash(S2))
+    assert S1.id_string() == S2.id_string()
+    S2.midpoint = (2, 2)
+    assert S1 != S2
 
 # -------------------------------------------- spira.Port -------------------------------------------
 
 def test_elem_port():
     class PortExample(spira.Cell):
         def create_ports(self, ports):
-            ports += spira.Port(name='P1', midpoint=(-1,2))
-            ports += spira.Port(name='P2', midpoint=(0,3))
+            ports += spira.Port(name='P1_M1', midpoint=(-1,2))
+            ports += spira.Port(name='P2_M1', midpoint=(0,3))
             return ports
     cell = PortExample()
     p1 = cell.ports[0]
@@ -170,34 +325,33 @@ def test_elem_port():
 
     assert p1.midpoint == [-1,2]
     assert p1.orientation == 0
-    p1.reflect()
+    p1.reflect(True)
     assert p1.midpoint == [-1,-2]
     assert p1.orientation == 0
-    p1.rotate(angle=90)
+    p1.rotate(90)
     assert p1.midpoint == [2,-1]
     assert p1.orientation == 90
-    p1.translate(dx=10, dy=5)
+    p1.translate((10, 5))
     assert p1.midpoint == [12, 4]
 
 # -------------------------------------------- spira.Port -------------------------------------------
 
 def test_elem_terminal():
     class PortExample(spira.Cell):
-        width = param.FloatField(default=10)
-        height = param.FloatField(default=1)
+        width = spira.NumberParameter(default=10)
+        height = spira.NumberParameter(default=1)
         def create_ports(self, ports):
             ports += spira.Port(
-                name='P1',
+                name='P1_M1',
                 midpoint=(10,0), 
                 width=self.height, 
                 orientation=180
             )
             return ports
     cell = PortExample()
-    terms = cell.term_ports
-    assert isinstance(terms['P1'], spira.Port)
+    assert isinstance(cell.ports['P1_M1'], spira.Port)
     assert isinstance(cell.ports[0], spira.Port)
-    assert isinstance(cell.terms[0], spira.Port)
+    assert cell.ports[0].width == 1
 
 # -------------------------------------------- spira.Layer -------------------------------------------
 
@@ -211,23 +365,11 @@ def test_elem_layer():
     assert l1 != l2
     assert l2 == l3
 
-    p1 = PurposeLayer(name='Metals')
-    p2 = PurposeLayer(name='Ground')
-    p3 = PurposeLayer(name='Skyplane', datatype=3)
-    p4 = PurposeLayer(name='Skyplane', datatype=2)
+    p1 = PurposeLayer(name='Metals', symbol='TM')
+    p2 = PurposeLayer(name='Ground', symbol='TM')
+    p3 = PurposeLayer(name='Skyplane', symbol='TS')
     assert p1.name == 'Metals'
-    assert p1 == p2
+    assert p1 is p2
     assert p1 != p3
-
-    p5 = p3 + p4
-    assert p5.datatype == 5
-    assert p3.datatype == 3
-    p6 = p3 + 6
-    assert p6.datatype == 9
-    p6 += p3
-    assert p6.datatype == 12
-
-
-
-
-
+    with pytest.raises(AttributeError):
+        PurposeLayer(name='Skyplane')
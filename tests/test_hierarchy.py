@@ -0,0 +1,180 @@
+import pytest
+import numpy as np
+import spira.all as spira
+
+
+# -------------------------------------------- Cell Hierarchy --------------------------------------
+
+def test_cell_hierarchy():
+    layer = spira.RDD.PLAYER.M1.METAL
+    leaf = spira.Cell(name='Leaf')
+    leaf += spira.Polygon(shape=[[0, 0], [1, 0], [1, 1]], layer=layer)
+    mid = spira.Cell(name='Mid')
+    mid += spira.SRef(leaf)
+    mid += spira.SRef(leaf, midpoint=(2, 0))
+    top = spira.Cell(name='Top')
+    top += spira.SRef(mid)
+    top += spira.SRef(mid, midpoint=(0, 5))
+    top += spira.SRef(leaf)
+    assert [c.name for c in top.dependencies()] == [mid.name, leaf.name, top.name]
+    H = top.hierarchy
+    assert [c.name for c in H.children] == [mid.name, leaf.name]
+    assert H.depth == 2 and leaf.hierarchy.depth == 0
+    assert H.instance_count == {mid: 2, leaf: 5}
+    assert [c.name for c in leaf.hierarchy.parents] == [mid.name, top.name]
+    mid += spira.SRef(leaf, midpoint=(4, 0))
+    assert top.hierarchy.instance_count[leaf] == 7
+
+
+def test_library_hierarchy():
+    lib = spira.Library(name='HierarchyLib')
+    a, b, c = spira.Cell(name='LibA'), spira.Cell(name='LibB'), spira.Cell(name='LibC')
+    lib.cells.add([a, b])
+    assert (a in lib.hierarchy) and (lib.hierarchy is lib.hierarchy)
+    lib.cells[0] = c
+    assert (c in lib.hierarchy) and (a not in lib.hierarchy)
+    del lib.cells[b.name]
+    assert (b not in lib.hierarchy) and (len(lib.hierarchy) == 1)
+    lib.cells.add(a)
+    assert a in lib.hierarchy
+
+
+# -------------------------------------------- Array Reference -------------------------------------
+
+def test_aref():
+    layer = spira.RDD.PLAYER.M1.METAL
+    cell = spira.Cell(name='Unit')
+    cell += spira.Polygon(shape=[[0, 0], [1, 0], [1, 1], [0, 1]], layer=layer)
+    cell += spira.Polygon(shape=[[2, 0], [3, 0], [3, 2]], layer=layer)
+    A = spira.ARef(cell, columns=3, rows=2, spacing=(10, 20), origin=(5, 0))
+    assert len(A) == 6
+    assert A[2, 1].midpoint == (25, 20)
+    assert A[-1, -1].midpoint == A[5].midpoint == A[-1].midpoint
+    for index in ((3, 0), (0, 2), (-4, 0), 6, -7):
+        with pytest.raises(IndexError):
+            A[index]
+    B1, B2 = A.bbox_info, A.srefs().bbox_info
+    assert (B1.west, B1.east, B1.south, B1.north) == (B2.west, B2.east, B2.south, B2.north) == (5, 28, 0, 22)
+
+    F = A.flat_copy()
+    assert len(F) == 1 and len(F[0]) == 12
+    points = [P.shape.transform_copy(P.transformation).points.tolist() for S in A.srefs() for P in S.flat_copy()]
+    assert [P.tolist() for P in F[0].__expanded_points__()] == points
+    F = A.flat_copy(level=0)
+    assert len(F) == 1 and isinstance(F[0], spira.ARef)
+    assert F[0] is not A and F[0].key == A.key
+
+    cell.ports += spira.Port(name='P1_M1', midpoint=(1, 0.5), orientation=0)
+    for T in (None, spira.Rotation(90)):
+        R = spira.ARef(cell, columns=3, rows=2, spacing=(10, 20), origin=(5, 0), transformation=T)
+        ports = [(p.name, p.midpoint) for S in R for p in S.ports]
+        assert len(ports) == 48
+        assert [(p.name, p.midpoint) for p in R.ports] == ports
+
+    top = spira.Cell(name='ArrayTop')
+    top += A
+    assert top.hierarchy.instance_count == {cell: 6}
+    assert A.clone().key == A.key
+
+
+def test_aref_gds_roundtrip(tmp_path):
+    from spira.yevon.io import import_gds
+    cell = spira.Cell(name='Unit')
+    cell += spira.Polygon(shape=[[0, 0], [1, 0], [1, 1], [0, 1]], layer=spira.RDD.PLAYER.M1.METAL)
+    top = spira.Cell(name='ArrayTop')
+    top += spira.ARef(cell, columns=3, rows=2, spacing=(10, 20), origin=(5, 0), transformation=spira.Rotation(90))
+    top += spira.SRef(cell, midpoint=(-7, 3))
+    path = str(tmp_path / 'aref')
+    top.gdsii_output(name=path, view=False, disabled_ports={'cells': False, 'polygons': False})
+
+    D = import_gds(path + '.gds', pcell=False)
+    A = [e for e in D.elements if isinstance(e, spira.ARef)]
+    assert len(A) == 1
+    assert (A[0].columns, A[0].rows, A[0].spacing) == (3, 2, (10, 20))
+    expected = sorted(np.round(p, 6).ravel().tolist() for layer, p, path in top.flat_polygons())
+    assert sorted(np.round(p, 6).ravel().tolist() for layer, p, path in D.flat_polygons()) == expected
+
+
+# -------------------------------------------- Cell Summary ----------------------------------------
+
+def test_cell_summary():
+    m1, m2, m3 = spira.RDD.PLAYER.M1.METAL, spira.RDD.PLAYER.M2.METAL, spira.RDD.PLAYER.M3.METAL
+    leaf = spira.Cell(name='Leaf')
+    leaf += spira.Polygon(shape=[[0, 0], [1, 0], [1, 1]], layer=m1)
+    mid = spira.Cell(name='Mid')
+    mid += spira.SRef(leaf)
+    mid += spira.PolygonArray([[[0, 0], [2, 0], [2, 2], [0, 2]]] * 3, layers=m2)
+    top = spira.Cell(name='Top')
+    top += spira.ARef(mid, columns=2, rows=3, spacing=(10, 10))
+    top += spira.SRef(leaf, midpoint=(-5, 0))
+    S = top.summary
+    assert S.polygons == {m1.key: 7, m2.key: 18}
+    assert S.vertices == {m1.key: 21, m2.key: 72}
+    assert (S.bbox_info.west, S.bbox_info.east, S.bbox_info.north) == (-5, 12, 22)
+    assert top.is_layer_in_cell(m2) and not leaf.is_layer_in_cell(m2)
+    assert not top.is_layer_in_cell(m3)
+    leaf += spira.Polygon(shape=[[0, 0], [1, 0], [1, 1]], layer=m3)
+    assert top.is_layer_in_cell(m3) and (top.summary.polygon_count == 32)
+
+    other = spira.Cell(name='Other')
+    other += spira.Polygon(shape=[[0, 0], [1, 0], [1, 1]], layer=m1)
+    top += spira.SRef(other)
+    assert top.summary.polygon_count == 33
+    other_summary, mid_summary = other.summary, mid.summary
+    leaf.elements[0].shape.move((0, 30))
+    assert (other.summary is other_summary) and (mid.summary is not mid_summary)
+    assert top.summary.bbox_info.north == 51
+    leaf.elements[0].layer = m2
+    assert top.summary.polygons == {m1.key: 1, m2.key: 25, m3.key: 7}
+
+
+# -------------------------------------------- Streaming Flatten -----------------------------------
+
+def test_flat_polygons():
+    m1, m2 = spira.RDD.PLAYER.M1.METAL, spira.RDD.PLAYER.M2.METAL
+    leaf = spira.Cell(name='Leaf')
+    leaf += spira.Polygon(shape=[[0, 0], [1, 0], [1, 1]], layer=m1)
+    leaf += spira.PolygonArray([[[0, 0], [2, 0], [2, 2], [0, 2]]] * 2, layers=m2, transformation=spira.Rotation(15))
+    mid = spira.Cell(name='Mid')
+    mid += spira.SRef(leaf, midpoint=(3, 1), transformation=spira.Rotation(30))
+    mid += spira.SRef(leaf, midpoint=(-2, 1), transformation=spira.Reflection(True))
+    top = spira.Cell(name='Top')
+    top += spira.ARef(mid, columns=2, rows=3, spacing=(10, 12), origin=(5, 5), transformation=spira.Rotation(90))
+    top += spira.SRef(mid, midpoint=(-50, 0), transformation=spira.Rotation(45))
+
+    expected = []
+    for e in top.elements.flat_copy():
+        if isinstance(e, spira.PolygonArray):
+            expected.extend(e.__expanded_points__())
+        else:
+            expected.append(e.shape.transform_copy(e.transformation).points)
+    flat = list(top.flat_polygons())
+    assert len(flat) == len(expected) == 42
+    assert all(abs(p - q).max() < 1e-9 for (layer, p, path), q in zip(flat, expected))
+
+    layer, points, path = flat[-1]
+    assert (layer == m2) and (path[0].reference is mid) and (path[1].reference is leaf)
+    assert flat[0][2][0] == (top.elements[0], 0)
+
+    F = top.flat_copy(as_array=True).elements[0]
+    assert (len(F) == 42) and (F.polygon_layers[:3] == [m1, m2, m2])
+    assert mid.elements[0].transformation.is_identity() is False
+
+
+def test_flat_polygons_non_affine():
+    from spira.core.transformation import ReversibleTransform, ReversibleCompoundTransform
+
+    class Shear(ReversibleTransform):
+        def apply_to_array(self, coords):
+            return coords + np.column_stack((coords[:, 1], np.zeros(len(coords))))
+
+        def is_identity(self):
+            return False
+
+    leaf = spira.Cell(name='Leaf')
+    leaf += spira.Polygon(shape=[[0, 0], [1, 0], [1, 1]], layer=spira.RDD.PLAYER.M1.METAL)
+    top = spira.Cell(name='Top')
+    top += spira.SRef(leaf, midpoint=(0, 2), transformation=ReversibleCompoundTransform([Shear()]))
+    assert [p.tolist() for layer, p, path in top.flat_polygons()] == [[[0, 2], [1, 2], [2, 3]]]
+    top.elements[0].transformation.add(spira.Translation((5, 0)))
+    assert [p.tolist() for layer, p, path in top.flat_polygons()] == [[[5, 2], [6, 2], [7, 3]]]
@@ -0,0 +1,288 @@
+import pytest
+import spira.all as spira
+from spira.core.parameters.descriptor import set_strict_validation, get_strict_validation, EXTERNAL_VALUE, CACHED_VALUE
+from spira.core.parameters.restrictions import RestrictRange
+
+
+class Bound(spira.ParameterInitializer):
+    upper = spira.NumberParameter(default=10)
+    value = spira.NumberParameter(default=0, restriction=RestrictRange(lower=0))
+
+
+# -------------------------------------------- Validation ------------------------------------------
+
+def test_validated_on_write():
+    b = Bound(value=2)
+    assert b.__store__['__param_value__'][2] is True
+    with pytest.raises(ValueError):
+        b.value = -1
+    assert b.value == 2
+
+
+def test_strict_validation_on_read():
+    b = Bound(value=2)
+    # Bypass the setter to store a value that violates the restriction.
+    b.__store__['__param_value__'] = (-1, 0, True)
+    assert b.value == -1
+    set_strict_validation(True)
+    try:
+        assert get_strict_validation() is True
+        with pytest.raises(ValueError):
+            b.value
+    finally:
+        set_strict_validation(False)
+    assert get_strict_validation() is False
+
+
+# -------------------------------------------- Cache Invalidation ----------------------------------
+
+class Wire(spira.ParameterInitializer):
+    width = spira.NumberParameter(default=1)
+    length = spira.NumberParameter(default=10)
+    label = spira.StringParameter(default='')
+    area = spira.Parameter(fdef_name='create_area')
+    resistance = spira.Parameter(fdef_name='create_resistance')
+
+    def create_area(self):
+        return self.width * self.length
+
+    def create_resistance(self):
+        return 1.0 / self.area
+
+
+def test_dependency_graph():
+    w = Wire()
+    w.resistance
+    G = Wire.parameter_dependency_graph()
+    assert set(G.predecessors('area')) == {'width', 'length'}
+    assert set(G.predecessors('resistance')) == {'area'}
+    assert Wire.__dependent_parameters__('width') == {'area', 'resistance'}
+    assert Wire.__dependent_parameters__('label') == set()
+
+
+def test_cache_invalidation():
+    w = Wire(width=2)
+    assert w.resistance == 0.05
+    w.label = 'W1'
+    assert '__param_area__' in w.__store__
+    assert '__param_resistance__' in w.__store__
+    w.width = 4
+    assert '__param_area__' not in w.__store__
+    assert '__param_resistance__' not in w.__store__
+    assert w.resistance == 0.025
+
+
+def test_ports_survive_unrelated_update():
+    from spira.yevon.process import get_rule_deck
+    RDD = get_rule_deck()
+    c = spira.Cell(name='Wire')
+    c += spira.Rectangle(p1=(0,0), p2=(10,2), layer=RDD.PLAYER.M1.METAL)
+    S = spira.SRef(reference=c, alias='S1')
+    ports = S.ports
+    S.alias = 'S2'
+    assert S.ports is ports
+    S.midpoint = (5,0)
+    assert S.ports is not ports
+    assert S.ports[0].midpoint == ports[0].midpoint + (5,0)
+
+
+# -------------------------------------------- Constructor Mapping ---------------------------------
+
+def test_map_parameters():
+    from spira.yevon.process import get_rule_deck
+    RDD = get_rule_deck()
+    points = [[0,0], [1,0], [1,1]]
+    ply = spira.Polygon(points, RDD.PLAYER.M1.METAL)
+    assert spira.Polygon.__init_signature__[0][:2] == ('shape', 'layer')
+    assert ply.layer == RDD.PLAYER.M1.METAL
+    kwargs = spira.Polygon.__map_parameters__(points, layer=RDD.PLAYER.M1.METAL)
+    assert kwargs == {'shape': points, 'layer': RDD.PLAYER.M1.METAL, 'transformation': None}
+
+
+# -------------------------------------------- Documentation ---------------------------------------
+
+def test_lazy_docs():
+    from spira.core.parameters.initializer import __LazyDocstring__
+
+    class Documented(spira.ParameterInitializer):
+        """ Documented parameter class. """
+        width = spira.NumberParameter(default=1, doc='Width of the element.')
+
+    doc = Documented.__dict__['__doc__']
+    assert isinstance(doc, __LazyDocstring__)
+    assert doc.generated is None
+    assert 'Documented parameter class.' in Documented.__doc__
+    assert 'Width of the element.' in Documented.__doc__
+    assert Documented().__doc__ == Documented.__doc__
+
+
+# -------------------------------------------- Mixins ----------------------------------------------
+
+def test_mixin_merges_parameters():
+
+    class Base(spira.ParameterInitializer):
+        width = spira.NumberParameter(default=1)
+
+    class Child(Base):
+        length = spira.NumberParameter(default=2)
+
+    class Unrelated(spira.ParameterInitializer):
+        width = spira.NumberParameter(default=1)
+
+    class Aspect(object):
+        height = spira.NumberParameter(default=3)
+
+    Base.mixin(Aspect)
+    Base.mixin(Aspect)
+    assert Base.__bases__.count(Aspect) == 1
+    assert sorted(Base.__params__) == ['height', 'width']
+    assert sorted(Child.__params__) == ['height', 'length', 'width']
+    assert Child.__unlocked_parameters__ == ['height', 'length', 'width']
+    assert sorted(Unrelated.__params__) == ['width']
+    assert Child(height=4).height == 4
+
+
+# -------------------------------------------- Frozen Values ---------------------------------------
+
+def test_frozen_values():
+    from copy import deepcopy
+    from spira.core.frozen import set_frozen_values
+
+    c = spira.Coord(1, 2).freeze()
+    assert c is spira.Coord(1.0, 2.0).freeze()
+    assert deepcopy(c) is c
+    with pytest.raises(AttributeError):
+        c.x = 3
+    d = c
+    d += (1, 1)
+    assert (c == spira.Coord(1, 2)) and (d == spira.Coord(2, 3))
+
+    set_frozen_values(True)
+    try:
+        T = spira.Rotation(90) + spira.Translation((3, 4))
+        S1 = spira.SRef(spira.Cell(name='FrozenRef'), midpoint=(1, 2), transformation=T)
+        S2 = spira.SRef(S1.reference, midpoint=(1, 2), transformation=T)
+        assert S1.transformation is S2.transformation
+        assert S1.midpoint is S2.midpoint
+        assert S1.transformation == T
+        S1.translate((1, 0))
+        assert S1.transformation.translation == spira.Coord(4, 4)
+        assert S2.transformation.translation == spira.Coord(3, 4)
+    finally:
+        set_frozen_values(False)
+
+
+# -------------------------------------------- Profiling -------------------------------------------
+
+def test_profile_parameters(tmpdir):
+    import json
+    import pstats
+    from spira.core.parameters.descriptor import ParameterDescriptor
+
+    get = ParameterDescriptor.__get__
+    with spira.profile.parameters() as profiler:
+        w = Wire()
+        w.resistance
+        w.resistance
+        w.width = 2
+        w.resistance
+    assert ParameterDescriptor.__get__ is get
+
+    stats = profiler.to_dict()
+    assert stats['Wire.resistance']['calls'] == 2
+    assert stats['Wire.resistance']['hits'] == 1
+    assert stats['Wire.resistance']['invalidations'] == 1
+    assert stats['Wire.area']['calls'] == 2
+    assert stats['Wire.area']['invalidations'] == 1
+    assert stats['Wire.area']['cumulative_time'] <= stats['Wire.resistance']['cumulative_time']
+    assert 'Wire.resistance' in profiler.table()
+
+    filename = str(tmpdir.join('parameters.json'))
+    profiler.dump_json(filename)
+    with open(filename) as f:
+        assert json.load(f) == json.loads(profiler.to_json())
+
+    filename = str(tmpdir.join('parameters.prof'))
+    profiler.dump_stats(filename)
+    assert pstats.Stats(filename).total_calls == 4
+
+
+# -------------------------------------------- Compact Store ---------------------------------------
+
+def test_compact_store():
+    from spira.core.parameters.store import CompactStore
+
+    class CompactWire(Wire):
+        pass
+
+    CompactWire.use_compact_store()
+    w = CompactWire(width=2)
+    assert isinstance(w.__store__, CompactStore)
+    assert not hasattr(w.__store__, '__dict__')
+    assert isinstance(Wire().__store__, dict)
+
+    assert w.resistance == 0.05
+    assert sorted(w.__store__.keys()) == ['__param_area__', '__param_resistance__', '__param_width__']
+    assert w.__store__['__param_width__'] == (2, EXTERNAL_VALUE, True)
+    assert w.__store__.get('__param_resistance__')[1] == CACHED_VALUE
+    assert w.clone().__store__.items() == w.__store__.items()
+    w.width = 4
+    assert '__param_area__' not in w.__store__
+    assert w.resistance == 0.025
+    assert w.copy(width=1).area == 10
+
+
+# -------------------------------------------- Clone -----------------------------------------------
+
+def test_clone():
+    w = Wire(width=2, label='w')
+    assert w.resistance == 0.05
+    c = w.clone()
+    assert '__param_resistance__' in c.__store__
+    c.width = 4
+    assert c.resistance == 0.025
+    assert w.resistance == 0.05
+
+    layer = spira.RDD.PLAYER.M1.METAL
+    T = spira.Rotation(90) + spira.Translation((1, 0))
+    p = spira.Polygon(shape=[[0,0], [1,0], [1,1]], layer=layer, transformation=T)
+    c = p.clone()
+    assert c.uid != p.uid
+    assert c.layer is p.layer
+    assert c.shape is not p.shape
+    assert c.transformation is not p.transformation
+    assert c.transformation == p.transformation
+    assert (c.points == p.points).all()
+
+    c.shape.move((1, 1))
+    assert p.points.tolist() == [[0,0], [1,0], [1,1]]
+    with pytest.raises(ValueError):
+        p.points[0, 0] = 5
+
+    cell = spira.Cell(name='CloneRef')
+    S = spira.SRef(cell, midpoint=(1, 1))
+    C = S.clone()
+    assert C.reference is cell
+    C.move((1, 0))
+    assert S.midpoint == (1, 1)
+
+    elems = spira.ElementList([p])
+    clones = elems.clone()
+    assert len(clones) == 1
+    assert clones[0] is not p
+
+    compound = spira.Translation((1, 0)) + spira.Stretch(stretch_center=(0, 0), stretch_factor=(2, 1))
+    assert len(compound.clone().__subtransforms__) == 2
+
+
+# -------------------------------------------- Array Parameters ------------------------------------
+
+def test_array_change_invalidates():
+    s = spira.Shape(points=[[0, 0], [2, 0], [2, 1], [0, 1]])
+    assert s.area == 2
+    s.points = [[0, 0], [4, 0], [4, 1], [0, 1]]
+    assert s.area == 4
+    s.move((1, 0))
+    assert s.bbox_array == (1, 0, 5, 1)
+    s.points = s.points
+    assert s.area == 4
@@ -0,0 +1,135 @@
+import numpy as np
+import spira.all as spira
+
+
+# -------------------------------------------- Coord Array -----------------------------------------
+
+def test_coord_array():
+    from spira.yevon.geometry.coord import Coord, CoordArray
+    from spira.yevon.geometry.shapes.shape import shape_edge_ports
+
+    C = CoordArray([Coord(0, 0), Coord(3, 4)])
+    assert C.dtype == np.int64
+    assert isinstance(C[1], Coord) and C[1] == Coord(3, 4)
+    assert type(C[0:1]) is CoordArray
+    assert type(C.x) is np.ndarray and list(C.x) == [0, 3]
+    assert np.array_equal(C.distance((0, 0)), [0, 5])
+    assert np.allclose(C.angle_deg((3, 0)), [180, 90])
+    assert C.snap_to_grid(10) is C
+
+    points = np.random.RandomState(2).uniform(-10, 10, (20, 2))
+    T = spira.GenericTransform(translation=(1, 2), rotation=30, reflection=True)
+    C = CoordArray(points.copy())
+    assert C.transform(T) is C
+    expected = [T.apply_to_coord(Coord(p[0], p[1])).to_numpy_array() for p in points]
+    assert np.array_equal(C, expected)
+    C.snap_to_grid(1000)
+    assert np.array_equal(C, np.floor(np.array(expected) * 1000 + 0.5) / 1000)
+
+    shape = spira.Shape(points=[[0, 0], [2, 0], [2, 1], [0, 1]])
+    assert isinstance(shape.coords, CoordArray)
+    assert not shape.coords.flags.writeable
+    ports = shape_edge_ports(shape, spira.RDD.PLAYER.M1.METAL)
+    assert [p.midpoint.to_list() for p in ports] == [[1, 0], [2, 0.5], [1, 1], [0, 0.5]]
+    assert [p.width for p in ports] == [2, 1, 2, 1]
+    assert [p.orientation for p in ports] == [270, 0, 90, 180]
+
+
+# -------------------------------------------- Database Units --------------------------------------
+
+def test_database_units():
+    import gdspy
+    from spira import settings
+
+    s1 = spira.Shape(points=[[0, 0], [2.0000001, 0], [2, 1], [0, 1]])
+    s2 = spira.Shape(points=[[1, 0.5], [3, 0.5], [3, 2], [1, 2]])
+    assert s1.grid_points.tolist() == [[0, 0], [2000000, 0], [2000000, 1000000], [0, 1000000]]
+    s1.move((1, 0))
+    assert s1.grid_points[0] == spira.Coord(1000000, 0)
+    s1.move((-1, 0))
+
+    default = settings.get_current_library()
+    settings.set_current_library(spira.Library('database', database_units=True))
+    try:
+        assert settings.get_database_units()
+        shapes = s1 & s2
+        assert np.array(shapes[0]).tolist() == [[2, 1], [1, 1], [1, 0.5], [2, 0.5]]
+
+        layer = spira.RDD.PLAYER.M1.METAL
+        P = spira.Polygon(shape=[[0, 0], [1.2345678, 0], [1, 1.5]], layer=layer, transformation=spira.Rotation(30))
+        G = P.convert_to_gdspy()
+        assert np.array_equal(G.grid_points, np.floor(G.polygons[0] * 1e6 + 0.5))
+        points = P.shape.transform_copy(P.transformation).points
+        assert G.to_gds(1e6) == gdspy.Polygon(points, layer=G.layers[0], datatype=G.datatypes[0]).to_gds(1e6)
+    finally:
+        settings.set_current_library(default)
+    assert not settings.get_database_units()
+
+
+# -------------------------------------------- Geometric Hash --------------------------------------
+
+def test_geometric_hash():
+    points = [[0, 0], [2, 0], [2, 1], [0, 1]]
+    s = spira.Shape(points=points)
+    h = s.hash_string
+    assert s.geometric_hash is s.geometric_hash
+    assert spira.Shape(points=points[2:] + points[:2]).hash_string == h
+    assert spira.Shape(points=points[::-1]).hash_string == h
+    assert spira.Shape(points=points + points[:1]).hash_string == h
+    assert spira.Shape(points=[[0, 0], [2, 0], [2, 1 + 1e-9], [0, 1]]).hash_string == h
+    assert spira.Shape(points=[[0, 0], [2, 0], [1, 2], [0, 1]]).hash_string != h
+    s.move((1, 0))
+    assert s.hash_string != h
+    s.move((-1, 0))
+    assert s.hash_string == h
+
+
+# -------------------------------------------- Intersections ---------------------------------------
+
+def test_intersections_many():
+    from spira.yevon.geometry.shapes.shape import intersections_many
+    s1 = spira.Shape(points=[[0, 0], [2, 0], [2, 1], [0, 1]])
+    s2 = spira.Shape(points=[[1, -1], [3, -1], [3, 2], [1, 2]])
+    s3 = spira.Shape(points=[[5, 0], [6, 0], [6, 1], [5, 1]])
+    assert s1.intersections(s2).points.tolist() == [[1, 0], [2, 0], [1, 1], [0, 1]]
+    assert len(s1.intersections(s3)) == 0
+    assert s1.intersections(spira.Shape(points=[])) == []
+    R = intersections_many([s1, s3], [s2, s3, spira.Shape(points=[])])
+    assert list(R) == [(0, 0), (1, 1)]
+    assert R[(0, 0)].points.tolist() == s1.intersections(s2).points.tolist()
+
+
+def test_overlapping_boxes():
+    from spira.yevon.utils.geometry import overlapping_boxes
+    B1 = np.array([[0, 0, 100, 1], [10, 5, 11, 6], [50, 0, 51, 1]], dtype=float)
+    B2 = np.array([[-5, 0, 2, 1], [10.5, 6, 12, 7], [60, 2, 61, 3], [30, 0, 31, 1]], dtype=float)
+    i, j = overlapping_boxes(B1, B2)
+    assert list(zip(i.tolist(), j.tolist())) == [(0, 0), (0, 3), (1, 1)]
+    i, j = overlapping_boxes(B1, B2, tolerance=1.0)
+    assert list(zip(i.tolist(), j.tolist())) == [(0, 0), (0, 2), (0, 3), (1, 1)]
+
+
+# -------------------------------------------- Polygon Metrics -------------------------------------
+
+def test_polygon_metrics():
+    from spira.yevon.geometry.metrics import polygon_metrics, element_metrics
+    points = [[0, 0], [2, 0], [2, 1], [0, 1]]
+    s = spira.Shape(points=points)
+    assert s.area == 2.0
+    assert s.orientation == 1
+    assert spira.Shape(points=points[::-1]).orientation == -1
+    assert spira.Shape(points=[[0, 0], [4, 0], [4, 4], [3, 4], [3, 1], [0, 1]]).area == 7.0
+    s.move((1, 0))
+    assert s.signed_area is s.signed_area
+
+    M = polygon_metrics([points, [], points[::-1]])
+    assert M.area.tolist() == [2, 0, 2]
+    assert M.orientation.tolist() == [1, 0, -1]
+    assert M.perimeter.tolist() == [6, 0, 6]
+    assert M.centroid[0].tolist() == [1, 0.5]
+    assert M.bbox[2].tolist() == [0, 0, 2, 1]
+
+    layer = spira.RDD.PLAYER.M1.METAL
+    P = spira.Polygon(shape=points, layer=layer, transformation=spira.Magnification(magnification=2))
+    assert P.area == 2.0
+    assert element_metrics(spira.ElementList([P])).total_area == 8.0
@@ -0,0 +1,144 @@
+import numpy as np
+import spira.all as spira
+
+
+# -------------------------------------------- Affine Matrix ---------------------------------------
+
+def test_transform_matrix():
+    from spira.yevon.geometry.coord import Coord
+
+    points = np.random.RandomState(0).uniform(-100, 100, (50, 2))
+
+    transforms = [
+        spira.GenericTransform(translation=(3, -2), rotation=30),
+        spira.GenericTransform(translation=(1.5, 7), rotation=123.4, reflection=True),
+        spira.GenericTransform(rotation=270, reflection=True, magnification=2),
+        spira.GenericTransform(rotation=47.3, magnification=0.5),
+        spira.Translation((4.2, -1.1)),
+        spira.Rotation(33.3, rotation_center=(2, 5)),
+        spira.Rotation(90),
+        spira.Reflection(True),
+        spira.Magnification(0.5, (1, 2)),
+    ]
+    for T in transforms:
+        expected = np.array([T.apply_to_coord(Coord(p[0], p[1])).to_numpy_array() for p in points])
+        assert np.array_equal(T.apply_to_array(points), expected)
+        homogeneous = np.vstack((points.T, np.ones(len(points))))
+        assert np.allclose(T.matrix.dot(homogeneous)[:2].T, expected)
+
+    T = spira.GenericTransform(rotation=30)
+    M = T.matrix
+    assert T.matrix is M
+    T.rotation = 60
+    assert np.isclose(T.matrix[0, 0], 0.5)
+    T.translation = (1, 1)
+    T.reflection = True
+    assert T.matrix[0, 2] == 1 and T.matrix[1, 1] < 0
+
+    coords = points.copy()
+    result = T.apply_to_array(coords, out=coords)
+    assert result is coords
+    assert np.array_equal(coords, T.apply_to_array(points))
+
+
+# -------------------------------------------- Compound Transforms ---------------------------------
+
+def test_compound_transform_collapse():
+
+    points = np.random.RandomState(1).uniform(-10, 10, (20, 2))
+    parts = [
+        spira.Rotation(30, rotation_center=(1, 2)),
+        spira.Stretch(stretch_factor=(2, 0.5), stretch_center=(1, 1)),
+        spira.GenericTransform(translation=(3, 4), rotation=90, reflection=True),
+        spira.Translation((1, -1)),
+        spira.Magnification(2, (1, 1)),
+    ]
+    T = parts[0] + parts[1]
+    for p in parts[2:]:
+        T = T + p
+    assert isinstance(T, spira.ReversibleCompoundTransform)
+    assert T.depth == 5
+    assert T.matrix is not None
+
+    expected = points
+    for p in parts:
+        expected = p.apply_to_array(expected)
+    assert np.allclose(T.apply_to_array(points), expected)
+    assert np.allclose(T.reverse_on_array(expected), points)
+    assert np.allclose((-T).apply_to_array(expected), points)
+    c = T.apply_to_coord(spira.Coord(1, 2))
+    assert np.allclose(T.reverse_on_coord(c).to_numpy_array(), [1, 2])
+
+    cell = spira.Cell(name='CompoundRef')
+    S = spira.SRef(cell)
+    with spira.profile.parameters() as profiler:
+        for i in range(3):
+            S.transform(spira.Stretch(stretch_factor=(2, 1), stretch_center=(0, 0)))
+        assert S.transformation.apply_to_coord((1, 0)) == spira.Coord(8, 0)
+    assert profiler.chains_to_dict()[4] == {'applied': 1, 'collapsed': 1}
+    assert 'chain depth' in profiler.table()
+
+
+def test_compound_member_change():
+    R = spira.GenericTransform(rotation=90)
+    S = spira.Stretch(stretch_factor=(2, 1))
+    T = R + S + spira.Translation((1, 0))
+    assert T.apply_to_coord((1, 0)) == spira.Coord(1, 1)
+    R.rotation = 0
+    assert T.apply_to_coord((1, 0)) == spira.Coord(3, 0)
+    S.stretch_factor = (3, 1)
+    assert np.allclose(T.apply_to_array(np.array([[1.0, 0.0]])), [[4, 0]])
+    assert np.allclose(T.reverse_on_array(np.array([[4.0, 0.0]])), [[1, 0]])
+    S.stretch_center = (1, 0)
+    assert np.allclose(T.matrix.dot([1, 0, 1])[:2], (2, 0))
+    C = T.clone()
+    R.rotation = 90
+    assert C.apply_to_coord((1, 0)) == spira.Coord(2, 0)
+
+
+# -------------------------------------------- Reverse Transforms ----------------------------------
+
+def test_reverse_transforms():
+    points = np.random.RandomState(3).uniform(-10, 10, (20, 2))
+    transforms = [
+        spira.GenericTransform(translation=(3, 1), rotation=30, reflection=True, magnification=2),
+        spira.GenericTransform(rotation=90, magnification=0.5),
+        spira.Magnification(2, (1, 2)),
+        spira.Reflection(True),
+        spira.Rotation(30, rotation_center=(1, 1)),
+        spira.Stretch(stretch_factor=(2, 0.5), stretch_center=(1, 0)),
+    ]
+    for T in transforms:
+        assert np.allclose((-T).apply_to_array(T.apply_to_array(points)), points)
+        assert np.allclose(T.reverse_on_array(T.apply_to_array(points)), points)
+
+    M = -spira.Magnification(2, (1, 2))
+    assert M.apply_to_coord((3, 4)) == spira.Coord(2, 3)
+    G = -spira.GenericTransform(reflection=True, magnification=2)
+    assert np.allclose(G.apply_to_array([[2, 4]]), [[1, -2]])
+
+
+def test_compound_of_compounds():
+    points = np.random.RandomState(4).uniform(-10, 10, (20, 2))
+    A = spira.Rotation(30) + spira.Stretch(stretch_factor=(2, 1), stretch_center=(0, 0))
+    B = spira.Stretch(stretch_factor=(1, 3), stretch_center=(1, 0)) + spira.Translation((0, 2))
+    C = A + B
+    assert isinstance(C, spira.ReversibleCompoundTransform)
+    assert C.depth == 4
+    assert (A.depth, B.depth) == (2, 2)
+    assert np.allclose(C.apply_to_array(points), B.apply_to_array(A.apply_to_array(points)))
+    assert np.allclose((-C).apply_to_array(C.apply_to_array(points)), points)
+
+
+def test_generic_transform_sum():
+    points = np.random.RandomState(5).uniform(-10, 10, (20, 2))
+    a = spira.GenericTransform(translation=(1, 2), rotation=90, reflection=True)
+    b = spira.GenericTransform(translation=(3, 0), rotation=30)
+    c = a + b
+    assert isinstance(c, spira.GenericTransform)
+    assert np.allclose(c.apply_to_array(points), b.apply_to_array(a.apply_to_array(points)))
+    assert (c.rotation, c.reflection) == (120, True)
+    assert (a.rotation, a.translation, b.rotation, b.translation) == (90, (1, 2), 30, (3, 0))
+
+    d = spira.GenericTransform(rotation=45, absolute_rotation=True) + spira.GenericTransform(translation=(1, 0), rotation=90)
+    assert d.absolute_rotation and (d.rotation == 45) and (d.translation == (1, 0))